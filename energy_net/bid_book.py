@@ -0,0 +1,191 @@
+import itertools
+import random
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+from .defs import Bid
+
+
+class _Node:
+    __slots__ = ('key', 'bidder', 'quantity', 'total', 'priority', 'left', 'right')
+
+    def __init__(self, key: Tuple[float, int], bidder: Hashable, quantity: float, priority: float):
+        self.key = key
+        self.bidder = bidder
+        self.quantity = quantity
+        self.total = quantity
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+
+def _total(node: Optional[_Node]) -> float:
+    return node.total if node is not None else 0.
+
+
+def _update(node: _Node) -> _Node:
+    node.total = node.quantity + _total(node.left) + _total(node.right)
+    return node
+
+
+def _split(node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Splits a treap into the nodes with keys < `key` and the nodes with keys >= `key`."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Merges two treaps, all keys of `left` being smaller than the keys of `right`."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+def _remove(node: _Node, key) -> Optional[_Node]:
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    return _update(node)
+
+
+class BidBook:
+    """
+    Production bids kept sorted by price, with the cumulative quantity of every subtree.
+
+    The book is a treap keyed by (price, arrival), so updating the bid of a single bidder and finding the
+    marginal bid for a demand (a prefix-sum query over the merit order) both take O(log n) expected time.
+    Bids with the same price are ordered by the time their price was last set: an update that only changes
+    the quantity of a bid keeps its position.
+
+    Parameters
+    ----------
+    bids: Mapping[Hashable, Bid], optional
+        Initial `{bidder: (quantity, price)}` bids.
+    seed: int, optional
+        Seed of the treap's random priorities.
+    """
+
+    def __init__(self, bids: Mapping[Hashable, Bid] = None, seed: int = None):
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[Hashable, _Node] = {}
+        self._arrival = itertools.count()
+        self._random = random.Random(seed)
+        for bidder, (quantity, price) in (bids or {}).items():
+            self.update(bidder, quantity, price)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, bidder: Hashable) -> bool:
+        return bidder in self._nodes
+
+    def get(self, bidder: Hashable) -> Bid:
+        node = self._nodes.get(bidder)
+        return None if node is None else (node.quantity, node.key[0])
+
+    @property
+    def total_quantity(self) -> float:
+        return _total(self._root)
+
+    def update(self, bidder: Hashable, quantity: float, price: float):
+        """Adds the bid of `bidder`, replacing its previous bid."""
+        if quantity < 0:
+            raise ValueError(f"Bid quantity must be non-negative, got {quantity}")
+        node = self._nodes.get(bidder)
+        if node is not None and node.key[0] == price:
+            # same position in the book, only the sums on the path from the root change
+            node.quantity = quantity
+            self._update_path(node.key)
+            return
+        if node is not None:
+            self._root = _remove(self._root, node.key)
+        node = _Node((price, next(self._arrival)), bidder, quantity, self._random.random())
+        self._nodes[bidder] = node
+        left, right = _split(self._root, node.key)
+        self._root = _merge(_merge(left, node), right)
+
+    def remove(self, bidder: Hashable):
+        """Removes the bid of `bidder`, if any."""
+        node = self._nodes.pop(bidder, None)
+        if node is not None:
+            self._root = _remove(self._root, node.key)
+
+    def clear(self, demand: float) -> Tuple[float, Optional[Hashable], float]:
+        """
+        Finds the marginal bid for `demand` in merit order.
+
+        Returns
+        -------
+        price: float
+            The clearing price, i.e. the price of the first bid at which the cumulative quantity covers the
+            demand, or of the most expensive bid if the book does not cover the demand. 0 for an empty book.
+        marginal_bidder: Hashable
+            The bidder of the marginal bid, or None for an empty book.
+        cleared_quantity: float
+            The quantity dispatched from all bids cheaper than the marginal one.
+        """
+        node = self._root
+        if node is None:
+            return 0., None, 0.
+        cleared = 0.
+        while True:
+            left_total = _total(node.left)
+            if node.left is not None and cleared + left_total >= demand:
+                node = node.left
+                continue
+            cleared += left_total
+            if cleared + node.quantity >= demand or node.right is None:
+                return node.key[0], node.bidder, cleared
+            cleared += node.quantity
+            node = node.right
+
+    def dispatch(self, demand: float) -> Tuple[Dict[Hashable, float], float]:
+        """Merit-order workloads of the bidders up to the marginal one, and the clearing price."""
+        price, marginal_bidder, _ = self.clear(demand)
+        workloads = {}
+        remaining = demand
+        for node in self._in_order():
+            workloads[node.bidder] = max(min(node.quantity, remaining), 0.)
+            remaining -= workloads[node.bidder]
+            if node.bidder == marginal_bidder:
+                break
+        return workloads, price
+
+    def items(self):
+        """Yields `(bidder, (quantity, price))` in merit order."""
+        for node in self._in_order():
+            yield node.bidder, (node.quantity, node.key[0])
+
+    def _update_path(self, key):
+        path = []
+        node = self._root
+        while node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        _update(node)
+        for node in reversed(path):
+            _update(node)
+
+    def _in_order(self):
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
@@ -0,0 +1 @@
+from .profiles import ProfileCursor, ProfileStore, ProfileStreamer
@@ -0,0 +1,271 @@
+import itertools
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, os.PathLike]
+
+
+class ProfileStore:
+    """Time series profiles (load, PV production, prices, ...) served from a memory-mapped binary cache.
+
+    The profiles are kept as a `[columns, time_steps]` array in a `.npy` file, so that every profile is
+    contiguous on disk and slices of it are zero-copy views into the mapping. Processes opening the same file
+    share its pages through the OS page cache, and pickling a store (e.g. to send it to a worker process)
+    only pickles its path.
+
+    Parameters
+    ----------
+    path: PathLike
+        Path of the `.npy` cache. The column names are read from the `.columns.json` file next to it.
+
+    Raises
+    ------
+    ValueError
+        If the `.columns.json` file is missing or does not name every profile.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.data = np.load(self.path, mmap_mode='r')
+        columns_path = self.__columns_path(self.path)
+        if not columns_path.exists():
+            raise ValueError(f"{self.path} has no column names: {columns_path} is missing")
+        with open(columns_path, 'r') as f:
+            self.columns: List[str] = json.load(f)
+        if len(self.columns) != self.data.shape[0]:
+            raise ValueError(f"{self.path} has {self.data.shape[0]} profiles but {len(self.columns)} column names")
+        self.column_index: Dict[str, int] = {name: i for i, name in enumerate(self.columns)}
+
+    @classmethod
+    def from_csv(cls, csv_path: PathLike, cache_path: PathLike = None, dtype=np.float32,
+                 chunk_time_steps: int = 65536) -> 'ProfileStore':
+        """
+        Opens the profiles of a CSV file with a header row and one column per profile.
+
+        The CSV is parsed only if its binary cache (or the cache's column names) is missing or older than the
+        CSV, in which case the cache is written next to it (or to `cache_path`).
+        """
+        csv_path = Path(csv_path)
+        cache_path = Path(cache_path) if cache_path is not None else csv_path.with_suffix('.npy')
+        if (not cache_path.exists() or not cls.__columns_path(cache_path).exists()
+                or cache_path.stat().st_mtime < csv_path.stat().st_mtime):
+            cls.write_cache(csv_path, cache_path, dtype=dtype, chunk_time_steps=chunk_time_steps)
+        return cls(cache_path)
+
+    @classmethod
+    def write_cache(cls, csv_path: PathLike, cache_path: PathLike, dtype=np.float32, chunk_time_steps: int = 65536):
+        """
+        Converts a CSV file to the binary cache read by `ProfileStore`.
+
+        The CSV is parsed `chunk_time_steps` rows at a time and written straight to the mapped cache, so
+        CSVs larger than the memory can be converted.
+        """
+        cache_path = Path(cache_path)
+        with open(csv_path, 'r') as f:
+            columns = [name.strip() for name in f.readline().split(',')]
+            num_time_steps = sum(1 for line in f if line.strip())
+        # written to temporary files first, so that concurrent readers never see a partial cache
+        tmp_path = cache_path.with_name(f'{cache_path.stem}.{os.getpid()}.tmp.npy')
+        tmp_columns_path = cls.__columns_path(tmp_path)
+        try:
+            data = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(len(columns), num_time_steps))
+            with open(csv_path, 'r') as f:
+                f.readline()
+                lines = (line for line in f if line.strip())
+                time_step = 0
+                while time_step < num_time_steps:
+                    chunk = np.loadtxt(list(itertools.islice(lines, chunk_time_steps)), delimiter=',', dtype=dtype, ndmin=2)
+                    data[:, time_step:time_step + len(chunk)] = chunk.T
+                    time_step += len(chunk)
+            data.flush()
+            del data
+            with open(tmp_columns_path, 'w') as f:
+                json.dump(columns, f)
+            os.replace(tmp_columns_path, cls.__columns_path(cache_path))
+            os.replace(tmp_path, cache_path)
+        finally:
+            # left behind only if the conversion failed
+            for path in (tmp_path, tmp_columns_path):
+                path.unlink(missing_ok=True)
+
+    @property
+    def num_time_steps(self) -> int:
+        return self.data.shape[1]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.column_index
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """The full profile of a column, as a read-only view."""
+        return self.data[self.column_index[column]]
+
+    def slice(self, column: str, start_time_step: int, end_time_step: int) -> np.ndarray:
+        """The profile of a column between two time steps, both included, as a read-only view."""
+        if not 0 <= start_time_step <= end_time_step < self.num_time_steps:
+            raise IndexError(f"Time steps [{start_time_step}, {end_time_step}] are out of the profile range [0, {self.num_time_steps - 1}]")
+        return self.data[self.column_index[column], start_time_step:end_time_step + 1]
+
+    def episode(self, column: str, episode_tracker) -> np.ndarray:
+        """The profile of a column over the current episode of an `EpisodeTracker`."""
+        return self.slice(column, episode_tracker.episode_start_time_step, episode_tracker.episode_end_time_step)
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    @staticmethod
+    def __columns_path(path: Path) -> Path:
+        return path.with_name(f'{path.stem}.columns.json')
+
+
+class ProfileStreamer:
+    """Episode windows of many profiles of a `ProfileStore`, read from disk in chunks and prefetched in the background.
+
+    Only the chunk of the current episode, from its first time step to `prefetch_time_steps` past its last one,
+    is held in memory, plus the chunk being prefetched. While an episode runs, a background thread reads the
+    chunk of the next one, so that the reset to it does not wait for the disk. Episodes that fall within the
+    current chunk, e.g. sequential splits within the prefetch window, are served without any read.
+
+    Parameters
+    ----------
+    store: ProfileStore
+        The profiles.
+    columns: Sequence[str], optional
+        The streamed profiles, e.g. the load of every household. Defaults to all of them.
+    prefetch_time_steps: int
+        Number of time steps read past the end of an episode.
+    """
+
+    def __init__(self, store: ProfileStore, columns: Sequence[str] = None, prefetch_time_steps: int = 0):
+        self.store = store
+        self.columns: List[str] = list(store.columns if columns is None else columns)
+        self.prefetch_time_steps = prefetch_time_steps
+        self._indices = np.array([store.column_index[column] for column in self.columns], dtype=np.int64)
+        # (start_time_step, end_time_step, data) of the chunk in memory
+        self._chunk: Optional[Tuple[int, int, np.ndarray]] = None
+        # (start_time_step, end_time_step, future) of the chunk being prefetched
+        self._pending: Optional[Tuple[int, int, Future]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # number of chunks read in the foreground, because they were not prefetched
+        self.synchronous_reads = 0
+
+    def load(self, start_time_step: int, end_time_step: int) -> np.ndarray:
+        """
+        The profiles between two time steps, both included, as a read-only `[columns, time_steps]` view into the
+        chunk in memory. Waits for a prefetched chunk that covers them, or reads them if none does.
+        """
+        if not 0 <= start_time_step <= end_time_step < self.store.num_time_steps:
+            raise IndexError(f"Time steps [{start_time_step}, {end_time_step}] are out of the profile range [0, {self.store.num_time_steps - 1}]")
+        if not self.__covers(self._chunk, start_time_step, end_time_step):
+            if self.__covers(self._pending, start_time_step, end_time_step):
+                self._chunk = self._pending[:2] + (self._pending[2].result(),)
+                self._pending = None
+            else:
+                self._chunk = self.__read(*self.__chunk_range(start_time_step, end_time_step))
+                self.synchronous_reads += 1
+        chunk_start_time_step, _, data = self._chunk
+        return data[:, start_time_step - chunk_start_time_step:end_time_step - chunk_start_time_step + 1]
+
+    def prefetch(self, start_time_step: int, end_time_step: int):
+        """Starts reading the chunk of an upcoming episode in the background, unless it is already in memory."""
+        if self.__covers(self._chunk, start_time_step, end_time_step) or self.__covers(self._pending, start_time_step, end_time_step):
+            return
+        if self._pending is not None:
+            self._pending[2].cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profile-prefetch')
+        chunk_start_time_step, chunk_end_time_step = self.__chunk_range(start_time_step, end_time_step)
+        future = self._executor.submit(lambda: self.__read(chunk_start_time_step, chunk_end_time_step)[2])
+        self._pending = (chunk_start_time_step, chunk_end_time_step, future)
+
+    def episode(self, episode_tracker, upcoming_episode: Tuple[int, int] = None) -> np.ndarray:
+        """
+        The profiles over the current episode of an `EpisodeTracker`, prefetching the chunk of the
+        `upcoming_episode` (start and end time steps, see `EpisodeTracker.peek_next_episode`) if given.
+        """
+        profiles = self.load(episode_tracker.episode_start_time_step, episode_tracker.episode_end_time_step)
+        if upcoming_episode is not None:
+            self.prefetch(*upcoming_episode)
+        return profiles
+
+    def close(self):
+        """Stops the prefetch thread and releases the chunks."""
+        if self._pending is not None:
+            # at most one chunk is prefetched at a time, so cancelling it leaves no queued read
+            self._pending[2].cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._chunk = None
+        self._pending = None
+
+    def __enter__(self) -> 'ProfileStreamer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        return {'store': self.store, 'columns': self.columns, 'prefetch_time_steps': self.prefetch_time_steps}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __chunk_range(self, start_time_step: int, end_time_step: int) -> Tuple[int, int]:
+        return start_time_step, min(end_time_step + self.prefetch_time_steps, self.store.num_time_steps - 1)
+
+    def __read(self, start_time_step: int, end_time_step: int) -> Tuple[int, int, np.ndarray]:
+        # every profile is contiguous on disk, so only the pages of the chunk are read
+        data = self.store.data[self._indices, start_time_step:end_time_step + 1]
+        data.flags.writeable = False
+        return start_time_step, end_time_step, data
+
+    @staticmethod
+    def __covers(chunk, start_time_step: int, end_time_step: int) -> bool:
+        return chunk is not None and chunk[0] <= start_time_step and end_time_step <= chunk[1]
+
+
+class ProfileCursor:
+    """An integer time index into a profile array of shape `[time_steps]` or `[households, time_steps]`.
+
+    The array is never copied, so many cursors (e.g. the dynamics of many households) can read the same
+    array, including a `ProfileStore` mapping.
+
+    Parameters
+    ----------
+    profile: np.ndarray
+        The profile, time along the last axis.
+    start_time_step: int
+        Time step of the first value.
+    """
+
+    def __init__(self, profile: np.ndarray, start_time_step: int = 0):
+        self.profile = profile
+        self.start_time_step = start_time_step
+        self.time_step = start_time_step
+
+    @property
+    def num_time_steps(self) -> int:
+        return self.profile.shape[-1]
+
+    def reset(self, time_step: int = None):
+        self.time_step = self.start_time_step if time_step is None else time_step
+
+    def value(self, time_step: int = None):
+        """Value at `time_step`, by default the current one: a float, or an array with one value per household."""
+        value = self.profile[..., self.time_step if time_step is None else time_step]
+        return value.item() if np.ndim(value) == 0 else value
+
+    def window(self, horizon: int) -> np.ndarray:
+        """View of the next `horizon` values from the current time step, truncated at the end of the profile."""
+        return self.profile[..., self.time_step:self.time_step + horizon]
+
+    def advance(self):
+        self.time_step += 1
@@ -1,11 +1,13 @@
-from typing import Callable, Any, TypedDict
+from typing import Callable, Any, NamedTuple, TypedDict
 
 AmountPricePair = tuple[float, float]
 PriceList = list[AmountPricePair]
 ProductionPredFn = Callable[[Any, ...], PriceList]
 ProductionFn = Callable[[Any, ...], AmountPricePair]
 
-Bid = [float, float]
+class Bid(NamedTuple):
+    quantity:float
+    price:float
 
 class Bounds(TypedDict):
     low:Any
@@ -13,4 +15,22 @@ class Bounds(TypedDict):
     dtype:Any
     shape:Any
 
-      
+
+class Trajectory(TypedDict):
+    observations:Any
+    rewards:Any
+    terminations:Any
+    actions:Any
+
+
+class DispatchResult(TypedDict):
+    dispatch:Any
+    price:float
+    cost:float
+    duals:dict
+
+
+class ClearingResult(TypedDict):
+    demand:Any
+    workloads:Any
+    prices:Any
@@ -1,5 +1,7 @@
+import numpy as np
 from numpy.typing import ArrayLike
 
+from ..data.profiles import ProfileCursor
 from ..dynamics.energy_dynamcis import ConsumptionDynamics
 from ..model.action import EnergyAction
 from ..model.state import ConsumerState, State
@@ -15,23 +17,24 @@ class ElectricHeaterDynamics(ConsumptionDynamics):
         Parameters
         ----------
         action : ArrayLike
-            Action to be performed. Must be a numpy array.
+            Action to be performed. Must be a numpy array or a scalar.
         state : HeaterState
             Current state of the electric heater.
         return : float
             Electric heater consumption in [kW].
         """
-        value = action[0]
+        value = np.ravel(action)[0]
         if value is not None:
             new_state = state.copy()
-            new_state.consumption = min(value, state.max_electric_power)
+            new_state['consumption'] = min(value, state['max_electric_power'])
             return new_state	
         else:
             raise ValueError('Invalid action')
 
     
-    def predict(self, action, params, state):
-        pass
+    def predict(self, action: EnergyAction, params= None, state:State=None):
+        """Same as `do`, which already returns a new state."""
+        return self.do(action, state)
 
     def get_current_consumption_capability(self):
         pass
@@ -48,8 +51,59 @@ class PCSUnitConsumptionDynamics(ConsumptionDynamics):
     def do(self, action: EnergyAction, state:State=None , params= None) -> float:
         return 8
 
+    def predict(self, action: EnergyAction, state:State=None , params= None) -> float:
+        return self.do(action, state, params)
+
+    def predict_batch(self, actions: np.ndarray, state:State=None , params= None) -> np.ndarray:
+        return np.full(len(actions), self.do(None, state, params), dtype=np.float64)
+
     def get_current_consumption_capability(self):
         pass
 
     def predict_consumption_capability(self, state):
-        pass
\ No newline at end of file
+        pass
+
+
+class ProfileConsumptionDynamics(ConsumptionDynamics):
+    """Consumption read from a load profile by time index, e.g. a `ProfileStore` column.
+
+    With a `[households, time_steps]` profile and no `household`, every call returns the consumption of all
+    households at once.
+
+    Parameters
+    ----------
+    profile : np.ndarray
+        Consumption of shape `[time_steps]` or `[households, time_steps]`, in [kW].
+    household : int, optional
+        Row of a 2-D profile read by these dynamics.
+    start_time_step : int
+        Time step of the first `do`.
+    """
+    def __init__(self, profile: np.ndarray, household: int = None, start_time_step: int = 0) -> None:
+        super().__init__()
+        self.cursor = ProfileCursor(profile if household is None else profile[household], start_time_step)
+
+    def do(self, action: EnergyAction = None, state:State=None , params= None):
+        """Consumption at the current time step, then advances to the next time step."""
+        consumption = self.cursor.value()
+        self.cursor.advance()
+        return consumption
+
+    def predict(self, action: EnergyAction = None, state:State=None , params= None):
+        """Same as `do`, without advancing the time step."""
+        return self.cursor.value()
+
+    def predict_batch(self, actions: np.ndarray, state:State=None , params= None) -> np.ndarray:
+        """Consumption for `K` candidate actions, of shape `[K]`, or `[K, households]` for a 2-D profile."""
+        consumption = self.cursor.value()
+        return np.full((len(actions),) + np.shape(consumption), consumption, dtype=np.float64)
+
+    def reset(self, time_step: int = None):
+        self.cursor.reset(time_step)
+
+    def get_current_consumption_capability(self):
+        return self.cursor.value()
+
+    def predict_consumption_capability(self, state=None, horizon: int = 1) -> np.ndarray:
+        """View of the consumption over the next `horizon` time steps."""
+        return self.cursor.window(horizon)
@@ -1,4 +1,7 @@
 from abc import abstractmethod
+from collections.abc import Mapping
+
+import numpy as np
 
 from .params import DynamicsParams
 from ..config import DEFAULT_PRODUCTION
@@ -24,6 +27,25 @@ class EnergyDynamics():
     def predict(self, action: EnergyAction, state:State = None, params = None):
         pass
 
+    def predict_batch(self, actions: np.ndarray, state: State = None, params = None) -> np.ndarray:
+        """
+        Predict the outcome of every candidate action in `actions` from the same `state`.
+
+        Parameters:
+        actions (np.ndarray): `K` candidate action values, one per row.
+        state (State): The state all candidates start from.
+
+        Returns:
+        np.ndarray: The `K` predicted outcomes stacked along the first axis. State predictions are stacked
+        as rows of their values.
+
+        Dynamics with a vectorized transition override this loop over `predict`.
+        """
+        predictions = [self.predict(action=action, state=state, params=params) for action in actions]
+        if predictions and isinstance(predictions[0], Mapping):
+            predictions = [list(prediction.values()) for prediction in predictions]
+        return np.asarray(predictions)
+
 
 class ProductionDynamics(EnergyDynamics):
 
@@ -1,7 +1,9 @@
 from ..config import DEFAULT_PRODUCTION
+from ..data.profiles import ProfileCursor
 from ..dynamics.energy_dynamcis import  ProductionDynamics
 from ..model.action import EnergyAction
 from ..model.state import State
+import numpy as np
 from numpy.typing import ArrayLike
 
 class PVDynamics(ProductionDynamics):
@@ -19,13 +21,68 @@ class PVDynamics(ProductionDynamics):
             return self.get_current_production(state,params)
     def get_current_production(self, state, params):
         return DEFAULT_PRODUCTION
-    def predict(self, action, params, state):
-        pass
+    def predict(self, action: EnergyAction, state:State=None, params= None) -> float:
+        """Solar generation output for `action`. PV output does not depend on past actions, so this matches `do`."""
+        return self.do(action, state, params)
+
+    def predict_batch(self, actions: np.ndarray, state:State=None, params= None) -> np.ndarray:
+        """Solar generation output for `K` candidate production actions."""
+        return np.asarray(actions, dtype=np.float64).reshape(-1)
 
     def get_current_production_capability(self):
         pass
 
     def predict_production_capability(self, state):
         pass
-    
 
+
+class ProfilePVDynamics(ProductionDynamics):
+    """PV production read from a generation profile by time index, e.g. a `ProfileStore` column.
+
+    With a `[households, time_steps]` profile and no `household`, every call returns the production of all
+    households at once.
+
+    Parameters
+    ----------
+    profile : np.ndarray
+        Available production of shape `[time_steps]` or `[households, time_steps]`.
+    household : int, optional
+        Row of a 2-D profile read by these dynamics.
+    start_time_step : int
+        Time step of the first `do`.
+    """
+    def __init__(self, profile: np.ndarray, household: int = None, start_time_step: int = 0) -> None:
+        super().__init__()
+        self.cursor = ProfileCursor(profile if household is None else profile[household], start_time_step)
+
+    def do(self, action: EnergyAction = None, state:State=None , params= None):
+        """Production at the current time step, curtailed to `action['produce']` if given, then advances to the next time step."""
+        production = self.predict(action, state, params)
+        self.cursor.advance()
+        return production
+
+    def predict(self, action: EnergyAction = None, state:State=None , params= None):
+        """Same as `do`, without advancing the time step."""
+        production = self.cursor.value()
+        value = action.get('produce') if action is not None else None
+        return production if value is None else np.minimum(value, production)
+
+    def predict_batch(self, actions: np.ndarray, state:State=None, params= None) -> np.ndarray:
+        """Production for `K` candidate production actions, of shape `[K]`, or `[K, households]` for a 2-D profile."""
+        production = self.cursor.value()
+        # one action per candidate, applied to every household
+        actions = np.asarray(actions, dtype=np.float64).reshape((-1,) + (1,) * np.ndim(production))
+        return np.minimum(actions, production)
+
+    def reset(self, time_step: int = None):
+        self.cursor.reset(time_step)
+
+    def get_current_production(self, state=None, params=None):
+        return self.cursor.value()
+
+    def get_current_production_capability(self):
+        return self.cursor.value()
+
+    def predict_production_capability(self, state=None, horizon: int = 1) -> np.ndarray:
+        """View of the available production over the next `horizon` time steps."""
+        return self.cursor.window(horizon)
@@ -1,12 +1,81 @@
+import math
+
 import numpy as np
-from functools import partial
 
 from .energy_dynamcis import StorageDynamics
-from ..model.state import StorageState
+from ..model.state import StorageState, StorageArrayState
 from ..model.action import StorageAction, EnergyAction
-from ..config import MIN_CHARGE, MIN_EXPONENT, MAX_EXPONENT, DEFAULT_LIFETIME_CONSTANT
+from ..config import MIN_CHARGE, MIN_EXPONENT, MAX_EXPONENT, DEFAULT_LIFETIME_CONSTANT, INITIAL_TIME
 from ..utils.utils import move_time_tick
 
+# columns of a storage state array that decay with the degradation factor
+DEGRADING_FIELDS = [StorageArrayState.field_index[name] for name in
+                    ('energy_capacity', 'power_capacity', 'charging_efficiency', 'discharging_efficiency')]
+
+
+def degradation_factor(current_time, lifetime_constant):
+    """Multiplicative degradation applied to a battery at `current_time`.
+
+    The factor is ``exp(-current_time / lifetime_constant)`` with the exponent clamped to
+    [`MIN_EXPONENT`, `MAX_EXPONENT`], and 1 where `lifetime_constant` is 0. Scalars are handled
+    with `math.exp`; arrays are evaluated element-wise with broadcasting.
+    """
+    if np.ndim(current_time) == 0 and np.ndim(lifetime_constant) == 0:
+        if lifetime_constant == 0:
+            return 1.0
+        exponent = float(current_time) / float(lifetime_constant)
+        return math.exp(-max(MIN_EXPONENT, min(MAX_EXPONENT, exponent)))
+
+    current_time = np.asarray(current_time, dtype=np.float64)
+    lifetime_constant = np.asarray(lifetime_constant, dtype=np.float64)
+    shape = np.broadcast_shapes(current_time.shape, lifetime_constant.shape)
+    degrading = np.broadcast_to(lifetime_constant != 0, shape)
+    exponent = np.divide(current_time, lifetime_constant, out=np.zeros(shape), where=degrading)
+    return np.exp(-np.clip(exponent, MIN_EXPONENT, MAX_EXPONENT))
+
+
+class DegradationTable:
+    """Degradation factors precomputed over an episode horizon.
+
+    Since `current_time` advances by exactly one tick per step, the factors for
+    ``current_time = start_time, ..., start_time + horizon - 1`` can be computed once and looked up
+    afterwards. Times are expected to be whole ticks; times outside the horizon fall back to
+    :py:func:`degradation_factor`.
+
+    Parameters
+    ----------
+    lifetime_constant: float or np.ndarray
+        Lifetime constant of a single battery, or a 1-D array with one entry per battery.
+    horizon: int
+        Number of time steps to precompute.
+    start_time: int, optional
+        Time of the first precomputed step.
+    """
+
+    def __init__(self, lifetime_constant, horizon: int, start_time: int = INITIAL_TIME):
+        self.lifetime_constant = np.asarray(lifetime_constant, dtype=np.float64)
+        if self.lifetime_constant.ndim > 1:
+            raise ValueError('lifetime_constant must be a scalar or a 1-D array')
+        self.start_time = start_time
+        times = start_time + np.arange(horizon, dtype=np.float64)
+        # [horizon] for a single battery, [horizon, n_batteries] for an array of batteries
+        self.factors = degradation_factor(times.reshape((horizon,) + (1,) * self.lifetime_constant.ndim), self.lifetime_constant)
+
+    def __len__(self):
+        return len(self.factors)
+
+    def __call__(self, current_time):
+        """Looks up the factors for `current_time`, whose last axis matches the batteries of the table."""
+        current_time = np.asarray(current_time)
+        index = current_time.astype(np.intp) - self.start_time
+        if index.size == 0 or index.min() < 0 or index.max() >= len(self.factors):
+            return degradation_factor(current_time, self.lifetime_constant)
+        if self.lifetime_constant.ndim == 0:
+            return self.factors.take(index)
+        # row-major offsets into the [horizon, n_batteries] table
+        n_batteries = self.lifetime_constant.shape[0]
+        return self.factors.take(index * n_batteries + np.arange(n_batteries))
+
 
 class BatteryDynamics(StorageDynamics):
     def __init__(self) -> None:
@@ -29,6 +98,8 @@ class BatteryDynamics(StorageDynamics):
         lifetime_constant = DEFAULT_LIFETIME_CONSTANT
         if params and 'lifetime_constant' in params:
             lifetime_constant = params.get('lifetime_constant')
+        if value is not None and isinstance(state, StorageArrayState):
+            return self._do_inplace(value, state, lifetime_constant)
         if value is not None:
             new_state = state.copy()
             if value > MIN_CHARGE: # Charge
@@ -36,28 +107,90 @@ class BatteryDynamics(StorageDynamics):
             else: # Discharge
                 new_state['state_of_charge'] = max(state['state_of_charge'] + value, MIN_CHARGE)
 
-            exp_mult = partial(self.exp_mult, state=state, lifetime_constant=lifetime_constant)
-            new_state['energy_capacity'] = exp_mult(state['energy_capacity'])
-            new_state['power_capacity'] =  exp_mult(state['power_capacity'])
-            new_state['charging_efficiency'] = exp_mult(state['charging_efficiency'])
-            new_state['discharging_efficiency'] =  exp_mult(state['discharging_efficiency'])
+            # the same factor applies to all degrading quantities, so it is computed once
+            factor = degradation_factor(state['current_time'], lifetime_constant)
+            new_state['energy_capacity'] = state['energy_capacity'] * factor
+            new_state['power_capacity'] = state['power_capacity'] * factor
+            new_state['charging_efficiency'] = state['charging_efficiency'] * factor
+            new_state['discharging_efficiency'] = state['discharging_efficiency'] * factor
             new_state['current_time'] = move_time_tick(new_state['current_time'])
             return new_state	
         else:
             raise ValueError('Invalid action')
 
-    def predict(self, action: EnergyAction, state: StorageState=None, params= None):
-        pass
-    
+    @staticmethod
+    def _do_inplace(value: float, state: StorageArrayState, lifetime_constant: float) -> StorageArrayState:
+        """Same transition as `do`, written into the buffer of an array-backed state."""
+        values = state.array
+        index = state.field_index
+        soc = values[index['state_of_charge']] + value
+        if value > MIN_CHARGE: # Charge
+            values[index['state_of_charge']] = min(soc, values[index['energy_capacity']])
+        else: # Discharge
+            values[index['state_of_charge']] = max(soc, MIN_CHARGE)
+
+        if lifetime_constant != 0:
+            values[DEGRADING_FIELDS] *= degradation_factor(values[index['current_time']].item(), lifetime_constant)
+        values[index['current_time']] = move_time_tick(values[index['current_time']])
+        return state
+
+    @staticmethod
+    def do_batch(charge: np.ndarray, states: np.ndarray, lifetime_constant=DEFAULT_LIFETIME_CONSTANT,
+                 degradation: DegradationTable = None) -> np.ndarray:
+        """Perform charge actions on an array of batteries in place.
+
+            parameters
+            ----------
+            charge : Numpy array
+                Charge action of every battery, broadcastable to ``states.shape[:-1]``.
+            states : Numpy array
+                Battery states of shape ``[..., len(StorageArrayState.fields)]`` with the columns
+                ordered as `StorageArrayState.fields`. Updated in place.
+            lifetime_constant : float or Numpy array
+                Lifetime constant of every battery, broadcastable to ``states.shape[:-1]``.
+            degradation : DegradationTable, optional
+                Precomputed degradation factors to look up instead of evaluating `np.exp`.
+            return : Numpy array
+                The updated `states`.
+        """
+        index = StorageArrayState.field_index
+        state_of_charge = states[..., index['state_of_charge']]
+        current_time = states[..., index['current_time']]
+
+        new_soc = state_of_charge + charge
+        state_of_charge[...] = np.where(charge > MIN_CHARGE,
+                                        np.minimum(new_soc, states[..., index['energy_capacity']]), # Charge
+                                        np.maximum(new_soc, MIN_CHARGE)) # Discharge
+
+        factor = degradation(current_time) if degradation is not None else degradation_factor(current_time, lifetime_constant)
+        for field in DEGRADING_FIELDS:
+            states[..., field] *= factor
+        current_time[...] = move_time_tick(current_time)
+        return states
+
+    def predict(self, action: EnergyAction, state: StorageState=None, params= None) -> StorageState:
+        """Same transition as `do`, returning a new state and leaving `state` unchanged."""
+        if isinstance(state, StorageArrayState):
+            state = state.copy()
+        return self.do(action, state, params)
+
+    def predict_batch(self, actions: np.ndarray, state: StorageState=None, params= None) -> np.ndarray:
+        """Predicts `K` candidate charge actions from the same `state` in one `do_batch` call.
+
+            return : Numpy array
+                Predicted states of shape ``[K, len(StorageArrayState.fields)]``, columns ordered as `StorageArrayState.fields`.
+        """
+        charge = np.asarray(actions, dtype=np.float64).reshape(-1)
+        lifetime_constant = DEFAULT_LIFETIME_CONSTANT
+        if params and 'lifetime_constant' in params:
+            lifetime_constant = params.get('lifetime_constant')
+        state_array = state.array if isinstance(state, StorageArrayState) else StorageArrayState.from_state(state).array
+        states = np.tile(state_array, (len(charge), 1))
+        return self.do_batch(charge, states, lifetime_constant)
+
     @staticmethod
     def exp_mult(x, state, lifetime_constant):
-        if lifetime_constant == 0:
-            return x  # or handle the zero division case in another way
-        else:
-            # Clamp the exponent value to prevent overflow
-            exponent = state.current_time / float(lifetime_constant)
-            exponent =  max(MIN_EXPONENT, min(MAX_EXPONENT, exponent))
-            return x * np.exp(-exponent)
+        return x * degradation_factor(state['current_time'], lifetime_constant)
         
 
     
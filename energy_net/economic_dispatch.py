@@ -0,0 +1,135 @@
+from typing import Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from .defs import DispatchResult
+from .market_clearing import merit_order_clearing
+
+_DISPATCH_TOLERANCE = 1e-9
+
+
+def economic_dispatch(demand: float, capacities: Sequence[float], costs: Sequence[float],
+                      A_ub=None, b_ub: Sequence[float] = None, method: str = 'auto') -> DispatchResult:
+    """
+    Solves the linear economic dispatch problem
+
+        min  costs @ x
+        s.t. sum(x) == demand
+             A_ub @ x <= b_ub
+             0 <= x <= capacities
+
+    Without additional constraints the problem is solved exactly by merit order (sorting by cost).
+    Otherwise it is solved as a linear program with HiGHS.
+
+    Parameters
+    ----------
+    demand: float
+        The demand to cover.
+    capacities: Sequence[float]
+        Capacity of every generator.
+    costs: Sequence[float]
+        Marginal cost of every generator.
+    A_ub: array-like or sparse matrix, optional
+        Additional (e.g. network) constraints on the generators' outputs.
+    b_ub: Sequence[float], optional
+        Right-hand side of `A_ub`.
+    method: str
+        'greedy', 'highs' or 'auto', which picks 'greedy' when there are no additional constraints.
+
+    Returns
+    -------
+    DispatchResult
+        The output of every generator, the marginal price of the demand, the total cost, and the duals:
+        'demand' (same as the price), 'capacity' (one per generator, <= 0) and, for 'highs', 'constraints'
+        (one per row of `A_ub`, <= 0).
+
+    Raises
+    ------
+    ValueError
+        If the problem is infeasible or the method is unknown.
+    """
+    capacities = np.asarray(capacities, dtype=np.float64)
+    costs = np.asarray(costs, dtype=np.float64)
+    if method == 'auto':
+        method = 'greedy' if A_ub is None else 'highs'
+    if method == 'greedy':
+        if A_ub is not None:
+            raise ValueError("The greedy dispatch does not support additional constraints")
+        return _greedy_dispatch(demand, capacities, costs)
+    elif method == 'highs':
+        return _lp_dispatch(demand, capacities, costs, A_ub, b_ub)
+    else:
+        raise ValueError(f"Unknown dispatch method {method}")
+
+
+def _greedy_dispatch(demand: float, capacities: np.ndarray, costs: np.ndarray) -> DispatchResult:
+    if demand < 0 or demand > capacities.sum():
+        raise ValueError(f"Infeasible dispatch: demand {demand} is outside [0, {capacities.sum()}]")
+    dispatch, price, _ = merit_order_clearing(demand, capacities, costs)
+    # raising the capacity of a generator cheaper than the marginal one saves the difference in cost
+    capacity_duals = np.minimum(costs - price, 0.)
+    return DispatchResult(dispatch=dispatch, price=price, cost=float(costs @ dispatch),
+                          duals={'demand': price, 'capacity': capacity_duals})
+
+
+def _lp_dispatch(demand: float, capacities: np.ndarray, costs: np.ndarray, A_ub, b_ub) -> DispatchResult:
+    num_generators = len(costs)
+    A_eq = sp.csr_matrix(np.ones((1, num_generators)))
+    res = linprog(costs, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[demand],
+                  bounds=np.column_stack([np.zeros(num_generators), capacities]), method='highs')
+    if not res.success:
+        raise ValueError(f"Infeasible dispatch: {res.message}")
+    if A_ub is None:
+        # when the demand equals the capacity of the cheapest generators, any price up to the next cost is an
+        # optimal dual and HiGHS may return either; report the cost of the last dispatched one, as the merit order
+        dispatched = res.x > _DISPATCH_TOLERANCE
+        price = float(costs[dispatched].max() if dispatched.any() else costs.min())
+        duals = {'demand': price, 'capacity': np.minimum(costs - price, 0.)}
+    else:
+        duals = {'demand': float(res.eqlin.marginals[0]), 'capacity': res.upper.marginals,
+                 'constraints': res.ineqlin.marginals}
+    return DispatchResult(dispatch=res.x, price=duals['demand'], cost=float(res.fun), duals=duals)
+
+
+def dc_opf_dispatch(bus_demands: Sequence[float], capacities: Sequence[float], costs: Sequence[float],
+                    generator_buses: Sequence[int], ptdf: np.ndarray, line_capacities: Sequence[float]) -> DispatchResult:
+    """
+    Solves the economic dispatch under DC line limits, the flows being `ptdf @ (injections - bus_demands)`.
+
+    Parameters
+    ----------
+    bus_demands: Sequence[float]
+        Demand at every bus.
+    capacities: Sequence[float]
+        Capacity of every generator.
+    costs: Sequence[float]
+        Marginal cost of every generator.
+    generator_buses: Sequence[int]
+        Bus of every generator.
+    ptdf: np.ndarray
+        Power transfer distribution factors of shape `[lines, buses]`, e.g. from `DCPowerFlow.ptdf`.
+    line_capacities: Sequence[float]
+        Flow limit of every line, in both directions.
+
+    Returns
+    -------
+    DispatchResult
+        As `economic_dispatch` with 'highs', where 'price' is the price at the slack bus, and with the
+        locational marginal price of every bus in the 'lmp' dual.
+    """
+    bus_demands = np.asarray(bus_demands, dtype=np.float64)
+    line_capacities = np.asarray(line_capacities, dtype=np.float64)
+    generator_ptdf = ptdf[:, np.asarray(generator_buses, dtype=np.int64)]
+    demand_flows = ptdf @ bus_demands
+    # -capacity <= generator_ptdf @ x - demand_flows <= capacity
+    A_ub = np.vstack([generator_ptdf, -generator_ptdf])
+    b_ub = np.concatenate([line_capacities + demand_flows, line_capacities - demand_flows])
+    result = economic_dispatch(bus_demands.sum(), capacities, costs, A_ub=A_ub, b_ub=b_ub, method='highs')
+
+    num_lines = len(line_capacities)
+    upper, lower = result['duals']['constraints'][:num_lines], result['duals']['constraints'][num_lines:]
+    # a unit of demand at a bus adds to the balance and shifts both flow limits by its PTDF column
+    result['duals']['lmp'] = result['price'] + ptdf.T @ (upper - lower)
+    return result
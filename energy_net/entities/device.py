@@ -116,6 +116,8 @@ class StorageDevice(Device):
         self._power_capacity = self.init_state['power_capacity']
         self._energy_capacity = self.init_state['energy_capacity']
         self._state_of_charge = self.init_state['state_of_charge']
+        self._charging_efficiency = self.init_state['charging_efficiency']
+        self._discharging_efficiency = self.init_state['discharging_efficiency']
         super().reset()
         
 
@@ -7,27 +7,98 @@ from ..defs import Bounds
 from ..model.action import StorageAction
 from .device import StorageDevice
 from ..config import MIN_CHARGE, MIN_EFFICIENCY, MAX_EFFICIENCY, MIN_CAPACITY, MAX_CAPACITY, INITIAL_TIME, MAX_TIME
-from ..model.state import StorageState
+from ..model.state import StorageState, StorageArrayState
+
+
+_ENERGY_CAPACITY, _STATE_OF_CHARGE, _CHARGING, _DISCHARGING = (
+    StorageArrayState.field_index[field]
+    for field in ('energy_capacity', 'state_of_charge', 'charging_efficiency', 'discharging_efficiency'))
+
+
+def _compact_field(name: str) -> property:
+    """A `StorageDevice` attribute that lives in the array state of a compact battery, validated by the same setter."""
+    base = getattr(StorageDevice, name)
+    index = StorageArrayState.field_index[name]
+
+    def fget(self):
+        if self._array_state is None:
+            return base.fget(self)
+        return self._array_state.array[index].item()
+
+    def fset(self, value):
+        base.fset(self, value)
+        if self._array_state is not None:
+            self._array_state.array[index] = base.fget(self)
+
+    return property(fget, fset, doc=base.__doc__)
 
 
 class Battery(StorageDevice):
     """Base electricity storage class.
+
+    Parameters
+    ----------
+    compact_state : bool, default: False
+        Keep the state in a :py:class:`StorageArrayState` that the dynamics update in place. `current_state`
+        then returns that live, read-only view instead of building a new dict on every access, and the
+        storage attributes read from it.
     """
-    def __init__(self, storage_params:StorageParams, init_state:StorageState=None, init_time=None):
+    # lower bounds of the compact state's fields, `>` for the efficiencies as in the setters of `StorageDevice`
+    _ARRAY_LOWER_BOUNDS = np.array([MIN_CAPACITY, MIN_CAPACITY, MIN_CHARGE, np.nextafter(MIN_EFFICIENCY, np.inf),
+                                    np.nextafter(MIN_EFFICIENCY, np.inf), -np.inf])
+
+    energy_capacity = _compact_field('energy_capacity')
+    power_capacity = _compact_field('power_capacity')
+    state_of_charge = _compact_field('state_of_charge')
+    charging_efficiency = _compact_field('charging_efficiency')
+    discharging_efficiency = _compact_field('discharging_efficiency')
+
+    def __init__(self, storage_params:StorageParams, init_state:StorageState=None, init_time=None, compact_state:bool=False):
+        self._array_state = None
         super().__init__(storage_params=storage_params, init_state=init_state, init_time=init_time)
         self.action_type = StorageAction
         self.current_time = init_time
+        if compact_state:
+            self._array_state = StorageArrayState.from_state(self.init_state)
+            self.state = self._array_state
+
+    @property
+    def current_time(self):
+        if self._array_state is None:
+            return self._current_time
+        return self._array_state.array[StorageArrayState.field_index['current_time']].item()
+
+    @current_time.setter
+    def current_time(self, current_time):
+        self._current_time = current_time
+        if self._array_state is not None:
+            self._array_state.array[StorageArrayState.field_index['current_time']] = 0 if current_time is None else current_time
 
     @property
     def current_state(self) -> StorageState:
+        if self._array_state is not None:
+            return self._array_state
         return StorageState(energy_capacity = self.energy_capacity, power_capacity = self.power_capacity,
                     state_of_charge = self.state_of_charge, charging_efficiency = self.charging_efficiency,
                     discharging_efficiency = self.discharging_efficiency, current_time = self.current_time)
     
     def get_current_state(self) -> StorageState:
         return self.current_state
-    
+
     def update_state(self, state: StorageState) -> None:
+        if self._array_state is not None:
+            values = self._array_state.array
+            if state is not self._array_state:
+                self._array_state.assign(state)
+                # the checks of the setters, on the whole buffer at once
+                assert (values >= self._ARRAY_LOWER_BOUNDS).all(), f'storage state out of bounds: {self._array_state}'
+            # otherwise the dynamics wrote into the buffer: the charge stays within [MIN_CHARGE, capacity] and the
+            # degradation scales the rest by a positive factor, so only an underflow or the shrunk capacity can fail
+            assert values.item(_CHARGING) > MIN_EFFICIENCY and values.item(_DISCHARGING) > MIN_EFFICIENCY, \
+                'efficiencies must be > 0.'
+            assert values.item(_STATE_OF_CHARGE) <= values.item(_ENERGY_CAPACITY), 'state_of_charge must be <= capacity.'
+            self.state = self._array_state
+            return
         self.energy_capacity = state['energy_capacity']
         self.power_capacity = state['power_capacity']
         self.state_of_charge = state['state_of_charge']
@@ -43,6 +114,9 @@ class Battery(StorageDevice):
     def reset(self) -> StorageState:
         super().reset()
         self.reset_time()
+        if self._array_state is not None:
+            self._array_state.assign(self.init_state)
+            self.update_state(self._array_state)
         return self.get_current_state()
     
     def get_action_space(self) -> Bounds:
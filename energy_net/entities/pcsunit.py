@@ -5,7 +5,7 @@ from ..config import INITIAL_TIME, NO_CONSUMPTION, MAX_CONSUMPTION, NO_CHARGE, M
 from ..defs import Bounds
 from ..model.action import EnergyAction, StorageAction, TradeAction, ConsumeAction, ProduceAction
 from ..model.reward import RewardFunction
-from ..model.state import State
+from ..model.state import State, PCSUnitArrayState, StorageArrayState
 from ..network_entity import NetworkEntity, CompositeNetworkEntity, ElementaryNetworkEntity
 from ..entities.local_storage import Battery
 from ..entities.device import StorageDevice
@@ -15,13 +15,15 @@ from ..entities.local_producer import PrivateProducer
 class PCSUnit(CompositeNetworkEntity):
     """ A network entity that contains a list of sub-entities. The sub-entities are the devices and the pcsunit itself is the composite entity.
     The PCSUnit entity is responsible for managing the sub-entities and aggregating the reward.
+    With `compact_state=True` the storage devices and the unit itself keep array-backed states that are
+    updated in place, and `get_current_state` returns a live :py:class:`PCSUnitArrayState` view.
     """
-    def __init__(self, name: str, consumption_params_dict:dict[str,ConsumptionParams]=None, storage_params_dict:dict[str,StorageParams]=None, production_params_dict:dict[str,ProductionParams]=None, agg_func=None):
+    def __init__(self, name: str, consumption_params_dict:dict[str,ConsumptionParams]=None, storage_params_dict:dict[str,StorageParams]=None, production_params_dict:dict[str,ProductionParams]=None, agg_func=None, compact_state:bool=False):
 
         # holding the elements that should be considered for consumption, production and storage actions
         consumption_dict = {name: PSCUnitConsumption(params) for name, params in consumption_params_dict.items()}
         self.consumption_keys = list(consumption_dict.keys())
-        storage_dict = {name: Battery(storage_params=params, init_time=INITIAL_TIME) for name, params in storage_params_dict.items()}
+        storage_dict = {name: Battery(storage_params=params, init_time=INITIAL_TIME, compact_state=compact_state) for name, params in storage_params_dict.items()}
         self.storage_keys = list(storage_dict.keys())
         production_dict = {name: PrivateProducer(params) for name, params in production_params_dict.items()}
         self.production_keys = list(production_dict.keys())
@@ -35,14 +37,17 @@ class PCSUnit(CompositeNetworkEntity):
         
         self._init_state = State(storage=inital_soc, curr_consumption=NO_CONSUMPTION, pred_consumption=self.predict_next_consumption())
         self._state = self._init_state
+        self._array_state = PCSUnitArrayState() if compact_state else None
 
     def perform_joint_action(self, actions:dict[str, EnergyAction]):
         super().step(actions)
 
-    def step(self, action: StorageAction):
+    def step(self, action: Union[np.ndarray, StorageAction]):
+        if type(action) is np.ndarray:
+            action = StorageAction.from_numpy(action)
         # storage action
         current_storage = action['charge']
-        current_consumption = self._state['consumption']
+        current_consumption = self._state['curr_consumption']
         # this is how much we buy/sell to the grid
         pg = current_consumption+current_storage
 
@@ -84,14 +89,57 @@ class PCSUnit(CompositeNetworkEntity):
         # todo: remove
         return [8,8]
 
-    def predict(self, actions: Union[np.ndarray, dict[str, Any]]):
-        pass
+    def predict(self, actions: Union[np.ndarray, StorageAction]) -> Union[State, np.ndarray]:
+        """Predicts the unit state after `actions` without changing the unit.
+
+        The storage action is evaluated with the same semantics as `step`, from the predictions of the
+        sub-entities' dynamics. A `[K, A]` matrix of `K` candidate storage actions is evaluated in a single
+        vectorized pass and returns the `[K, len(PCSUnitArrayState.fields)]` predicted states.
+        """
+        if type(actions) is np.ndarray and actions.ndim == 2:
+            return self.__predict_batch(actions)
+        if type(actions) is np.ndarray:
+            actions = StorageAction.from_numpy(actions)
+        predicted = self.__predict_batch(np.array([[actions['charge']]], dtype=np.float64))[0]
+        return State(zip(PCSUnitArrayState.fields, predicted.tolist()))
 
     def predict_next_consumption(self) -> float:
         return sum([self.sub_entities[name].predict_next_consumption() for name in self.consumption_keys])
+
+    def __predict_batch(self, actions: np.ndarray) -> np.ndarray:
+        """Batched `predict`, mirroring `step`: column j charges the j-th storage device and the first
+        consumption entity consumes the current consumption. Entities without an action keep their state."""
+        sub_actions = {name: actions[:, j] for j, name in enumerate(self.storage_keys) if j < actions.shape[1]}
+        sub_actions[self.consumption_keys[0]] = np.full(len(actions), self._state['curr_consumption'], dtype=np.float64)
+        predicted = np.empty((len(actions), len(PCSUnitArrayState.fields)))
+        for column, value in enumerate(self.__aggregate(CompositeNetworkEntity.predict_batch(self, sub_actions))):
+            predicted[:, column] = value
+        return predicted
+
+    def __aggregate(self, predicted: dict[str, np.ndarray] = None) -> tuple:
+        """`(storage, curr_consumption, pred_consumption)` of the unit. The `[K, ...]` predictions of the entities
+        in `predicted` replace their current state, and the totals are then arrays of `K` values."""
+        predicted = predicted or {}
+        soc_index = StorageArrayState.field_index['state_of_charge']
+        storage = 0
+        for name in self.storage_keys:
+            storage = storage + (predicted[name][:, soc_index] if name in predicted else self.sub_entities[name].state_of_charge)
+        curr_consumption = 0
+        pred_consumption = 0
+        for name in self.consumption_keys:
+            if name in predicted:
+                curr_consumption = curr_consumption + predicted[name][:, 0]
+                pred_consumption = pred_consumption + predicted[name][:, 1]
+            else:
+                entity = self.sub_entities[name]
+                curr_consumption += entity.consumption or 0
+                pred_consumption += entity.next_consumption or 0
+        return storage, curr_consumption, pred_consumption
   
 
     def get_current_state(self) -> State:
+        if self._array_state is not None:
+            return self.__aggregate_array_state()
         sum_dict = {}
         for entity_name in self.sub_entities:
             cur_state = self.sub_entities[entity_name].get_current_state()
@@ -101,11 +149,28 @@ class PCSUnit(CompositeNetworkEntity):
                 sum_dict[k] = sum_dict.get(k, 0) + v
         return State(storage=sum_dict['state_of_charge'], curr_consumption=sum_dict['consumption'], pred_consumption=sum_dict['next_consumption'])
 
+    def __aggregate_array_state(self) -> PCSUnitArrayState:
+        """Writes the aggregated state into the preallocated buffer without building intermediate dicts."""
+        self._array_state.array[:] = self.__aggregate()
+        return self._array_state
+
 
     def update_state(self, state: State):
         for entity in self.sub_entities:
             entity.update_state(state[entity.name])
 
+    def snapshot(self) -> tuple[dict, State]:
+        return super().snapshot(), self._state.copy()
+
+    def restore(self, snapshot: tuple[dict, State]) -> None:
+        sub_entities_snapshot, state = snapshot
+        super().restore(sub_entities_snapshot)
+        if self._array_state is not None and isinstance(state, PCSUnitArrayState):
+            self._array_state.assign(state)
+            self._state = self._array_state
+        else:
+            self._state = state.copy()
+
     def get_observation_space(self) -> Bounds:
         low = np.array([NO_CHARGE, NO_CONSUMPTION, NO_CONSUMPTION])
         high = np.array([MAX_CAPACITY, MAX_CONSUMPTION, MAX_CONSUMPTION])
@@ -154,22 +219,39 @@ class PCSUnit(CompositeNetworkEntity):
         return sum([self.sub_entities[name].predict_next_consumption() for name in self.consumption_keys])
 
 class PSCUnitConsumption(ElementaryNetworkEntity):
+    """Consumption of a PCSUnit. The state is kept in the `consumption` and `next_consumption` attributes,
+    so that a step does not allocate a state dict."""
     def __init__(self, consumption_params:ConsumptionParams):
         super().__init__(name=consumption_params["name"],energy_dynamics=consumption_params["energy_dynamics"])
-        self._state = self.reset()
+        self.reset()
 
     def predict_next_consumption(self, param: ConsumptionParams = None) -> float:
         return PRED_CONST_DUMMY
 
     def step(self, action: ConsumeAction):
         # Update the state with the current consumption
-        self._state =  State(consumption=action['consume'], next_consumption=self.predict_next_consumption())
+        self.consumption = action['consume']
+        self.next_consumption = self.predict_next_consumption()
 
     def reset(self) -> State:
-        return State(consumption=NO_CONSUMPTION, next_consumption=self.predict_next_consumption())
+        self.consumption = NO_CONSUMPTION
+        self.next_consumption = self.predict_next_consumption()
+        return self.get_current_state()
     
     def get_current_state(self):
-        return self._state
+        return State(consumption=self.consumption, next_consumption=self.next_consumption)
+
+    def predict_batch(self, actions: np.ndarray, state: State = None) -> np.ndarray:
+        """`[K, 2]` predicted `(consumption, next_consumption)` of `K` candidate consumptions, as in `step`."""
+        consume = np.asarray(actions, dtype=np.float64).reshape(-1)
+        return np.column_stack([consume, np.full(len(consume), self.predict_next_consumption(), dtype=np.float64)])
+
+    def snapshot(self) -> State:
+        return self.get_current_state()
+
+    def restore(self, snapshot: State) -> None:
+        self.consumption = snapshot['consumption']
+        self.next_consumption = snapshot['next_consumption']
 
     def get_observation_space(self):
         low = NO_CONSUMPTION
@@ -200,3 +282,6 @@ class DefaultPCSUnitRewardFunction(RewardFunction):
         # assert time_steps is not None
         # return  -1 * (production if time_steps  == 0 else 2 * production)
         return -1 * action.item()
+
+    def calculate_batch(self, curr_states, actions, next_states, **kwargs) -> np.ndarray:
+        return -1 * actions.sum(axis=-1)
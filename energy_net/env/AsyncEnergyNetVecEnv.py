@@ -0,0 +1,220 @@
+import multiprocessing as mp
+import traceback
+from typing import Any, Callable, List, Optional, Sequence
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvIndices, VecEnvObs, VecEnvStepReturn
+
+from ..utils.shared_memory import SharedArray
+
+
+def _worker(remote, parent_remote, env_fn_wrapper: CloudpickleWrapper, env_index: int):
+    parent_remote.close()
+    env = env_fn_wrapper.var()
+    shared = []
+    buffers = None
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'close':
+                env.close()
+                break
+            try:
+                if command == 'step':
+                    observations, actions, rewards, dones, terminal_observations = buffers
+                    observation, reward, terminated, truncated, info = env.step(actions[env_index].copy())
+                    done = terminated or truncated
+                    info['TimeLimit.truncated'] = truncated and not terminated
+                    reset_info = None
+                    if done:
+                        # the terminal observation is read from shared memory by the parent
+                        terminal_observations[env_index] = observation
+                        observation, reset_info = env.reset()
+                    observations[env_index] = observation
+                    rewards[env_index] = reward
+                    dones[env_index] = done
+                    result = (info, reset_info)
+                elif command == 'reset':
+                    seed, options = data
+                    observation, result = env.reset(seed=seed, **({'options': options} if options else {}))
+                    buffers[0][env_index] = observation
+                elif command == 'attach':
+                    shared = [SharedArray(*spec) for spec in data]
+                    buffers = [buffer.array for buffer in shared]
+                    result = None
+                elif command == 'get_spaces':
+                    result = (env.observation_space, env.action_space)
+                elif command == 'render':
+                    result = env.render()
+                elif command == 'env_method':
+                    method_name, method_args, method_kwargs = data
+                    result = env.get_wrapper_attr(method_name)(*method_args, **method_kwargs)
+                elif command == 'get_attr':
+                    result = env.get_wrapper_attr(data)
+                elif command == 'set_attr':
+                    result = setattr(env, data[0], data[1])
+                elif command == 'is_wrapped':
+                    result = is_wrapped(env, data)
+                else:
+                    raise ValueError(f"Unknown command {command}")
+                remote.send(('ok', result))
+            except Exception:
+                # sent back to the parent, which raises it, and the worker keeps serving
+                remote.send(('error', traceback.format_exc()))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buffers = None
+        for buffer in shared:
+            buffer.close()
+        remote.close()
+
+
+class AsyncEnergyNetVecEnv(VecEnv):
+    """Vectorized environment that runs one environment per worker process.
+
+    Unlike stable-baselines3's `SubprocVecEnv`, actions, observations, rewards and done flags are
+    exchanged through `multiprocessing.shared_memory` buffers sized from the environments'
+    observation and action spaces, so a step only sends a short command over each pipe and the
+    (usually empty) info dicts back. Meant for environments with expensive dynamics, where the
+    step of each copy is worth running in its own process.
+
+    Parameters
+    ----------
+    env_fns: List[Callable[[], gym.Env]]
+        Functions creating the environments, e.g. `single_entity_v0.gym_env` with fixed arguments.
+        All environments must share the observation and action spaces.
+    start_method: str, optional
+        `multiprocessing` start method. Defaults to 'forkserver' where available, and 'spawn' otherwise.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: str = None):
+        self.waiting = False
+        self.closed = False
+        num_envs = len(env_fns)
+
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        context = mp.get_context(start_method)
+
+        self.remotes = []
+        self.processes = []
+        for env_index, env_fn in enumerate(env_fns):
+            remote, work_remote = context.Pipe()
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), env_index)
+            # daemonic, so that the workers exit with the parent
+            process = context.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.remotes[0].send(('get_spaces', None))
+        observation_space, action_space = self.__gather(self.remotes[:1])[0]
+        super().__init__(num_envs, observation_space, action_space)
+
+        # one row per environment, shared with all workers
+        self._shared = [SharedArray((num_envs,) + observation_space.shape, observation_space.dtype),
+                        SharedArray((num_envs,) + action_space.shape, action_space.dtype),
+                        SharedArray((num_envs,), np.float32),
+                        SharedArray((num_envs,), bool),
+                        SharedArray((num_envs,) + observation_space.shape, observation_space.dtype)]
+        self._observations, self._actions, self._rewards, self._dones, self._terminal_observations = \
+            [buffer.array for buffer in self._shared]
+        specs = [buffer.spec() for buffer in self._shared]
+        for remote in self.remotes:
+            remote.send(('attach', specs))
+        self.__gather(self.remotes)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions[:] = np.asarray(actions).reshape(self._actions.shape)
+        for remote in self.remotes:
+            remote.send(('step', None))
+        self.waiting = True
+
+    def step_wait(self) -> VecEnvStepReturn:
+        self.waiting = False
+        results = self.__gather(self.remotes)
+        infos = []
+        for env_index, (info, reset_info) in enumerate(results):
+            if self._dones[env_index]:
+                info['terminal_observation'] = self._terminal_observations[env_index].copy()
+                self.reset_infos[env_index] = reset_info
+            infos.append(info)
+        return self._observations.copy(), self._rewards.copy(), self._dones.copy(), infos
+
+    def reset(self) -> VecEnvObs:
+        for env_index, remote in enumerate(self.remotes):
+            remote.send(('reset', (self._seeds[env_index], self._options[env_index])))
+        self.reset_infos = self.__gather(self.remotes)
+        # the seeds and options apply to this reset only
+        self._reset_seeds()
+        self._reset_options()
+        return self._observations.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            try:
+                remote.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        self._observations = self._actions = self._rewards = self._dones = self._terminal_observations = None
+        for buffer in self._shared:
+            buffer.close()
+        self.closed = True
+
+    def get_images(self) -> Sequence[Optional[np.ndarray]]:
+        for remote in self.remotes:
+            remote.send(('render', None))
+        return self.__gather(self.remotes)
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        target_remotes = self._get_target_remotes(indices)
+        for remote in target_remotes:
+            remote.send(('get_attr', attr_name))
+        return self.__gather(target_remotes)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        target_remotes = self._get_target_remotes(indices)
+        for remote in target_remotes:
+            remote.send(('set_attr', (attr_name, value)))
+        self.__gather(target_remotes)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        target_remotes = self._get_target_remotes(indices)
+        for remote in target_remotes:
+            remote.send(('env_method', (method_name, method_args, method_kwargs)))
+        return self.__gather(target_remotes)
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        target_remotes = self._get_target_remotes(indices)
+        for remote in target_remotes:
+            remote.send(('is_wrapped', wrapper_class))
+        return self.__gather(target_remotes)
+
+    def _get_target_remotes(self, indices: VecEnvIndices) -> list:
+        return [self.remotes[i] for i in self._get_indices(indices)]
+
+    def __gather(self, remotes: list) -> list:
+        """Receives the results of a command from every remote, and raises the first error of a worker, if any."""
+        results = []
+        errors = []
+        for remote in remotes:
+            status, result = remote.recv()
+            if status == 'error':
+                errors.append(result)
+            else:
+                results.append(result)
+        if errors:
+            raise RuntimeError(f"Environment worker failed:\n{errors[0]}")
+        return results
@@ -1,6 +1,5 @@
-from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Union
+from typing import Any, Callable, List, Mapping, Union
 
 import numpy as np
 from gymnasium.spaces import Box, Dict
@@ -8,13 +7,15 @@ from gymnasium.utils import seeding
 from pettingzoo import ParallelEnv
 
 from ..config import DEFAULT_TIME_STEP
-from ..defs import Bounds
+from ..defs import Bounds, Trajectory
 from ..entities.pcsunit import DefaultPCSUnitRewardFunction
-from ..env.base import Environment, EpisodeTracker
+from ..env.base import Environment, EpisodeScheduler, EpisodeTracker
 from ..model.action import EnergyAction
 from ..model.reward import RewardFunction
 from ..network_entity import NetworkEntity
-from ..utils.env_utils import bounds_to_gym_box
+from ..utils.env_utils import bounds_to_gym_box, gym_box_matches_bounds
+from ..utils.shared_memory import SharedArray
+from .sharding import EntityShardPool, step_entity
 
 
 class EnergyNetEnv(ParallelEnv, Environment):
@@ -34,21 +35,25 @@ class EnergyNetEnv(ParallelEnv, Environment):
         seconds_per_time_step: float = None,
         initial_seed: int = None,
         reward_function: RewardFunction = None,
+        copy_observations: bool = True,
+        num_workers: int = None,
+        episode_scheduler: EpisodeScheduler = None,
         **kwargs: Any):
 
         # set the root directory
         self.root_directory = root_directory
-        self.episode_tracker = EpisodeTracker(simulation_start_time_step, simulation_end_time_step)
+        self.episode_tracker = EpisodeTracker(simulation_start_time_step, simulation_end_time_step, episode_scheduler=episode_scheduler)
         super().__init__(seconds_per_time_step=seconds_per_time_step, random_seed=initial_seed, episode_tracker=self.episode_tracker)
 
 
-        self.network_entities = network_entities 
+        self.__network_entities = network_entities
+        self.__shard_pool = None
         self.timestep = None
         self.episode_time_steps = episode_time_steps
         self.simulation_start_time_step = simulation_start_time_step
         self.simulation_end_time_step = simulation_end_time_step
         self.time_step_num = simulation_end_time_step - simulation_start_time_step if simulation_end_time_step is not None and simulation_start_time_step is not None else DEFAULT_TIME_STEP
-        self.num_entities = len(self.network_entities)
+        self.num_entities = len(network_entities)
         
 
         # set random seed if specified
@@ -56,12 +61,31 @@ class EnergyNetEnv(ParallelEnv, Environment):
         self.seed(initial_seed)
 
         # pettingzoo required attributes
-        self.entities = {entity.name: entity for _, entity in enumerate(self.network_entities)}
-        self.possible_agents = list(self.entities.keys())
+        self.__entities = {entity.name: entity for _, entity in enumerate(network_entities)}
+        self.possible_agents = list(self.__entities.keys())
         self.agents = []
         
         # set reward function
         self.reward_function = reward_function if reward_function is not None else DefaultPCSUnitRewardFunction(env_metadata=self.get_metadata)
+
+        # preallocated observation buffers that the entities write into
+        self.copy_observations = copy_observations
+        self.__observation_space = self.get_observation_space()
+        self.__shared_observations = None
+        self.__init_observation_buffers(shared=num_workers is not None)
+
+        # optionally step the entities in worker processes; the workers then own the live entities,
+        # and the parent drops its copies so that they cannot be read by mistake. Every worker computes
+        # the rewards of its shard with its own copy of the reward function (see `EntityShardPool`)
+        if num_workers is not None:
+            self.__shard_pool = EntityShardPool(self.__entities, self.reward_function, self.__shared_observations,
+                                                self.__observation_layout, num_workers)
+            self.__entities = None
+            self.__network_entities = None
+
+        # cached action spaces, rebuilt lazily after the entities change state
+        self.__action_space = self.get_action_space()
+        self.__dirty_action_spaces = set()
        
         # reset environment and initializes episode time steps
         self.reset()
@@ -69,9 +93,6 @@ class EnergyNetEnv(ParallelEnv, Environment):
         # reset episode tracker to start after initializing episode time steps during reset
         self.episode_tracker.reset_episode_index()
 
-        self.__observation_space = self.get_observation_space()
-        self.__action_space = self.get_action_space()
-
         # state and env objects
         self.__state = None
         # self.__rewards = None
@@ -82,6 +103,20 @@ class EnergyNetEnv(ParallelEnv, Environment):
 
 
 
+    @property
+    def entities(self) -> dict[str, NetworkEntity]:
+        """The entities by agent name. Not available in sharded mode, where the live entities are in the worker processes."""
+        if self.__shard_pool is not None:
+            raise AttributeError('The entities of a sharded environment live in its worker processes')
+        return self.__entities
+
+    @property
+    def network_entities(self) -> List[NetworkEntity]:
+        """The entities of the environment. Not available in sharded mode, see `entities`."""
+        if self.__shard_pool is not None:
+            raise AttributeError('The entities of a sharded environment live in its worker processes')
+        return self.__network_entities
+
     def reset(self, seed=None, return_info=True, options=None):
         
         self.reset_time_step()
@@ -94,12 +129,15 @@ class EnergyNetEnv(ParallelEnv, Environment):
         self.agents = self.possible_agents.copy()
         
 
-        for entity in self.entities.values():
-            entity.reset()
+        if self.__shard_pool is not None:
+            self.__shard_pool.reset()
+        else:
+            for entity in self.__entities.values():
+                entity.reset()
 
         # reset reward function (does nothing by default)
         self.reward_function.reset()
-        self.__action_space = self.get_action_space()
+        self.__invalidate_action_spaces(self.possible_agents)
         # get all observations
         observations = self.__observe_all()
         
@@ -112,6 +150,32 @@ class EnergyNetEnv(ParallelEnv, Environment):
     def seed(self, seed=None):
         self.__np_random, seed = seeding.np_random(seed)
 
+    def snapshot(self) -> dict:
+        """
+        Captures the mutable state of the environment: the entity states, the time step and the active agents.
+
+        This is a cheap alternative to `copy.deepcopy(env)` for look-ahead, since dynamics, parameters,
+        spaces and buffers are not copied.
+
+        Returns:
+        dict: A snapshot to be passed to `restore`.
+        """
+        return {'entities': self.__call_entities('snapshot'),
+                'time_step': self.time_step,
+                'agents': list(self.agents)}
+
+    def restore(self, snapshot: dict):
+        """
+        Restores the environment to a state captured by `snapshot`. The same snapshot can be restored repeatedly.
+
+        Parameters:
+        snapshot (dict): A value returned by `snapshot`.
+        """
+        self.__call_entities('restore', {name: (entity_snapshot,) for name, entity_snapshot in snapshot['entities'].items()})
+        self.time_step = snapshot['time_step']
+        self.agents = list(snapshot['agents'])
+        self.__invalidate_action_spaces(self.possible_agents)
+
 
     def step(self, joint_action: dict[str, Union[np.ndarray, EnergyAction]]):
 
@@ -120,19 +184,11 @@ class EnergyNetEnv(ParallelEnv, Environment):
         terminations = {a: False for a in self.agents}
 
         # Perform the actions
-        for agent_name, actions in joint_action.items():
-            #s
-            curr_state = self.entities[agent_name].get_current_state()
-            # NEW TIME TICK
-            self.entities[agent_name].step(actions)
-            #s'
-            next_state = self.entities[agent_name].get_current_state()    
-            #r
-            rewards[agent_name] = self.reward_function.calculate(curr_state, actions, next_state, time_steps=self.time_step)
+        rewards.update(self.__step_entities(joint_action))
 
         # get new observations according to the current state
         obs = self.__observe_all()
-        self.__action_space = self.get_action_space()
+        self.__invalidate_action_spaces(joint_action.keys())
         infos = self.get_info()
         # Check if the simulation has reached the end
         truncs = {a: False for a in self.agents}
@@ -145,6 +201,118 @@ class EnergyNetEnv(ParallelEnv, Environment):
 
         return obs, rewards, terminations, truncs, infos
 
+    def step_many(self, joint_actions: Mapping[str, np.ndarray]) -> Trajectory:
+        """
+        Performs a sequence of joint actions with the semantics of `step`, stopping early if the episode terminates.
+
+        Observations, rewards and terminations are written into preallocated `[T, ...]` arrays, and the
+        per-step info dicts and action spaces are not built.
+
+        Parameters:
+        joint_actions (Mapping[str, np.ndarray]): Per agent, an array of `T` actions stacked along the first axis.
+
+        Returns:
+        Trajectory: `observations` shaped `[T, *observation_buffer.shape]`, `rewards` shaped `[T, num_agents]`
+        in `possible_agents` order, `terminations` shaped `[T]` and the performed `actions`. `T` is
+        shortened to the number of steps taken if the episode terminates first. Without any actions, the
+        trajectory is empty and the environment is not stepped.
+        """
+        joint_actions = {agent: np.asarray(actions) for agent, actions in joint_actions.items()}
+        horizon = min((len(actions) for actions in joint_actions.values()), default=0)
+        trajectory = self.__init_trajectory(horizon)
+        trajectory['actions'] = joint_actions
+        for t in range(horizon):
+            if self.__step_into(trajectory, t, {agent: actions[t] for agent, actions in joint_actions.items()}):
+                return self.__truncate_trajectory(trajectory, t + 1)
+        return self.__truncate_trajectory(trajectory, horizon)
+
+    def rollout(self, policy_fn: Callable[[dict[str, np.ndarray]], dict[str, np.ndarray]], horizon: int) -> Trajectory:
+        """
+        Runs `policy_fn` in closed loop for up to `horizon` steps, see `step_many`.
+
+        Parameters:
+        policy_fn (Callable): Maps the current observations of the active agents to a joint action. The
+            observations are views into `observation_buffer` and must not be kept across calls.
+        horizon (int): Maximal number of steps.
+
+        Returns:
+        Trajectory: As returned by `step_many`, with the actions chosen by `policy_fn`.
+        """
+        trajectory = self.__init_trajectory(horizon)
+        actions = trajectory['actions'] = {}
+        for t in range(horizon):
+            joint_action = policy_fn({agent: self.__agent_observations[agent] for agent in self.agents})
+            for agent, action in joint_action.items():
+                if agent not in actions:
+                    actions[agent] = np.zeros((horizon,) + np.shape(action), dtype=np.float32)
+                actions[agent][t] = action
+            if self.__step_into(trajectory, t, joint_action):
+                return self.__truncate_trajectory(trajectory, t + 1)
+        return trajectory
+
+    def predict_batch(self, agent: str, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluates `K` candidate actions of `agent` from the current state without changing the environment.
+
+        Parameters:
+        agent (str): The agent to evaluate.
+        candidates (np.ndarray): A `[K, A]` matrix of candidate actions.
+
+        Returns:
+        tuple: The `[K, obs_dim]` predicted observations and the `[K]` rewards from `reward_function.calculate_batch`.
+        """
+        candidates = np.asarray(candidates)
+        next_states = np.asarray(self.__call_entities('predict', {agent: (candidates,)})[agent], dtype=np.float64)
+        curr_state = self.__call_entities('observe', {agent: (np.empty(next_states.shape[1:]),)})[agent]
+        curr_states = np.broadcast_to(curr_state, next_states.shape)
+        rewards = self.reward_function.calculate_batch(curr_states, candidates, next_states, time_steps=self.time_step)
+        return next_states, np.asarray(rewards)
+
+    def __step_entities(self, joint_action: dict[str, Union[np.ndarray, EnergyAction]]) -> dict[str, float]:
+        """Performs the actions of `joint_action` (in the shard workers in sharded mode) and returns the rewards."""
+        if self.__shard_pool is not None:
+            return self.__shard_pool.step(joint_action, self.time_step)
+        return {agent_name: step_entity(self.__entities[agent_name], actions, self.reward_function, self.time_step)
+                for agent_name, actions in joint_action.items()}
+
+    def __call_entities(self, method_name: str, args_by_agent: dict[str, tuple] = None) -> dict[str, Any]:
+        """Calls `method_name` on the entities of `args_by_agent` (all entities by default), wherever they live."""
+        if args_by_agent is None:
+            args_by_agent = {agent: () for agent in self.possible_agents}
+        if self.__shard_pool is not None:
+            return self.__shard_pool.call(method_name, args_by_agent)
+        return {agent: getattr(self.__entities[agent], method_name)(*args) for agent, args in args_by_agent.items()}
+
+    def __init_trajectory(self, horizon: int) -> Trajectory:
+        return Trajectory(observations=np.zeros((horizon,) + self.__observation_buffer.shape, dtype=self.__observation_buffer.dtype),
+                          rewards=np.zeros((horizon, len(self.possible_agents))),
+                          terminations=np.zeros(horizon, dtype=bool),
+                          actions=None)
+
+    def __step_into(self, trajectory: Trajectory, t: int, joint_action: dict[str, Union[np.ndarray, EnergyAction]]) -> bool:
+        """`step` writing into row `t` of `trajectory`. Returns whether the episode terminated."""
+        rewards = trajectory['rewards'][t]
+        for agent_name, reward in self.__step_entities(joint_action).items():
+            rewards[self.__agent_index[agent_name]] = reward
+
+        self.__write_observations()
+        trajectory['observations'][t] = self.__observation_buffer
+        self.__invalidate_action_spaces(joint_action.keys())
+
+        terminated = self.terminated()
+        if terminated:
+            trajectory['terminations'][t] = True
+            self.agents = []
+        self.next_time_step()
+        return terminated
+
+    @staticmethod
+    def __truncate_trajectory(trajectory: Trajectory, length: int) -> Trajectory:
+        return Trajectory(observations=trajectory['observations'][:length],
+                          rewards=trajectory['rewards'][:length],
+                          terminations=trajectory['terminations'][:length],
+                          actions={agent: actions[:length] for agent, actions in trajectory['actions'].items()})
+
     '''
 
     @abstractmethod
@@ -168,12 +336,13 @@ class EnergyNetEnv(ParallelEnv, Environment):
         pass
 
     '''
-    @lru_cache(maxsize=None)
     def observation_space(self, agent: str):
         return self.__observation_space[agent]
 
    
     def action_space(self, agent: str):
+        if agent in self.__dirty_action_spaces:
+            self.__refresh_action_space(agent)
         return self.__action_space[agent]
     
     @property
@@ -212,7 +381,47 @@ class EnergyNetEnv(ParallelEnv, Environment):
         return self.__observe_all()
     
     def __observe_all(self):
-        return {agent: np.array(list(self.entities[agent].get_current_state().values()),dtype=np.float32) for agent in self.agents}
+        self.__write_observations()
+        if self.copy_observations:
+            return {agent: self.__agent_observations[agent].copy() for agent in self.agents}
+        return {agent: self.__agent_observations[agent] for agent in self.agents}
+
+    def __write_observations(self):
+        if self.__shard_pool is not None:
+            self.__shard_pool.observe(self.agents)
+            return
+        for agent in self.agents:
+            self.__entities[agent].observe(self.__agent_observations[agent])
+
+    def __init_observation_buffers(self, shared: bool = False):
+        """Allocates a single observation buffer for all agents and a view into it per agent.
+
+        With `shared=True` the buffer lives in shared memory, so that shard workers can write into it.
+        """
+        sizes = [int(np.prod(self.__observation_space[agent].shape)) for agent in self.possible_agents]
+        shape = (len(sizes), sizes[0]) if len(set(sizes)) == 1 else (sum(sizes),)
+        if shared:
+            self.__shared_observations = SharedArray(shape, np.float32)
+            self.__observation_buffer = self.__shared_observations.array
+        else:
+            self.__observation_buffer = np.zeros(shape, dtype=np.float32)
+        flat_buffer = self.__observation_buffer.reshape(-1)
+        offsets = np.cumsum([0] + sizes)
+        self.__observation_layout = {agent: (int(offsets[i]), int(offsets[i + 1]), self.__observation_space[agent].shape)
+                                     for i, agent in enumerate(self.possible_agents)}
+        self.__agent_observations = {agent: flat_buffer[start:stop].reshape(shape)
+                                     for agent, (start, stop, shape) in self.__observation_layout.items()}
+        self.__agent_index = {agent: i for i, agent in enumerate(self.possible_agents)}
+
+    @property
+    def observation_buffer(self) -> np.ndarray:
+        """Latest observations of all agents in `possible_agents` order.
+
+        Shaped `[num_agents, obs_dim]` when all agents share the observation size, otherwise the
+        flat concatenation of the agents' observations. With `copy_observations=False` the arrays
+        returned by `reset` and `step` are views into this buffer and are overwritten by the next step.
+        """
+        return self.__observation_buffer
 
     def convert_space(self, space):
         if isinstance(space, dict):
@@ -223,11 +432,37 @@ class EnergyNetEnv(ParallelEnv, Environment):
             raise TypeError("observation space not supported")
 
     def get_observation_space(self):
-        return {name: bounds_to_gym_box(entity.get_observation_space()) for name, entity in self.entities.items()}
+        return {name: bounds_to_gym_box(bounds) for name, bounds in self.__call_entities('get_observation_space').items()}
     
 
     def get_action_space(self):
-        return {name: bounds_to_gym_box(entity.get_action_space()) for name, entity in self.entities.items()}
+        return {name: bounds_to_gym_box(bounds) for name, bounds in self.__call_entities('get_action_space').items()}
+
+    def close(self):
+        """Stops the shard workers and releases the shared observation buffer, if any."""
+        if self.__shard_pool is not None:
+            self.__shard_pool.close()
+            self.__shard_pool = None
+        if self.__shared_observations is not None:
+            self.__agent_observations = {}
+            self.__observation_buffer = None
+            self.__shared_observations.close()
+            self.__shared_observations = None
+
+    def __invalidate_action_spaces(self, agents):
+        """Marks the action spaces of `agents` as stale. They are refreshed on the next `action_space` call."""
+        self.__dirty_action_spaces.update(agents)
+
+    def __refresh_action_space(self, agent: str):
+        """Rebuilds the cached action space of `agent` only if its bounds changed.
+
+        A new `Box` is created instead of updating the cached one in place, since learners such as
+        stable-baselines3 keep a reference to the space they were constructed with.
+        """
+        self.__dirty_action_spaces.discard(agent)
+        bounds = self.__call_entities('get_action_space', {agent: ()})[agent]
+        if not gym_box_matches_bounds(self.__action_space[agent], bounds):
+            self.__action_space[agent] = bounds_to_gym_box(bounds)
 
 
 
@@ -0,0 +1,220 @@
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from gymnasium.spaces import Box
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvObs, VecEnvStepReturn
+
+from ..config import DEFAULT_LIFETIME_CONSTANT, DEFAULT_TIME_STEP
+from ..dynamics.storage_dynamics import BatteryDynamics, DegradationTable
+from ..entities.pcsunit import PCSUnit, DefaultPCSUnitRewardFunction
+from ..env.base import Environment, EpisodeScheduler, EpisodeTracker
+from ..model.reward import RewardFunction
+from ..model.state import StorageArrayState
+from ..network_entity import NetworkEntity
+
+
+class VectorEnergyNetEnv(VecEnv, Environment):
+    """Vectorized environment that advances `num_envs` identical copies of a
+    :py:class:`PCSUnit` topology in a single batched step.
+
+    The state of every copy is held in contiguous NumPy arrays (one row per
+    environment, one column per storage device) instead of per-copy entity
+    objects, so `step` costs a handful of array operations regardless of
+    `num_envs`. The transition follows `EnergyNetEnv.step` with
+    `PCSUnit.step` and `BatteryDynamics.do`, and the class implements the
+    stable-baselines3 `VecEnv` interface, including auto-reset of finished
+    environments.
+
+    Parameters
+    ----------
+    network_entities: List[NetworkEntity]
+        A single :py:class:`PCSUnit` used as the template for all copies.
+    num_envs: int
+        Number of environment copies.
+    simulation_start_time_step: int
+        Time step to start the simulation.
+    simulation_end_time_step: int
+        Time step to end the simulation.
+    seconds_per_time_step: float, optional
+        Number of seconds in 1 `time_step`.
+    initial_seed: int, optional
+        Pseudorandom number generator seed.
+    reward_function: RewardFunction, optional
+        Reward function. Its `calculate_batch` method is called once per step.
+    episode_scheduler: EpisodeScheduler, optional
+        Split pool shared with other environments, see :py:class:`EpisodeTracker`.
+    """
+
+    def __init__(self,
+        network_entities: List[NetworkEntity],
+        num_envs: int = 1,
+        simulation_start_time_step: int = None,
+        simulation_end_time_step: int = None,
+        seconds_per_time_step: float = None,
+        initial_seed: int = None,
+        reward_function: RewardFunction = None,
+        episode_scheduler: EpisodeScheduler = None,
+        **kwargs: Any):
+
+        assert len(network_entities) == 1, 'VectorEnergyNetEnv supports a single network entity per copy.'
+        template = network_entities[0]
+        if not isinstance(template, PCSUnit):
+            raise TypeError(f"VectorEnergyNetEnv does not support entities of type {type(template).__name__}")
+        assert num_envs >= 1, 'num_envs must be >= 1.'
+
+        self.episode_tracker = EpisodeTracker(simulation_start_time_step, simulation_end_time_step, episode_scheduler=episode_scheduler)
+        Environment.__init__(self, seconds_per_time_step=seconds_per_time_step, random_seed=initial_seed, episode_tracker=self.episode_tracker)
+
+        self.template = template
+        self.simulation_start_time_step = simulation_start_time_step
+        self.simulation_end_time_step = simulation_end_time_step
+        self.time_step_num = simulation_end_time_step - simulation_start_time_step if simulation_end_time_step is not None and simulation_start_time_step is not None else DEFAULT_TIME_STEP
+        self.reward_function = reward_function if reward_function is not None else DefaultPCSUnitRewardFunction(env_metadata=self.get_metadata)
+
+        # initial values of a single copy, broadcast to all copies on reset
+        storage_devices = list(template.get_storage_devices().values())
+        self._init_storage = np.array([StorageArrayState.from_state(device.init_state).array for device in storage_devices])
+        # `EnergyNetEnv` steps the batteries with the default lifetime constant of `BatteryDynamics.do`
+        # (see `ElementaryNetworkEntity.step`), so the copies do too
+        self._lifetime_constant = np.full(len(storage_devices), DEFAULT_LIFETIME_CONSTANT)
+        init_energy_capacity = self._init_storage[:, StorageArrayState.field_index['energy_capacity']]
+        self._init_consumption = template._init_state['curr_consumption']
+        self._init_pred_consumption = template.predict_next_consumption()
+
+        # batched state, one row per environment copy and one `StorageArrayState` row per storage device
+        shape = (num_envs, len(storage_devices))
+        self.storage = np.empty(shape + (len(StorageArrayState.fields),), dtype=np.float64)
+        index = StorageArrayState.field_index
+        self.state_of_charge = self.storage[..., index['state_of_charge']]
+        self.energy_capacity = self.storage[..., index['energy_capacity']]
+        self.power_capacity = self.storage[..., index['power_capacity']]
+        self.charging_efficiency = self.storage[..., index['charging_efficiency']]
+        self.discharging_efficiency = self.storage[..., index['discharging_efficiency']]
+        self.current_time = self.storage[..., index['current_time']]
+        self.consumption = np.empty(num_envs, dtype=np.float64)
+        self.pred_consumption = np.empty(num_envs, dtype=np.float64)
+        self.time_steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions = np.zeros(shape, dtype=np.float32)
+        self._obs = np.zeros((num_envs, 3), dtype=np.float32)
+
+        # the per-step bounds of `Battery.get_action_space` are enforced by clipping the state of charge,
+        # so the vectorized env exposes the static envelope of all feasible charge actions
+        observation_bounds = template.get_observation_space()
+        observation_space = Box(low=observation_bounds['low'], high=observation_bounds['high'],
+                                shape=observation_bounds['shape'], dtype=observation_bounds['dtype'])
+        action_space = Box(low=-init_energy_capacity, high=init_energy_capacity,
+                           shape=(len(storage_devices),), dtype=np.float32)
+        self.render_mode = None
+        VecEnv.__init__(self, num_envs, observation_space, action_space)
+        self.metadata['name'] = 'energy_net_vec_env_v0'
+
+        # every copy restarts from the template's time, so the degradation factors of an episode are known upfront
+        self._battery_dynamics = BatteryDynamics()
+        self._degradation = DegradationTable(self._lifetime_constant, horizon=self.time_step_num,
+                                             start_time=int(self._init_storage[:, index['current_time']].min()))
+
+        self.reset_all()
+
+    ##############
+    # VecEnv API #
+    ##############
+
+    def reset(self) -> VecEnvObs:
+        # the transition is deterministic, so seeds have no effect
+        self._reset_seeds()
+        self._reset_options()
+        self.reset_all()
+        return self._observe().copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions[:] = np.asarray(actions, dtype=np.float32).reshape(self._actions.shape)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        curr_obs = self._observe().copy()
+
+        self._step_storage(self._actions)
+
+        next_obs = self._observe()
+        rewards = np.asarray(self.reward_function.calculate_batch(curr_obs, self._actions, next_obs, time_steps=self.time_steps), dtype=np.float32)
+
+        dones = self.time_steps == self.time_step_num - 1
+        self.time_steps += 1
+
+        obs = next_obs.copy()
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for env_index in np.flatnonzero(dones):
+                infos[env_index]['terminal_observation'] = obs[env_index].copy()
+                infos[env_index]['TimeLimit.truncated'] = False
+            self.reset_envs(dones)
+            obs[dones] = self._observe()[dones]
+
+        return obs, rewards, dones, infos
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        value = getattr(self, attr_name)
+        if self._is_batched(value):
+            return [value[env_index] for env_index in self._get_indices(indices)]
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        """Sets the rows of `indices` of a batched attribute (one row per copy), or an attribute shared by all copies."""
+        env_indices = list(self._get_indices(indices))
+        current = getattr(self, attr_name, None)
+        if self._is_batched(current):
+            current[env_indices] = value
+        elif sorted(env_indices) == list(range(self.num_envs)):
+            setattr(self, attr_name, value)
+        else:
+            raise ValueError(f"{attr_name} is shared by all environment copies and cannot be set for a subset of them")
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def get_images(self) -> Sequence[Optional[np.ndarray]]:
+        return [None for _ in range(self.num_envs)]
+
+    ##################
+    # End VecEnv API #
+    ##################
+
+    def reset_all(self):
+        """Resets all environment copies to the template's initial state."""
+
+        self.reset_time_step()
+        self.reward_function.reset()
+        self.reset_envs(np.ones(self.num_envs, dtype=bool))
+
+    def reset_envs(self, mask: np.ndarray):
+        """Resets the environment copies selected by the boolean `mask`."""
+
+        self.storage[mask] = self._init_storage
+        self.consumption[mask] = self._init_consumption
+        self.pred_consumption[mask] = self._init_pred_consumption
+        self.time_steps[mask] = 0
+
+    def _step_storage(self, charge: np.ndarray):
+        """Batched `BatteryDynamics.do` over all storage devices of all copies."""
+
+        self._battery_dynamics.do_batch(charge, self.storage, self._lifetime_constant, degradation=self._degradation)
+
+    def _is_batched(self, value: Any) -> bool:
+        """Whether `value` is an attribute with one row per environment copy."""
+
+        return isinstance(value, np.ndarray) and value.ndim > 0 and value.shape[0] == self.num_envs
+
+    def _observe(self) -> np.ndarray:
+        """Writes the observations of all copies into the shared `[num_envs, 3]` buffer and returns it."""
+
+        self._obs[:, 0] = self.state_of_charge.sum(axis=1)
+        self._obs[:, 1] = self.consumption
+        self._obs[:, 2] = self.pred_consumption
+        return self._obs
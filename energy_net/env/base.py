@@ -1,9 +1,22 @@
 
+import multiprocessing
 import random
 from typing import Any, List, Mapping, Tuple, Union
 import uuid
 import numpy as np
 
+def even_splits(simulation_start_time_step: int, simulation_end_time_step: int, episode_time_steps: int, rolling_episode_split: bool) -> Tuple[int, int, int]:
+    """`(earliest_start_time_step, stride, num_splits)` of the episode splits of `episode_time_steps` between the simulation start and end time steps.
+    Split `i` starts at `earliest_start_time_step + i*stride`."""
+
+    latest_start_time_step = (simulation_end_time_step + 1) - episode_time_steps
+    stride = 1 if rolling_episode_split else episode_time_steps
+    num_splits = len(range(simulation_start_time_step, latest_start_time_step + 1, stride))
+    if num_splits == 0:
+        raise ValueError(f'episode_time_steps ({episode_time_steps}) exceeds the simulation time steps ({simulation_end_time_step - simulation_start_time_step + 1})')
+    return simulation_start_time_step, stride, num_splits
+
+
 class EpisodeTracker:
     """Class for keeping track of current episode time steps for reading observations from data files.
 
@@ -15,14 +28,20 @@ class EpisodeTracker:
         Time step to start reading from data files. 
     simulation_end_time_step: int
         Time step to end reading from data files.
+    episode_scheduler: EpisodeScheduler, optional
+        Schedule shared with other trackers. If given, the splits are claimed from it and the split arguments of `next_episode` are ignored.
     """
     
-    def __init__(self, simulation_start_time_step: int, simulation_end_time_step: int):
+    def __init__(self, simulation_start_time_step: int, simulation_end_time_step: int, episode_scheduler: 'EpisodeScheduler' = None):
         self.__episode = None
         self.__episode_start_time_step = None
         self.__episode_end_time_step = None
         self.__simulation_start_time_step = simulation_start_time_step
         self.__simulation_end_time_step = simulation_end_time_step
+        self.__split_cache = None
+        self.__random_state = None
+        self.__upcoming_episode = None
+        self.episode_scheduler = episode_scheduler
         self.reset_episode_index()
 
     @property
@@ -83,49 +102,189 @@ class EpisodeTracker:
             True if episode splits are to be selected at random during training otherwise, False to select sequentially.
         """
 
-        self.__episode += 1
-        self.__next_episode_time_steps(
+        self.__episode_start_time_step, self.__episode_end_time_step = self.peek_next_episode(
             episode_time_steps,
             rolling_episode_split,
             random_episode_split,
             random_seed,
         )
-        
-    def __next_episode_time_steps(self, episode_time_steps: Union[int, List[Tuple[int, int]]], rolling_episode_split: bool, random_episode_split: bool, random_seed: int):
-        """Sets `episode_start_time_step` and `episode_end_time_step` for reading data files."""
+        self.__upcoming_episode = None
+        self.__episode += 1
 
-        splits = None
+    def peek_next_episode(self, episode_time_steps: Union[int, List[Tuple[int, int]]], rolling_episode_split: bool, random_episode_split: bool, random_seed: int) -> Tuple[int, int]:
+        """Start and end time steps of the episode the next call of `next_episode` with the same arguments advances to, e.g. to prefetch its data.
 
-        if isinstance(episode_time_steps, List):
-            splits = episode_time_steps
+        The split is selected now, and kept for `next_episode`, so peeking does not change the sequence of episodes.
+        """
 
-        else:
-            earliest_start_time_step = self.__simulation_start_time_step 
-            latest_start_time_step = (self.__simulation_end_time_step + 1) - episode_time_steps
-            
-            if rolling_episode_split:
-                start_time_steps = range(earliest_start_time_step, latest_start_time_step + 1)
+        key = self.__episode_key(episode_time_steps, rolling_episode_split, random_episode_split, random_seed)
+
+        if self.__upcoming_episode is None or self.__upcoming_episode[0] != key:
+            if self.episode_scheduler is not None:
+                split = self.episode_scheduler.next_split()
             else:
-                start_time_steps = range(earliest_start_time_step, latest_start_time_step + 1, episode_time_steps)
+                split = self.__select_split(self.__episode + 1, episode_time_steps, rolling_episode_split, random_episode_split, random_seed)
+            self.__upcoming_episode = (key, split)
+
+        return self.__upcoming_episode[1]
+
+    def __episode_key(self, episode_time_steps: Union[int, List[Tuple[int, int]]], rolling_episode_split: bool, random_episode_split: bool, random_seed: int) -> tuple:
+        """Identifies the arguments a peeked episode was selected with. With a scheduler, a peeked split is claimed for
+        whichever episode comes next, so it is kept for any arguments."""
+
+        if self.episode_scheduler is not None:
+            return ()
+
+        return (self.__episode, episode_time_steps, rolling_episode_split, random_episode_split, random_seed)
 
-            end_time_steps = np.array(start_time_steps, dtype=int) + episode_time_steps - 1
-            splits = np.array([start_time_steps, end_time_steps], dtype=int).T
-            splits = splits.tolist()
+    def __select_split(self, episode: int, episode_time_steps: Union[int, List[Tuple[int, int]]], rolling_episode_split: bool, random_episode_split: bool, random_seed: int) -> Tuple[int, int]:
+        """Start and end time steps of `episode` for reading data files."""
+
+        splits = self.__splits(episode_time_steps, rolling_episode_split)
+        num_splits = len(splits) if isinstance(splits, list) else splits[2]
 
         if random_episode_split:
-            seed = int(random_seed*(self.episode + 1))
-            nprs = np.random.RandomState(seed)
-            ix = nprs.choice(len(splits) - 1)
+            if self.__random_state is None or self.__random_state[0] != random_seed:
+                self.__random_state = (random_seed, np.random.default_rng(random_seed))
+            # as before, the last split is not a candidate for random selection
+            ix = int(self.__random_state[1].integers(max(num_splits - 1, 1)))
+
+        else:
+            ix = episode%num_splits
 
+        if isinstance(splits, list):
+            return tuple(splits[ix])
         else:
-            ix = self.episode%len(splits)
+            earliest_start_time_step, stride, _ = splits
+            start_time_step = earliest_start_time_step + ix*stride
+            return start_time_step, start_time_step + episode_time_steps - 1
+
+    def __splits(self, episode_time_steps: Union[int, List[Tuple[int, int]]], rolling_episode_split: bool) -> Union[List[Tuple[int, int]], Tuple[int, int, int]]:
+        """The explicit list of splits, or `(earliest_start_time_step, stride, num_splits)` of evenly spaced splits. Cached per configuration."""
+
+        if isinstance(episode_time_steps, List):
+            return episode_time_steps
+
+        key = (episode_time_steps, rolling_episode_split)
+        if self.__split_cache is None or self.__split_cache[0] != key:
+            self.__split_cache = (key, even_splits(self.__simulation_start_time_step, self.__simulation_end_time_step, episode_time_steps, rolling_episode_split))
 
-        self.__episode_start_time_step, self.__episode_end_time_step = splits[ix]
+        return self.__split_cache[1]
 
     def reset_episode_index(self):
-        """Resets episode index to -1 before any simulation."""
+        """Resets episode index to -1 before any simulation, and restarts the random episode selection.
+
+        A split already peeked from the scheduler is kept for the next episode, as no other tracker can claim it.
+        """
 
         self.__episode = -1
+        self.__random_state = None
+
+        if self.episode_scheduler is None:
+            self.__upcoming_episode = None
+
+class EpisodeScheduler:
+    """Shared episode split schedule of a pool of :py:class:`EpisodeTracker` objects, e.g. one per parallel environment.
+
+    All trackers walk through a common, seeded order of the splits. Their position in it is a counter in shared memory, so
+    every split of an epoch is handed out exactly once across the pool, and N workers cover the splits in 1/N of the time.
+    The order is recomputed from the seed in every process, so only the counter is shared. A scheduler created before the
+    worker processes are started (e.g. inside the environment functions of a vectorized environment) is shared by them.
+
+    Parameters
+    ----------
+    simulation_start_time_step: int
+        Time step to start reading from data files.
+    simulation_end_time_step: int
+        Time step to end reading from data files.
+    episode_time_steps: int
+        Number of time steps in an episode.
+    rolling_episode_split: bool, default: False
+        True if each time step is a candidate for `episode_start_time_step`, otherwise False to split episodes in steps of `episode_time_steps`.
+    mode: str, default: 'sequential'
+        'sequential' to hand out the splits in time order, 'shuffled' to hand them out in a new random order every epoch (without replacement
+        within an epoch), or 'stratified' to also alternate between seasons, so that any consecutive episodes cover the seasons evenly.
+    random_seed: int, default: 0
+        Seed of the 'shuffled' and 'stratified' orders.
+    season_time_steps: int, optional
+        Number of time steps in a season, for 'stratified'. Defaults to a quarter of a year of `seconds_per_time_step` steps.
+    seconds_per_time_step: float, default: 3600.0
+        Number of seconds in 1 time step, for the default `season_time_steps`.
+    start_method: str, optional
+        `multiprocessing` start method of the worker processes sharing the scheduler, e.g. 'forkserver' for
+        :py:class:`.AsyncEnergyNetVecEnv`. Defaults to the platform default.
+    """
+
+    MODES = ('sequential', 'shuffled', 'stratified')
+    SEASONS = 4
+
+    def __init__(self, simulation_start_time_step: int, simulation_end_time_step: int, episode_time_steps: int, rolling_episode_split: bool = False,
+                 mode: str = 'sequential', random_seed: int = 0, season_time_steps: int = None, seconds_per_time_step: float = 3600.0,
+                 start_method: str = None):
+        if mode not in self.MODES:
+            raise ValueError(f'mode must be one of {self.MODES}, got {mode}')
+        self.episode_time_steps = episode_time_steps
+        self.mode = mode
+        self.random_seed = random_seed
+        self.season_time_steps = int(365*24*3600/seconds_per_time_step)//self.SEASONS if season_time_steps is None else season_time_steps
+        self.__earliest_start_time_step, self.__stride, self.num_splits = even_splits(simulation_start_time_step, simulation_end_time_step, episode_time_steps, rolling_episode_split)
+        self.__counter = multiprocessing.get_context(start_method).Value('q', 0)
+        self.__order = None
+
+    @property
+    def position(self) -> int:
+        """Number of episodes handed out so far by the whole pool."""
+
+        return self.__counter.value
+
+    def reset(self):
+        """Restarts the schedule of the whole pool."""
+
+        with self.__counter.get_lock():
+            self.__counter.value = 0
+
+    def next_split(self) -> Tuple[int, int]:
+        """Claims the next split of the schedule and returns its start and end time steps."""
+
+        with self.__counter.get_lock():
+            position = self.__counter.value
+            self.__counter.value += 1
+
+        epoch, ix = divmod(position, self.num_splits)
+        start_time_step = self.__earliest_start_time_step + int(self.__epoch_order(epoch)[ix])*self.__stride
+        return start_time_step, start_time_step + self.episode_time_steps - 1
+
+    def __epoch_order(self, epoch: int) -> np.ndarray:
+        """Split indices in the order they are handed out in `epoch`."""
+
+        if self.mode == 'sequential':
+            return np.arange(self.num_splits)
+
+        if self.__order is None or self.__order[0] != epoch:
+            rng = np.random.default_rng([self.random_seed, epoch])
+            order = rng.permutation(self.num_splits)
+
+            if self.mode == 'stratified':
+                start_time_steps = self.__earliest_start_time_step + order*self.__stride
+                seasons = (start_time_steps//self.season_time_steps)%self.SEASONS
+                # rank of every split within its season, in shuffled order
+                by_season = np.argsort(seasons, kind='stable')
+                season_starts = np.searchsorted(seasons[by_season], seasons[by_season])
+                ranks = np.empty(self.num_splits, dtype=np.int64)
+                ranks[by_season] = np.arange(self.num_splits) - season_starts
+                # round-robin over the seasons: first split of every season, then the second, ...
+                order = order[np.lexsort((seasons, ranks))]
+
+            self.__order = (epoch, order)
+
+        return self.__order[1]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the order is recomputed by every process
+        state['_EpisodeScheduler__order'] = None
+        return state
+
 
 class Environment:
     """Base class for the environment.
@@ -202,6 +361,10 @@ class Environment:
     def episode_tracker(self, episode_tracker: EpisodeTracker):
         self.__episode_tracker = episode_tracker
 
+    @time_step.setter
+    def time_step(self, time_step: int):
+        self.__time_step = time_step
+
     def get_metadata(self) -> Mapping[str, Any]:
         """Returns general static information."""
 
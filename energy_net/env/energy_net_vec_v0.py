@@ -0,0 +1,13 @@
+from functools import partial
+
+from .AsyncEnergyNetVecEnv import AsyncEnergyNetVecEnv
+from .VectorEnergyNetEnv import VectorEnergyNetEnv
+from .single_entity_v0 import gym_env
+
+
+def vec_env(*args, **kwargs):
+    return VectorEnergyNetEnv(*args, **kwargs)
+
+
+def async_vec_env(*args, num_envs: int = 1, start_method: str = None, **kwargs):
+    return AsyncEnergyNetVecEnv([partial(gym_env, *args, **kwargs) for _ in range(num_envs)], start_method=start_method)
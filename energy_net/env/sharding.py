@@ -0,0 +1,187 @@
+import multiprocessing as mp
+import traceback
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from ..model.reward import RewardFunction
+from ..model.state import ArrayState
+from ..network_entity import NetworkEntity
+from ..utils.shared_memory import SharedArray
+
+# agent -> (start, stop, shape) of its observation in the flat observation buffer
+ObservationLayout = Dict[str, Tuple[int, int, Tuple[int, ...]]]
+
+
+def step_entity(entity: NetworkEntity, action, reward_function: RewardFunction, time_step: int) -> float:
+    """Performs the action of a single entity and returns its reward."""
+    #s
+    curr_state = entity.get_current_state()
+    if isinstance(curr_state, ArrayState):
+        # array-backed states are live views that the step below overwrites
+        curr_state = curr_state.copy()
+    # NEW TIME TICK
+    entity.step(action)
+    #s'
+    next_state = entity.get_current_state()
+    #r
+    return reward_function.calculate(curr_state, action, next_state, time_steps=time_step)
+
+
+def _shard_worker(remote, parent_remote, entities: Dict[str, NetworkEntity], reward_function: RewardFunction,
+                  observation_spec: tuple, observation_layout: ObservationLayout, reward_spec: tuple, reward_index: Dict[str, int]):
+    parent_remote.close()
+    observations = SharedArray(*observation_spec)
+    rewards = SharedArray(*reward_spec)
+    flat_observations = observations.array.reshape(-1)
+    views = {agent: flat_observations[start:stop].reshape(shape)
+             for agent, (start, stop, shape) in observation_layout.items() if agent in entities}
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'close':
+                break
+            try:
+                result = None
+                if command == 'step':
+                    joint_action, time_step = data
+                    for agent, action in joint_action.items():
+                        rewards.array[reward_index[agent]] = step_entity(entities[agent], action, reward_function, time_step)
+                elif command == 'observe':
+                    for agent in data:
+                        entities[agent].observe(views[agent])
+                elif command == 'reset':
+                    reward_function.reset()
+                    for entity in entities.values():
+                        entity.reset()
+                elif command == 'call':
+                    method_name, args_by_agent = data
+                    result = {agent: getattr(entities[agent], method_name)(*args) for agent, args in args_by_agent.items()}
+                else:
+                    raise ValueError(f"Unknown command {command}")
+                remote.send(('ok', result))
+            except Exception:
+                remote.send(('error', traceback.format_exc()))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        views.clear()
+        flat_observations = None
+        observations.close()
+        rewards.close()
+
+
+class EntityShardPool:
+    """Steps disjoint shards of network entities in worker processes.
+
+    Each worker owns the entities of its shard and writes their observations straight into a
+    shared observation buffer, and their rewards into a shared reward buffer, so only actions and
+    small control messages cross the process boundary. Shards are stepped in parallel.
+
+    Parameters
+    ----------
+    entities: Mapping[str, NetworkEntity]
+        The entities to distribute, by agent name. Each worker receives a copy of its shard.
+    reward_function: RewardFunction
+        Reward function evaluated in the workers after every entity step. Every worker holds its own copy, which
+        only sees the steps of its shard, so a stateful reward function accumulates a separate state per shard
+        and its copy in the parent is not updated.
+    observations: SharedArray
+        Shared observation buffer of all agents.
+    observation_layout: ObservationLayout
+        Position and shape of every agent's observation in the flattened `observations` buffer.
+    num_workers: int
+        Number of worker processes. Capped at the number of entities.
+    start_method: str, optional
+        `multiprocessing` start method. Defaults to the platform default.
+    """
+
+    def __init__(self, entities: Mapping[str, NetworkEntity], reward_function: RewardFunction, observations: SharedArray,
+                 observation_layout: ObservationLayout, num_workers: int, start_method: str = None):
+        if num_workers < 1:
+            raise ValueError('num_workers must be >= 1')
+        agents = list(entities.keys())
+        self.num_workers = min(num_workers, len(agents))
+        bounds = np.linspace(0, len(agents), self.num_workers + 1).astype(int)
+        self.shards: List[List[str]] = [agents[bounds[i]:bounds[i + 1]] for i in range(self.num_workers)]
+        self.agent_shard = {agent: shard_index for shard_index, shard in enumerate(self.shards) for agent in shard}
+        self.reward_index = {agent: index for index, agent in enumerate(agents)}
+        self.rewards = SharedArray((len(agents),), np.float64)
+
+        context = mp.get_context(start_method)
+        self.remotes = []
+        self.processes = []
+        for shard in self.shards:
+            remote, work_remote = context.Pipe()
+            args = (work_remote, remote, {agent: entities[agent] for agent in shard}, reward_function,
+                    observations.spec(), observation_layout, self.rewards.spec(), self.reward_index)
+            process = context.Process(target=_shard_worker, args=args, daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+
+    def step(self, joint_action: Mapping[str, Any], time_step: int) -> Dict[str, float]:
+        """Steps the entities of `joint_action` in parallel and returns their rewards."""
+        self.__run('step', {shard_index: (actions, time_step) for shard_index, actions in self.__split(joint_action).items()})
+        rewards = self.rewards.array
+        return {agent: rewards[self.reward_index[agent]].item() for agent in joint_action}
+
+    def observe(self, agents: List[str]):
+        """Writes the observations of `agents` into the shared observation buffer."""
+        self.__run('observe', {shard_index: list(shard_agents) for shard_index, shard_agents in self.__split(agents).items()})
+
+    def reset(self):
+        """Resets all entities and the workers' reward functions."""
+        self.__run('reset', {shard_index: None for shard_index in range(self.num_workers)})
+
+    def call(self, method_name: str, args_by_agent: Mapping[str, tuple]) -> Dict[str, Any]:
+        """Calls `method_name` with the given arguments on the entities of `args_by_agent` and returns the results by agent."""
+        results = self.__run('call', {shard_index: (method_name, shard_args)
+                                      for shard_index, shard_args in self.__split(args_by_agent).items()})
+        return {agent: result for shard_results in results for agent, result in shard_results.items()}
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            try:
+                remote.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        for remote in self.remotes:
+            remote.close()
+        self.rewards.close()
+        self.closed = True
+
+    def __split(self, items) -> Dict[int, Any]:
+        """Groups a mapping (or list) keyed by agent into one mapping (or list) per shard."""
+        shards = {}
+        if isinstance(items, Mapping):
+            for agent, value in items.items():
+                shards.setdefault(self.agent_shard[agent], {})[agent] = value
+        else:
+            for agent in items:
+                shards.setdefault(self.agent_shard[agent], []).append(agent)
+        return shards
+
+    def __run(self, command: str, data_by_shard: Dict[int, Any]) -> list:
+        """Sends `command` to the given shards, then waits for all of them, so the shards run in parallel."""
+        if self.closed:
+            raise RuntimeError('EntityShardPool is closed')
+        for shard_index, data in data_by_shard.items():
+            self.remotes[shard_index].send((command, data))
+        results = []
+        errors = []
+        for shard_index in data_by_shard:
+            status, result = self.remotes[shard_index].recv()
+            if status == 'error':
+                errors.append(result)
+            else:
+                results.append(result)
+        if errors:
+            raise RuntimeError(f"Entity shard worker failed:\n{errors[0]}")
+        return results
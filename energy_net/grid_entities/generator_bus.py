@@ -1,13 +1,60 @@
 from abc import ABC
 
+import numpy as np
+
 from ..network_entity import NetworkEntity
 
+# columns of the generator bus values
+CAPACITY, OUTPUT = 0, 1
+
+
+def check_outputs(new_outputs, generation_capacity):
+    """Vectorized range check of `GeneratorBus.update_output` for many buses at once."""
+    new_outputs = np.asarray(new_outputs, dtype=np.float64)
+    invalid = ~((0 <= new_outputs) & (new_outputs <= generation_capacity))
+    if invalid.any():
+        raise ValueError(f"New output exceeds generation capacity or is negative at buses {np.flatnonzero(invalid).tolist()}.")
+    return new_outputs
+
 
 class GeneratorBus(NetworkEntity, ABC):
     def __init__(self, name, generation_capacity, current_output):
         super().__init__(name)
-        self.generation_capacity = generation_capacity  # in Megawatts (MW)
-        self.current_output = current_output  # in Megawatts (MW)
+        self._generation_capacity = generation_capacity  # in Megawatts (MW)
+        self._current_output = current_output  # in Megawatts (MW)
+        # once bound, a view into the values of many buses that replaces the attributes above
+        self._values = None
+
+    @property
+    def generation_capacity(self) -> float:
+        if self._values is None:
+            return self._generation_capacity
+        return self._values[CAPACITY].item()
+
+    @generation_capacity.setter
+    def generation_capacity(self, value: float):
+        if self._values is None:
+            self._generation_capacity = value
+        else:
+            self._values[CAPACITY] = value
+
+    @property
+    def current_output(self) -> float:
+        if self._values is None:
+            return self._current_output
+        return self._values[OUTPUT].item()
+
+    @current_output.setter
+    def current_output(self, value: float):
+        if self._values is None:
+            self._current_output = value
+        else:
+            self._values[OUTPUT] = value
+
+    def bind(self, values: np.ndarray):
+        """Moves the values of this bus into `values`, a row of shape (2,) of a larger array, and keeps it as a view."""
+        values[:] = self.generation_capacity, self.current_output
+        self._values = values
 
     def update_output(self, new_output):
         if 0 <= new_output <= self.generation_capacity:
@@ -1,13 +1,47 @@
+import numpy as np
+
 from ..network_entity import NetworkEntity
 from .prosumer_connection import ProsumerConnection
 
 
+def check_demands(new_demands):
+    """Vectorized check of `LoadBus.update_demand` for many buses at once."""
+    new_demands = np.asarray(new_demands, dtype=np.float64)
+    if (new_demands < 0).any():
+        raise ValueError(f"Demand cannot be negative at buses {np.flatnonzero(new_demands < 0).tolist()}.")
+    return new_demands
+
+
 class LoadBus(NetworkEntity):
     def __init__(self, name, voltage_level, demand):
         super().__init__(name)
         self.voltage_level = voltage_level
-        self.demand = demand
+        self._demand = demand
+        # once bound, a view into the demands of many buses that replaces the attribute above
+        self._demand_view = None
         self.connections = []  # Connections to prosumers and possibly other loads
+        # flow and capacity of every connection, indexed by connection id, and the running total of the flows
+        self.connection_flows = np.zeros(0)
+        self.connection_capacities = np.zeros(0)
+        self.total_flow = 0.
+
+    @property
+    def demand(self) -> float:
+        if self._demand_view is None:
+            return self._demand
+        return self._demand_view[0].item()
+
+    @demand.setter
+    def demand(self, value: float):
+        if self._demand_view is None:
+            self._demand = value
+        else:
+            self._demand_view[0] = value
+
+    def bind(self, demand: np.ndarray):
+        """Moves the demand of this bus into `demand`, a slice of shape (1,) of a larger array, and keeps it as a view."""
+        demand[0] = self.demand
+        self._demand_view = demand
 
     def update_demand(self, new_demand):
         """Update the demand attribute safely."""
@@ -17,9 +51,61 @@ class LoadBus(NetworkEntity):
 
     def add_connection(self, connection: ProsumerConnection):
         """Add a new connection and update demand accordingly."""
+        if connection.from_node is not self:
+            raise ValueError("The connection must start at this load bus.")
+        if connection.connection_id is not None:
+            raise ValueError("The connection was already added to this load bus.")
+        connection_id = len(self.connections)
+        flow, capacity = connection.power_flow, connection.capacity
+        if connection_id == len(self.connection_flows):
+            self.connection_flows = self.__grow(self.connection_flows)
+            self.connection_capacities = self.__grow(self.connection_capacities)
         self.connections.append(connection)
-        self.update_demand(self.calculate_total_demand())
+        self.connection_flows[connection_id] = flow
+        self.connection_capacities[connection_id] = capacity
+        # from now on the flow and capacity of the connection live in the arrays of this bus
+        connection.connection_id = connection_id
+        self.total_flow += flow
+        self.update_demand(max(self.total_flow, 0.))
+
+    def set_connection_flow(self, connection_id: int, new_flow: float):
+        """Set the flow of a single connection, updating the demand by the change in flow."""
+        self.total_flow += new_flow - self.connection_flows[connection_id]
+        self.connection_flows[connection_id] = new_flow
+        self.update_demand(max(self.total_flow, 0.))
+
+    def update_flows(self, connection_ids, new_flows):
+        """
+        Update the flows of many connections at once, and the demand accordingly.
+
+        Parameters:
+            connection_ids (array-like): Distinct ids of the connections, as set by `add_connection`.
+            new_flows (array-like): The new flow of every connection, between 0 and its capacity.
+        """
+        connection_ids = np.asarray(connection_ids, dtype=np.int64)
+        new_flows = np.asarray(new_flows, dtype=np.float64)
+        if len(np.unique(connection_ids)) != len(connection_ids):
+            raise ValueError("Connection ids must be distinct.")
+        if ((connection_ids < 0) | (connection_ids >= len(self.connections))).any():
+            raise IndexError("Unknown connection id.")
+        invalid = ~((0 <= new_flows) & (new_flows <= self.connection_capacities[connection_ids]))
+        if invalid.any():
+            raise ValueError(f"New flow exceeds capacity or is negative at connections {connection_ids[invalid].tolist()}.")
+        self.total_flow += (new_flows - self.connection_flows[connection_ids]).sum().item()
+        self.connection_flows[connection_ids] = new_flows
+        self.update_demand(max(self.total_flow, 0.))
 
     def calculate_total_demand(self):
         """Calculate total demand from all connections."""
-        return sum(conn.power_flow for conn in self.connections)
+        return self.connection_flows[:len(self.connections)].sum().item()
+
+    def resync_demand(self):
+        """Recompute the running total of the connections' flows, dropping accumulated rounding errors."""
+        self.total_flow = self.calculate_total_demand()
+        self.update_demand(max(self.total_flow, 0.))
+
+    @staticmethod
+    def __grow(column: np.ndarray) -> np.ndarray:
+        grown = np.zeros(max(2 * len(column), 8))
+        grown[:len(column)] = column
+        return grown
@@ -1,20 +1,57 @@
+from typing import TYPE_CHECKING
+
 from ..grid_edge import GridEdge
-from .load_bus import LoadBus
 from .prosumer import Prosumer
 
+if TYPE_CHECKING:
+    # LoadBus imports this module
+    from .load_bus import LoadBus
+
 
 class ProsumerConnection(GridEdge):
-    def __init__(self, from_node: LoadBus, to_node: Prosumer, capacity: float, power_flow: float):
+    def __init__(self, from_node: 'LoadBus', to_node: Prosumer, capacity: float, power_flow: float):
+        # set once the connection is added to its load bus, which then holds its capacity and flow
+        self.connection_id = None
         super().__init__(from_node, to_node, capacity, power_flow)
 
+    @property
+    def power_flow(self) -> float:
+        if self.connection_id is None:
+            return self._power_flow
+        return self.from_node.connection_flows[self.connection_id].item()
+
+    @power_flow.setter
+    def power_flow(self, value: float):
+        if self.connection_id is None:
+            self._power_flow = value
+        else:
+            self.from_node.set_connection_flow(self.connection_id, value)
+
+    @property
+    def capacity(self) -> float:
+        if self.connection_id is None:
+            return self._capacity
+        return self.from_node.connection_capacities[self.connection_id].item()
+
+    @capacity.setter
+    def capacity(self, value: float):
+        if self.connection_id is None:
+            self._capacity = value
+        else:
+            self.from_node.connection_capacities[self.connection_id] = value
+
     def update_flow(self, new_flow: float):
         """Update the power flow and adjust the load bus demand accordingly."""
         super().update_flow(new_flow)  # Updates the power flow of the connection
-        self.from_node.update_demand(self.calculate_updated_demand())  # Update the demand on the load bus
+        if self.connection_id is None:
+            self.from_node.update_demand(self.calculate_updated_demand())  # Update the demand on the load bus
+        # otherwise the load bus has already applied the change in flow to its demand
 
     def calculate_updated_demand(self):
         """Calculate the new demand for the load bus based on current flows of all connections."""
-        # This assumes you can access other connections from the load bus, which may require additional architecture
+        if self.connection_id is not None:
+            # the load bus keeps a running total of its connections' flows
+            return self.from_node.total_flow
         total_demand = sum(conn.power_flow for conn in self.from_node.connections if conn is not self)
         # Include the updated flow of the current connection
         total_demand += self.power_flow
@@ -2,10 +2,23 @@ from ..grid_edge import GridEdge
 
 
 class TransitionLine(GridEdge):
+    # incremented whenever the impedance of any line is set, so that power flow models can tell in O(1)
+    # whether their cached impedances may be stale
+    impedance_version = 0
+
     def __init__(self, from_node, to_node, capacity, power_flow, impedance):
         super().__init__(from_node, to_node, capacity, power_flow)
         self.impedance = impedance  # in Ohms
 
+    @property
+    def impedance(self):
+        return self._impedance
+
+    @impedance.setter
+    def impedance(self, value):
+        self._impedance = value
+        TransitionLine.impedance_version += 1
+
     def update_impedance(self, new_impedance):
         if new_impedance < 0:
             raise ValueError("Impedance cannot be negative.")
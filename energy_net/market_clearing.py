@@ -0,0 +1,104 @@
+from typing import Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .defs import Bid
+
+
+def bids_to_arrays(bids: Mapping[str, Bid]) -> Tuple[list, np.ndarray, np.ndarray]:
+    """Splits a `{bidder: (quantity, price)}` mapping into bidder names, quantities and prices."""
+    bidders = list(bids.keys())
+    values = np.array([bids[bidder] for bidder in bidders], dtype=np.float64).reshape(-1, 2)
+    return bidders, values[:, 0], values[:, 1]
+
+
+def merit_order_clearing(demand: float, quantities: Sequence[float], prices: Sequence[float]) -> Tuple[np.ndarray, float, int]:
+    """
+    Clears a single market by merit order.
+
+    Bids are accepted in increasing order of price (ties keep their input order) until the demand is met.
+    The clearing price is the price of the marginal bid, the last one accepted, or of the most expensive
+    bid if the offered quantity does not cover the demand.
+
+    Parameters
+    ----------
+    demand: float
+        The demand to cover.
+    quantities: Sequence[float]
+        Offered quantity of every bid.
+    prices: Sequence[float]
+        Price of every bid.
+
+    Returns
+    -------
+    workloads: np.ndarray
+        Dispatched quantity of every bid, aligned with the input bids.
+    price: float
+        The clearing price. 0 if there are no bids.
+    marginal_rank: int
+        Position of the marginal bid in merit order, so that the bids `order[:marginal_rank + 1]` are accepted.
+        -1 if there are no bids.
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    workloads = np.zeros_like(quantities)
+    if quantities.size == 0:
+        return workloads, 0., -1
+
+    order = np.argsort(prices, kind='stable')
+    supply = np.cumsum(quantities[order])
+    # first bid at which the cumulative supply covers the demand
+    marginal_rank = min(int(np.searchsorted(supply, demand, side='left')), len(order) - 1)
+
+    accepted = order[:marginal_rank + 1]
+    workloads[accepted] = quantities[accepted]
+    # the marginal bid only covers the residual demand
+    residual = demand - (supply[marginal_rank - 1] if marginal_rank > 0 else 0.)
+    workloads[order[marginal_rank]] = np.clip(residual, 0., quantities[order[marginal_rank]])
+    return workloads, float(prices[order[marginal_rank]]), marginal_rank
+
+
+def merit_order_clearing_batch(demand, quantities, prices) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Clears many independent markets, e.g. every hour of every scenario, by merit order in one pass.
+
+    Parameters
+    ----------
+    demand: array-like
+        Demand of every market, shape `[...]`, e.g. `[scenarios, hours]`.
+    quantities: array-like
+        Offered quantities, shape `[..., bidders]`. Must be non-negative.
+    prices: array-like
+        Bid prices, shape `[..., bidders]`.
+        Bids shared by several markets may omit the leading dimensions, e.g. `[hours, bidders]` for all scenarios.
+
+    Returns
+    -------
+    workloads: np.ndarray
+        Dispatched quantity of every bid, shape `[..., bidders]`, aligned with the input bids.
+    clearing_prices: np.ndarray
+        Clearing price of every market, shape `[...]`. 0 for markets without bids.
+    marginal_ranks: np.ndarray
+        Position of the marginal bid of every market in merit order, shape `[...]`.
+    """
+    demand = np.asarray(demand, dtype=np.float64)
+    quantities, prices, _ = np.broadcast_arrays(np.asarray(quantities, dtype=np.float64),
+                                                np.asarray(prices, dtype=np.float64), demand[..., None])
+    demand = np.broadcast_to(demand, quantities.shape[:-1])
+    num_bidders = quantities.shape[-1]
+    if num_bidders == 0:
+        return np.zeros(quantities.shape), np.zeros(demand.shape), np.full(demand.shape, -1)
+
+    order = np.argsort(prices, axis=-1, kind='stable')
+    sorted_quantities = np.take_along_axis(quantities, order, axis=-1)
+    supply = np.cumsum(sorted_quantities, axis=-1)
+    # equivalent to a searchsorted per market, as the cumulative supply is non-decreasing
+    marginal_ranks = np.minimum(np.count_nonzero(supply < demand[..., None], axis=-1), num_bidders - 1)
+    # every bid covers what is left of the demand after the cheaper ones, up to its quantity
+    sorted_workloads = np.clip(demand[..., None] - (supply - sorted_quantities), 0., sorted_quantities)
+
+    workloads = np.empty_like(sorted_workloads)
+    np.put_along_axis(workloads, order, sorted_workloads, axis=-1)
+    marginal_bids = np.take_along_axis(order, marginal_ranks[..., None], axis=-1)
+    clearing_prices = np.take_along_axis(prices, marginal_bids, axis=-1)[..., 0]
+    return workloads, clearing_prices, marginal_ranks
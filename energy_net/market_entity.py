@@ -1,13 +1,15 @@
 from abc import abstractmethod
 from typing import List
 
+import numpy as np
+
 from .model.state import State
 from .model.action import EnergyAction
 from .model.reward import Reward
 from .defs import Bid
 from .network_entity import NetworkEntity
-from .grid_entities.load_bus import LoadBus
-from .grid_entities.generator_bus import GeneratorBus
+from .grid_entities.load_bus import LoadBus, check_demands
+from .grid_entities.generator_bus import GeneratorBus, CAPACITY, OUTPUT, check_outputs
 
 
 # TODO define proper actions
@@ -29,22 +31,37 @@ class MarketEntity():
 
 
 class MarketProducer(MarketEntity):
-    def __init__(self, name: str, generator_buses: List[GeneratorBus]):
-        super().__init__(name)
+    def __init__(self, name: str, generator_buses: List[GeneratorBus], network_entity: NetworkEntity = None,
+                 vectorized: bool = False):
+        super().__init__(name, network_entity)
         self.generator_buses = generator_buses  # A list of GeneratorBus instances representing the utility company
+        # with `vectorized`, the capacity and output of all buses live in a single [buses, 2] array and the buses are views into it
+        self.bus_values = None
+        if vectorized:
+            self.bus_values = np.zeros((len(generator_buses), 2))
+            for generator, values in zip(generator_buses, self.bus_values):
+                generator.bind(values)
 
     def get_total_capacity(self) -> float:
         """Calculate the total generation capacity from all generator buses."""
-        return sum(generator.capacity for generator in self.generator_buses)
+        if self.bus_values is not None:
+            return self.bus_values[:, CAPACITY].sum().item()
+        return sum(generator.generation_capacity for generator in self.generator_buses)
 
     def get_total_current_output(self) -> float:
         """Calculate the total current output from all generator buses."""
+        if self.bus_values is not None:
+            return self.bus_values[:, OUTPUT].sum().item()
         return sum(generator.current_output for generator in self.generator_buses)
 
     def update_output(self, new_outputs: List[float]):
         """Update the output for each generator bus."""
         if len(new_outputs) != len(self.generator_buses):
             raise ValueError("The number of new output values must match the number of generator buses.")
+        if self.bus_values is not None:
+            # all outputs are checked before any of them is updated
+            self.bus_values[:, OUTPUT] = check_outputs(new_outputs, self.bus_values[:, CAPACITY])
+            return
         for generator, new_output in zip(self.generator_buses, new_outputs):
             generator.update_output(new_output)
 
@@ -55,6 +72,10 @@ class MarketProducer(MarketEntity):
         price_per_mw = self.calculate_price_per_mw(total_output)
         return Bid(price=price_per_mw, quantity=total_output)
 
+    def push_bid(self, network_manager, state: State, args):
+        """Updates the standing bid of this producer in the bid book of `network_manager`."""
+        network_manager.submit_bid(self.name, self.get_bid('production', state, args))
+
     def calculate_price_per_mw(self, total_output):
         """Calculate the price per MW based on output."""
         pass
@@ -62,24 +83,39 @@ class MarketProducer(MarketEntity):
     def step(self, action: EnergyAction) -> [State, Reward]:
         """Perform actions that impact the whole utility company, adjusting outputs or other parameters."""
         # Assume action dictates new outputs
-        new_outputs = [action.output_change * generator.current_output for generator in self.generator_buses]
+        if self.bus_values is not None:
+            new_outputs = action.output_change * self.bus_values[:, OUTPUT]
+        else:
+            new_outputs = [action.output_change * generator.current_output for generator in self.generator_buses]
         self.update_output(new_outputs)
         return self.network_entity.step(action)
 
 
 class MarketConsumer(MarketEntity):
-    def __init__(self, name: str, load_buses: List[LoadBus]):
-        super().__init__(name)
+    def __init__(self, name: str, load_buses: List[LoadBus], network_entity: NetworkEntity = None,
+                 vectorized: bool = False):
+        super().__init__(name, network_entity)
         self.load_buses = load_buses  # A list of LoadBus instances representing the consumer's household
+        # with `vectorized`, the demand of all buses lives in a single array and the buses are views into it
+        self.bus_demands = None
+        if vectorized:
+            self.bus_demands = np.zeros(len(load_buses))
+            for i, load_bus in enumerate(load_buses):
+                load_bus.bind(self.bus_demands[i:i + 1])
 
     def get_total_demand(self) -> float:
         """Calculate the total demand from all load buses in this household."""
+        if self.bus_demands is not None:
+            return self.bus_demands.sum().item()
         return sum(load_bus.demand for load_bus in self.load_buses)
 
     def update_demand(self, new_demands: List[float]):
         """Update the demand for each load bus in the household."""
         if len(new_demands) != len(self.load_buses):
             raise ValueError("The number of new demand values must match the number of load buses.")
+        if self.bus_demands is not None:
+            self.bus_demands[:] = check_demands(new_demands)
+            return
         for load_bus, new_demand in zip(self.load_buses, new_demands):
             load_bus.update_demand(new_demand)
 
@@ -97,6 +133,9 @@ class MarketConsumer(MarketEntity):
     def step(self, action: EnergyAction) -> [State, Reward]:
         """Perform actions that impact the whole household, adjusting demands or other parameters."""
         # Assume action dictates new demands
-        new_demands = [action.demand_change * load_bus.demand for load_bus in self.load_buses]
+        if self.bus_demands is not None:
+            new_demands = action.demand_change * self.bus_demands
+        else:
+            new_demands = [action.demand_change * load_bus.demand for load_bus in self.load_buses]
         self.update_demand(new_demands)
         return self.network_entity.step(action)
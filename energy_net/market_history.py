@@ -0,0 +1,243 @@
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MarketHistory:
+    """
+    Columnar store of market clearing outcomes.
+
+    Demand and price are kept in NumPy columns, one row per clearing. Workloads are kept sparse, as
+    (row, bidder, workload) triples of the dispatched bidders only. With a `capacity`, only the last
+    `capacity` rows are retained. The scalar columns are then written twice into a buffer of size
+    `2 * capacity`, so that any window of recent rows is a contiguous view and never needs a copy.
+
+    Parameters
+    ----------
+    capacity: int, optional
+        Maximal number of retained rows. Unbounded if not given.
+    initial_size: int
+        Initial number of rows allocated by an unbounded history, doubled whenever it is full.
+    """
+
+    def __init__(self, capacity: int = None, initial_size: int = 1024):
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be >= 1')
+        self.capacity = capacity
+        size = 2 * capacity if capacity is not None else initial_size
+        self._demand = np.zeros(size)
+        self._price = np.zeros(size)
+        # total number of appended rows, including the ones that are no longer retained
+        self._num_rows = 0
+
+        self.bidders: List[Hashable] = []
+        self._bidder_index: Dict[Hashable, int] = {}
+        self._workload_rows = np.zeros(initial_size, dtype=np.int64)
+        self._workload_bidders = np.zeros(initial_size, dtype=np.int64)
+        self._workload_values = np.zeros(initial_size)
+        self._workload_start = 0
+        self._workload_end = 0
+
+    def __len__(self) -> int:
+        """Number of retained rows."""
+        return self._num_rows if self.capacity is None else min(self._num_rows, self.capacity)
+
+    @property
+    def first_row(self) -> int:
+        """Index of the oldest retained row, counting from the first appended one."""
+        return self._num_rows - len(self)
+
+    def append(self, demand: float, price: float, workloads: Mapping[Hashable, float] = None):
+        """Records the outcome of a single clearing. Bidders with a zero workload are not stored."""
+        row = self._num_rows
+        if self.capacity is None:
+            if row == len(self._demand):
+                self._demand = self.__grow(self._demand, row)
+                self._price = self.__grow(self._price, row)
+            self._demand[row] = demand
+            self._price[row] = price
+        else:
+            slot = row % self.capacity
+            self._demand[[slot, slot + self.capacity]] = demand
+            self._price[[slot, slot + self.capacity]] = price
+        self._num_rows += 1
+        if workloads:
+            self.__append_workloads(row, {bidder: workload for bidder, workload in workloads.items() if workload})
+
+    def window(self, n: int = None) -> Dict[str, np.ndarray]:
+        """
+        The last `n` retained rows (all of them by default), oldest first, as read-only views into the
+        history. The views are only valid until the next `append`.
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            'row' (indices of the rows, counting from the first appended one), 'demand' and 'price'.
+        """
+        size = len(self)
+        n = size if n is None else min(n, size)
+        if self.capacity is None:
+            start = self._num_rows - n
+        else:
+            # the last n rows are contiguous in the doubled buffer
+            start = (self._num_rows - n) % self.capacity
+        window = {'row': np.arange(self._num_rows - n, self._num_rows),
+                  'demand': self._demand[start:start + n],
+                  'price': self._price[start:start + n]}
+        for name in ('demand', 'price'):
+            window[name] = window[name].view()
+            window[name].flags.writeable = False
+        return window
+
+    def workloads(self, bidder: Hashable) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows in which `bidder` was dispatched and its workloads in them."""
+        self.__drop_expired_workloads()
+        rows, bidders, values = self.__workload_columns()
+        mask = bidders == self._bidder_index.get(bidder, -1)
+        return rows[mask], values[mask]
+
+    def workload_matrix(self) -> np.ndarray:
+        """Dense `[rows, bidders]` matrix of the retained workloads."""
+        self.__drop_expired_workloads()
+        rows, bidders, values = self.__workload_columns()
+        matrix = np.zeros((len(self), len(self.bidders)))
+        matrix[rows - self.first_row, bidders] = values
+        return matrix
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """The retained history as columns."""
+        self.__drop_expired_workloads()
+        window = self.window()
+        rows, bidders, values = self.__workload_columns()
+        return {'row': window['row'], 'demand': np.array(window['demand']), 'price': np.array(window['price']),
+                'workload_row': rows.copy(), 'workload_bidder': bidders.copy(), 'workload': values.copy(),
+                'bidders': np.array(self.bidders, dtype=object)}
+
+    def save_npz(self, path):
+        """Saves the retained history to a compressed `.npz` archive."""
+        columns = self.to_dict()
+        columns['bidders'] = np.array([str(bidder) for bidder in self.bidders])
+        np.savez_compressed(path, **columns)
+
+    def save_parquet(self, path_prefix: str):
+        """
+        Saves the retained history to `<path_prefix>_clearing.parquet` (one row per clearing) and
+        `<path_prefix>_workloads.parquet` (one row per dispatched bidder). Requires `pyarrow`.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError('Saving the market history to Parquet requires pyarrow') from e
+        columns = self.to_dict()
+        pq.write_table(pa.table({name: columns[name] for name in ('row', 'demand', 'price')}),
+                       f'{path_prefix}_clearing.parquet')
+        pq.write_table(pa.table({'row': columns['workload_row'],
+                                 'bidder': [str(self.bidders[i]) for i in columns['workload_bidder']],
+                                 'workload': columns['workload']}),
+                       f'{path_prefix}_workloads.parquet')
+
+    def extend(self, demand, price, workloads=None, bidders: Sequence[Hashable] = None):
+        """
+        Records the outcomes of many clearings at once, e.g. of `NetworkManager.market_clearing_batch`.
+        Only the non-zero workloads are stored.
+
+        Parameters
+        ----------
+        demand: array-like
+            Demand of every clearing, shape `[rows]`.
+        price: array-like
+            Clearing price of every clearing, shape `[rows]`.
+        workloads: array-like, optional
+            Dense workloads of shape `[rows, bidders]`.
+        bidders: Sequence[Hashable], optional
+            Bidder of every column of `workloads`. The column indices by default.
+        """
+        demand, price = np.broadcast_arrays(np.ravel(demand), np.ravel(price))
+        count = len(demand)
+        if count == 0:
+            # e.g. a window without cleared rounds
+            return
+        first = self._num_rows
+        if self.capacity is None:
+            if first + count > len(self._demand):
+                size = max(2 * len(self._demand), first + count)
+                self._demand = self.__grow(self._demand, first, size)
+                self._price = self.__grow(self._price, first, size)
+            self._demand[first:first + count] = demand
+            self._price[first:first + count] = price
+        else:
+            # only the last `capacity` rows can be retained
+            kept = min(count, self.capacity)
+            slots = np.arange(first + count - kept, first + count) % self.capacity
+            for column, values in ((self._demand, demand), (self._price, price)):
+                column[slots] = values[count - kept:]
+                column[slots + self.capacity] = values[count - kept:]
+        self._num_rows += count
+        if workloads is None:
+            return
+
+        workloads = np.asarray(workloads, dtype=np.float64).reshape(count, -1)
+        if bidders is None:
+            bidders = range(workloads.shape[1])
+        rows, columns = np.nonzero(workloads)
+        retained = rows >= self.first_row - first
+        rows, columns = rows[retained], columns[retained]
+        start, end = self.__reserve_workloads(len(rows))
+        bidder_indices = np.array([self.__bidder_index(bidder) for bidder in bidders], dtype=np.int64)
+        self._workload_rows[start:end] = first + rows
+        self._workload_bidders[start:end] = bidder_indices[columns]
+        self._workload_values[start:end] = workloads[rows, columns]
+        self._workload_end = end
+
+    def __append_workloads(self, row: int, workloads: Mapping[Hashable, float]):
+        start, end = self.__reserve_workloads(len(workloads))
+        self._workload_rows[start:end] = row
+        self._workload_bidders[start:end] = [self.__bidder_index(bidder) for bidder in workloads]
+        self._workload_values[start:end] = list(workloads.values())
+        self._workload_end = end
+
+    def __reserve_workloads(self, count: int) -> Tuple[int, int]:
+        """Makes room for `count` more workloads at the end of the sparse columns and returns their span."""
+        end = self._workload_end + count
+        if end > len(self._workload_values):
+            self.__drop_expired_workloads()
+            self.__compact_workloads()
+            end = self._workload_end + count
+            # keep at least half of the columns free after a compaction, so that compactions are rare
+            if 2 * end > len(self._workload_values):
+                size = max(2 * end, 2 * len(self._workload_values))
+                self._workload_rows = self.__grow(self._workload_rows, self._workload_end, size)
+                self._workload_bidders = self.__grow(self._workload_bidders, self._workload_end, size)
+                self._workload_values = self.__grow(self._workload_values, self._workload_end, size)
+        return self._workload_end, end
+
+    def __drop_expired_workloads(self):
+        """Forgets the workloads of rows that are no longer retained."""
+        rows = self._workload_rows[self._workload_start:self._workload_end]
+        self._workload_start += int(np.searchsorted(rows, self.first_row))
+
+    def __compact_workloads(self):
+        """Moves the retained workloads to the front of the sparse columns."""
+        if self._workload_start > 0:
+            count = self._workload_end - self._workload_start
+            for column in (self._workload_rows, self._workload_bidders, self._workload_values):
+                column[:count] = column[self._workload_start:self._workload_end]
+            self._workload_start, self._workload_end = 0, count
+
+    def __workload_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        span = slice(self._workload_start, self._workload_end)
+        return self._workload_rows[span], self._workload_bidders[span], self._workload_values[span]
+
+    def __bidder_index(self, bidder: Hashable) -> int:
+        index = self._bidder_index.get(bidder)
+        if index is None:
+            index = self._bidder_index[bidder] = len(self.bidders)
+            self.bidders.append(bidder)
+        return index
+
+    @staticmethod
+    def __grow(column: np.ndarray, used: int, size: Optional[int] = None) -> np.ndarray:
+        grown = np.zeros(size if size is not None else 2 * len(column), dtype=column.dtype)
+        grown[:used] = column[:used]
+        return grown
@@ -1,6 +1,8 @@
 from typing import Any, List, Mapping, Union
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 Reward = List[float]
 class RewardFunction(ABC):
     r"""Base and default reward function class.
@@ -42,6 +44,29 @@ class RewardFunction(ABC):
         """
         pass
 
+    def calculate_batch(self, curr_states, actions, next_states, **kwargs) -> np.ndarray:
+        r"""Calculates rewards for a batch of transitions.
+
+        Override in subclass with a vectorized implementation; the default
+        calls `calculate` once per row.
+
+        Parameters
+        ----------
+        curr_states: np.ndarray
+            States before the transition, shape `[N, obs_dim]`.
+        actions: np.ndarray
+            Actions taken, shape `[N, action_dim]`.
+        next_states: np.ndarray
+            States after the transition, shape `[N, obs_dim]`.
+
+        Returns
+        -------
+        reward: np.ndarray
+            Reward per transition, shape `[N]`.
+        """
+        return np.array([self.calculate(curr_state, action, next_state, **kwargs)
+                         for curr_state, action, next_state in zip(curr_states, actions, next_states)], dtype=np.float32)
+
     def reset(self):
         """Use to reset variables at the start of an episode."""
 
@@ -1,5 +1,8 @@
+from collections.abc import Mapping
 from typing import TypedDict
 
+import numpy as np
+
 from ..config import MIN_PRODUCTION, NO_CONSUMPTION, DEFAULT_INIT_POWER, DEFAULT_EFFICIENCY, INITIAL_TIME, \
     MAX_PRODUCTION, MAX_ELECTRIC_POWER
 
@@ -34,3 +37,91 @@ class ProsumerState(State):
     demand: float  # in Megawatts (MW)
     storage_capacity: float  # in Megawatt-hours (MWh)
     stored_energy: float  # in Megawatt-hours (MWh)
+
+
+class ArrayState(Mapping):
+    """Compact, array-backed state.
+
+    Holds the fields of a state in a fixed-order float64 array with a stable
+    field index per entity type (`fields` / `field_index`). Entities that opt in
+    mutate `array` in place instead of allocating a new state dict every step,
+    and observation building can read `array` directly. The mapping API is a
+    read-only facade over the same buffer, so code written against the
+    `TypedDict` states keeps working.
+
+    Parameters
+    ----------
+    array: np.ndarray, optional
+        Buffer of shape `(len(fields),)` to wrap (may be a view into a larger
+        buffer). A new zeroed buffer is allocated if not given.
+    **kwargs : float
+        Initial field values.
+    """
+
+    __slots__ = ('array',)
+
+    fields: tuple = ('current_time',)
+    field_index: dict = {'current_time': 0}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.field_index = {field: index for index, field in enumerate(cls.fields)}
+
+    def __init__(self, array: np.ndarray = None, **kwargs):
+        if array is None:
+            array = np.zeros(len(self.fields), dtype=np.float64)
+        elif array.shape != (len(self.fields),):
+            raise ValueError(f"{type(self).__name__} expects an array of shape {(len(self.fields),)}, got {array.shape}")
+        self.array = array
+        self.assign(kwargs)
+
+    @classmethod
+    def from_state(cls, state: Mapping, array: np.ndarray = None) -> 'ArrayState':
+        """Creates an array-backed state holding the values of a dict-like `state`."""
+
+        array_state = cls(array)
+        array_state.assign(state)
+        return array_state
+
+    def assign(self, state: Mapping):
+        """Writes the values of `state` into the buffer. Keys that are not fields are ignored."""
+
+        for key, value in state.items():
+            index = self.field_index.get(key)
+            if index is not None:
+                self.array[index] = 0 if value is None else value
+
+    def copy(self) -> 'ArrayState':
+        """Returns a snapshot with its own buffer."""
+
+        return type(self)(self.array.copy())
+
+    def __getitem__(self, key: str) -> float:
+        return self.array[self.field_index[key]].item()
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)})"
+
+
+class StorageArrayState(ArrayState):
+    # same order as `Battery.current_state` and `Battery.get_observation_space`
+    fields = ('energy_capacity', 'power_capacity', 'state_of_charge', 'charging_efficiency', 'discharging_efficiency', 'current_time')
+
+
+class ProducerArrayState(ArrayState):
+    fields = ('max_produce', 'production', 'current_time')
+
+
+class ConsumerArrayState(ArrayState):
+    fields = ('max_electric_power', 'efficiency', 'consumption', 'current_time')
+
+
+class PCSUnitArrayState(ArrayState):
+    # same order as `PCSUnit.get_current_state` and `PCSUnit.get_observation_space`
+    fields = ('storage', 'curr_consumption', 'pred_consumption')
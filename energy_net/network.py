@@ -1,10 +1,61 @@
+import numpy as np
+
+from .grid_edge import GridEdge
+from .grid_entities.transition_line import TransitionLine
 from .network_entity import CompositeNetworkEntity, NetworkEntity
+from .power_flow import DCPowerFlow
+from .topology import GridTopology
 
 
 class Network(CompositeNetworkEntity):
-    def __init__(self, network_entities: list[NetworkEntity]):
-        self.network_entities = network_entities
+    def __init__(self, network_entities: list[NetworkEntity] = None, edges: list[GridEdge] = None, name: str = 'network'):
+        network_entities = network_entities or []
+        super().__init__(name, sub_entities={entity.name: entity for entity in network_entities})
+        self.network_entities = list(network_entities)
+        # nodes and edges of the grid, indexed for array-based queries
+        self.topology = GridTopology()
+        self.topology.add_nodes(network_entities)
+        self.topology.add_edges(edges or [])
+
+    def add_node(self, node: NetworkEntity) -> int:
+        """Registers `node` in the topology and, unless it already is one, as a sub-entity of the network."""
+        index = self.topology.add_node(node)
+        if node.name not in self.sub_entities:
+            self.sub_entities[node.name] = node
+            self.network_entities.append(node)
+        return index
+
+    def add_edge(self, edge: GridEdge) -> int:
+        return self.topology.add_edge(edge)
+
+    def power_flow(self, slack_bus: str = None) -> DCPowerFlow:
+        """
+        Builds a DC power flow over the transition lines of the network.
+
+        Parameters:
+            slack_bus (str): Name of the slack bus. Defaults to the first bus with a transition line.
+
+        Returns:
+            DCPowerFlow: The power flow over the buses connected by transition lines.
+
+        Raises:
+            ValueError: If the network has no transition lines, or `slack_bus` is not connected by one.
+        """
+        line_ids = self.topology.edges_of_type(TransitionLine)
+        if len(line_ids) == 0:
+            raise ValueError(f"The network {self.name} has no transition lines to run a power flow over")
+        lines = [self.topology.edges[i] for i in line_ids]
+        # sorted node indices of the buses
+        bus_ids = np.unique(np.concatenate([self.topology.edge_from[line_ids], self.topology.edge_to[line_ids]]))
+        buses = [self.topology.node(i) for i in bus_ids]
+        slack_index = 0
+        if slack_bus is not None:
+            slack_index = int(np.searchsorted(bus_ids, self.topology.index_of(slack_bus)))
+            if slack_index == len(bus_ids) or bus_ids[slack_index] != self.topology.index_of(slack_bus):
+                raise ValueError(f"{slack_bus} is not connected by a transition line")
+        return DCPowerFlow(buses, lines, slack_bus=slack_index)
 
 
-class Node:
+class Node(NetworkEntity):
+    """A grid node without generation or demand of its own, e.g. a junction of lines."""
     pass
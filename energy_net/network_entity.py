@@ -6,7 +6,7 @@ import numpy as np
 from .dynamics.energy_dynamcis import EnergyDynamics
 from .utils.utils import AggFunc
 from .model.action import EnergyAction
-from .model.state import State
+from .model.state import State, ArrayState
 from .model.reward import Reward
 
 
@@ -56,6 +56,41 @@ class NetworkEntity:
     def update_system_state(self):
         pass
 
+    def snapshot(self):
+        """
+        Capture the mutable state of the entity, without its dynamics or parameters.
+
+        Returns:
+        The snapshot, to be passed to `restore`. It does not share memory with the live entity.
+        """
+        return None
+
+    def restore(self, snapshot) -> None:
+        """
+        Restore the entity to a state captured by `snapshot`. The same snapshot can be restored repeatedly.
+
+        Parameters:
+        snapshot: A value returned by `snapshot`.
+        """
+        pass
+
+    def observe(self, out: np.ndarray) -> np.ndarray:
+        """
+        Write the entity's observation vector into a preallocated buffer.
+
+        Parameters:
+        out (np.ndarray): The buffer to write into, with the shape of the entity's observation space.
+
+        Returns:
+        np.ndarray: The filled buffer.
+        """
+        state = self.get_current_state()
+        if isinstance(state, ArrayState):
+            out[:] = state.array
+        else:
+            out[:] = tuple(state.values())
+        return out
+
 
 class CompositeNetworkEntity(NetworkEntity):
     """ 
@@ -86,7 +121,13 @@ class CompositeNetworkEntity(NetworkEntity):
     def predict(self, actions: Union[np.ndarray, dict[str, EnergyAction]]):
 
         predicted_states = {}
-        if type(actions) is np.ndarray:
+        if type(actions) is np.ndarray and actions.ndim == 2:
+            # a [K, A] matrix of K candidates, column i is the action of the i-th sub-entity
+            sub_entities = list(self.sub_entities.values())
+            for entity_index in range(actions.shape[1]):
+                predicted_states[sub_entities[entity_index].name] = sub_entities[entity_index].predict_batch(actions[:, entity_index])
+
+        elif type(actions) is np.ndarray:
             # we convert the entity dict to a list and match action to entities by index
             sub_entities = list(self.sub_entities.values())
             for entity_index, action in enumerate(actions):
@@ -102,6 +143,32 @@ class CompositeNetworkEntity(NetworkEntity):
         else:
             return predicted_states
 
+    def predict_batch(self, actions: dict[str, np.ndarray]):
+        """
+        Predict the outcome of `K` candidate actions per sub-entity without changing the entity.
+
+        Parameters:
+        actions (dict[str, np.ndarray]): Per sub-entity, its `K` candidate actions stacked along the first axis.
+            Sub-entities without candidates are not predicted.
+
+        Returns:
+        The `K` predicted outcomes of every sub-entity, aggregated with `agg_func` if given.
+        """
+        predicted_states = {entity_name: self.sub_entities[entity_name].predict_batch(entity_actions)
+                            for entity_name, entity_actions in actions.items()}
+
+        if self.agg_func:
+            return self.agg_func(predicted_states)
+        else:
+            return predicted_states
+
+    def snapshot(self) -> dict:
+        return {name: entity.snapshot() for name, entity in self.sub_entities.items()}
+
+    def restore(self, snapshot: dict) -> None:
+        for name, entity_snapshot in snapshot.items():
+            self.sub_entities[name].restore(entity_snapshot)
+
     def get_joint_action(self)->dict[str, EnergyAction]:
         pass
 
@@ -131,10 +198,47 @@ class ElementaryNetworkEntity(NetworkEntity):
         else:
             return self.energy_dynamics.do(action=action)
 
-    def predict(self, action: EnergyAction, state: State):
+    def predict(self, action: Union[np.ndarray, EnergyAction], state: State = None):
+        """
+        Predict the outcome of `action` without changing the entity.
+
+        Parameters:
+        action (EnergyAction): The action to evaluate.
+        state (State, optional): The state to evaluate the action from. Defaults to the current state.
+
+        Returns:
+        The predicted new state (or output, for stateless entities).
+        """
+        if type(action) is np.ndarray and hasattr(self, 'action_type'):
+            action = self.action_type.from_numpy(action)
+        if state is None:
+            state = self.state
         predicted_state = self.energy_dynamics.predict(action=action, state=state)
         return predicted_state
 
+    def predict_batch(self, actions: np.ndarray, state: State = None) -> np.ndarray:
+        """
+        Predict the outcome of `K` candidate actions from the same state without changing the entity.
+
+        Parameters:
+        actions (np.ndarray): `K` candidate actions, one per row.
+        state (State, optional): The state to evaluate the candidates from. Defaults to the current state.
+
+        Returns:
+        np.ndarray: The `K` predicted outcomes stacked along the first axis.
+        """
+        if state is None:
+            state = self.state
+        return self.energy_dynamics.predict_batch(actions=actions, state=state)
+
+    def snapshot(self) -> State:
+        # stateless entities (`state` is None) are not changed by `step`
+        return None if self.state is None else self.state.copy()
+
+    def restore(self, snapshot: State) -> None:
+        if snapshot is not None:
+            self.update_state(snapshot.copy())
+
 
     def get_current_state(self) -> State:
         """
@@ -1,34 +1,35 @@
 import numpy as np
-import scipy.optimize as opt
 
 from .market_entity import MarketEntity
 from .model.state import State
-from .defs import Bid
+from .bid_book import BidBook
+from .defs import Bid, ClearingResult
+from .economic_dispatch import dc_opf_dispatch, economic_dispatch
+from .market_clearing import bids_to_arrays, merit_order_clearing, merit_order_clearing_batch
+from .market_history import MarketHistory
+from .power_flow import DCPowerFlow
 from .utils.utils import condition, get_predicted_state
 from .market_entity import MarketProducer, MarketConsumer
 
 
 def optimal_dispatch(consumption_demand, bids):
-    costs = np.array([bids[bidder][1] for bidder in sorted(bids)])
-    capacities = np.array([bids[bidder][0] for bidder in sorted(bids)])
-    cons = [{'type': 'eq', 'fun': lambda x: sum(x) - consumption_demand},
-            {'type': 'ineq', 'fun': lambda x: capacities - x}]  # Ensure production does not exceed capacities
-
-    res = opt.minimize(lambda x: sum(x * costs), capacities, constraints=cons)
-    if res.success:
-        return dict(zip(sorted(bids), res.x)), costs[np.argmin(res.x)]  # Assuming last price as MCP
-    else:
-        raise ValueError("Optimization failed")
+    bidders, capacities, costs = bids_to_arrays(bids)
+    result = economic_dispatch(consumption_demand, capacities, costs)
+    return dict(zip(bidders, result['dispatch'])), result['price']
 
 
 class NetworkManager:
-    def __init__(self, market_entities: list[MarketEntity]):
+    def __init__(self, market_entities: list[MarketEntity], history_capacity: int = None,
+                 power_flow: DCPowerFlow = None, bidder_buses: dict[str, int] = None):
         self.market_entities = market_entities
-        self.history = []  # Track past market outcomes
+        self.power_flow = power_flow  # Network model of the 'dc_opf' clearing, caches the PTDF matrix
+        self.bidder_buses = bidder_buses or {}  # Bus index of every bidder in the network model
+        self.history = MarketHistory(capacity=history_capacity)  # Track past market outcomes
+        self.bid_book = BidBook()  # Standing production bids, updated by the producers
 
     def update_bidding_strategies(self):
         # Placeholder for a learning algorithm that updates entities' strategies
-        # based on historical outcomes
+        # based on historical outcomes, e.g. self.history.window(24)
         pass
 
     def do_market_clearing(self, state: State):
@@ -53,18 +54,49 @@ class NetworkManager:
                     bids[ma.name] = (bid.quantity, bid.price)
         return bids
 
-    def dispatch(self, consumption_demand, bids) -> tuple[dict[MarketEntity, float], float]:
-        sorted_bidders = sorted(bids.keys(), key=lambda k: bids[k][1])
-        workloads = {}
-        last_bid = 0
-        for bidder in sorted_bidders:
-            available_capacity = min(bids[bidder][0], consumption_demand)
-            workloads[bidder] = available_capacity
-            consumption_demand -= available_capacity
-            last_bid = bids[bidder][1]
-            if consumption_demand <= 0:
-                break
+    def collect_production_bid_arrays(self, state: State, demand: float) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """Like `collect_production_bids`, but returns the bidder names, quantities and prices as aligned arrays."""
+        bidders, quantities, prices = [], [], []
+        for ma in self.market_entities:
+            if isinstance(ma, MarketProducer):
+                bid = ma.get_bid('production', state, demand)
+                if bid:
+                    bidders.append(ma.name)
+                    quantities.append(bid.quantity)
+                    prices.append(bid.price)
+        return bidders, np.array(quantities, dtype=np.float64), np.array(prices, dtype=np.float64)
+
+    def submit_bid(self, bidder: str, bid: Bid):
+        """Places or replaces the standing production bid of `bidder` in the bid book. A `None` bid withdraws it."""
+        if bid:
+            self.bid_book.update(bidder, bid[0], bid[1])
+        else:
+            self.bid_book.remove(bidder)
+
+    def clear_bid_book(self, consumption_demand: float) -> tuple[float, str, float]:
+        """
+        Merit-order clearing of the standing bids, without polling the market entities, in O(log n).
+
+        Returns:
+            tuple: The clearing price, the marginal bidder and the quantity dispatched from the bids cheaper than
+                the marginal one, as `BidBook.clear`.
+        """
+        return self.bid_book.clear(consumption_demand)
 
+    def dispatch_bid_book(self, consumption_demand: float) -> tuple[dict[str, float], float]:
+        """The workloads of the standing bids up to the marginal one and the clearing price. Linear in their number."""
+        return self.bid_book.dispatch(consumption_demand)
+
+    def dispatch(self, consumption_demand, bids) -> tuple[dict[MarketEntity, float], float]:
+        bidders, quantities, prices = bids_to_arrays(bids)
+        workloads, last_bid, marginal_rank = merit_order_clearing(consumption_demand, quantities, prices)
+        # only the bidders up to the marginal one are dispatched
+        order = np.argsort(prices, kind='stable')[:marginal_rank + 1]
+        return {bidders[i]: workloads[i].item() for i in order}, last_bid
+
+    def dispatch_arrays(self, consumption_demand: float, quantities: np.ndarray, prices: np.ndarray) -> tuple[np.ndarray, float]:
+        """Merit-order dispatch of bids given as arrays. Returns the workload of every bid, aligned with the input."""
+        workloads, last_bid, _ = merit_order_clearing(consumption_demand, quantities, prices)
         return workloads, last_bid
 
     def set_price(self, workloads, last_bid):
@@ -73,6 +105,8 @@ class NetworkManager:
     def market_clearing(self, method: str, consumption_demand, bids):
         if method == 'merit_order':
             return self.market_clearing_merit_order(consumption_demand, bids)
+        elif method == 'dc_opf':
+            return self.market_clearing_dc_opf(consumption_demand, bids)
         else:
             raise NotImplementedError
 
@@ -81,12 +115,53 @@ class NetworkManager:
         price = self.set_price(workloads, last_bid)
         return workloads, price
 
+    def market_clearing_dc_opf(self, bus_demands, bids) -> tuple[dict[str, float], np.ndarray]:
+        """
+        Congestion-aware clearing under the line limits of `power_flow`.
+
+        Parameters:
+            bus_demands (array-like): Demand at every bus of `power_flow`.
+            bids (dict[str, Bid]): The production bids. Every bidder must be located in `bidder_buses`.
+
+        Returns:
+            tuple: The workload of every bidder and the locational marginal price of every bus.
+        """
+        if self.power_flow is None:
+            raise ValueError("The 'dc_opf' clearing requires a power_flow network model")
+        bidders, quantities, prices = bids_to_arrays(bids)
+        result = dc_opf_dispatch(bus_demands, quantities, prices, [self.bidder_buses[bidder] for bidder in bidders],
+                                 self.power_flow.ptdf(), self.power_flow.line_capacities())
+        return dict(zip(bidders, result['dispatch'])), result['duals']['lmp']
+
+    def market_clearing_batch(self, demand, quantities, prices, record: bool = True,
+                              bidders: list[str] = None) -> ClearingResult:
+        """
+        Clears many markets by merit order in one vectorized pass.
+
+        Parameters:
+            demand (array-like): Demand of every market, e.g. of shape [scenarios, hours].
+            quantities (array-like): Offered quantities of shape [scenarios, hours, bidders].
+            prices (array-like): Bid prices of shape [scenarios, hours, bidders].
+            record (bool): Whether to append the outcome to `history`, one row per market in C order.
+            bidders (list[str]): Bidder of every bid along the last axis, as recorded in `history`.
+                Their indices by default.
+
+        Returns:
+            ClearingResult: The demand, the workloads of every bid and the clearing price of every market.
+        """
+        workloads, clearing_prices, _ = merit_order_clearing_batch(demand, quantities, prices)
+        result = ClearingResult(demand=np.asarray(demand), workloads=workloads, prices=clearing_prices)
+        if record:
+            self.history.extend(np.broadcast_to(demand, clearing_prices.shape), clearing_prices,
+                                workloads.reshape(clearing_prices.size, -1), bidders)
+        return result
+
     def run(self, initial_state: State, stop_criteria: condition, horizons: list[float] = [24, 48]):
         cur_state = initial_state
         while not stop_criteria(cur_state):
             for horizon in horizons:
                 predicted_state = get_predicted_state(cur_state, horizon)
                 [demand, bids, workloads, price] = self.do_market_clearing(predicted_state)
-                self.history.append((demand, bids, workloads, price))
+                self.history.append(demand, price, workloads)
                 self.update_bidding_strategies()  # Update strategies based on market outcomes
                 # send solution
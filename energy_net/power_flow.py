@@ -0,0 +1,170 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .grid_entities.generator_bus import GeneratorBus
+from .grid_entities.load_bus import LoadBus
+from .grid_entities.transition_line import TransitionLine
+from .network_entity import NetworkEntity
+
+
+class DCPowerFlow:
+    """
+    DC power flow over a network of buses connected by transition lines.
+
+    The line impedances are used as reactances, so that the susceptance of a line is `1 / impedance`. With the
+    incidence matrix `A` (lines x buses) and the line susceptances `b`, the bus susceptance matrix is
+    `B = A.T @ diag(b) @ A`. The voltage angles solve `B' theta' = P'`, the primes denoting the removal of the
+    slack bus, which balances the injections, and the line flows are `diag(b) @ A @ theta`.
+
+    The line impedances and the LU factorization of `B'` are cached and reused for every solve until an impedance
+    changes, which `TransitionLine.impedance_version` reveals without visiting the lines. After changing `buses`,
+    `lines` or `slack_bus`, call `invalidate`.
+
+    Parameters
+    ----------
+    buses: List[NetworkEntity]
+        The buses of the network. `GeneratorBus`es inject their current output and `LoadBus`es withdraw their
+        demand; other buses have no injection.
+    lines: List[TransitionLine]
+        The lines of the network. Their `from_node` and `to_node` must be in `buses`.
+    slack_bus: int
+        Index of the slack bus in `buses`.
+    """
+
+    def __init__(self, buses: List[NetworkEntity], lines: List[TransitionLine], slack_bus: int = 0):
+        self.buses = buses
+        self.lines = lines
+        self.slack_bus = slack_bus
+        self.factorizations = 0
+        self.invalidate()
+
+    @property
+    def num_buses(self) -> int:
+        return len(self.buses)
+
+    @property
+    def susceptances(self) -> np.ndarray:
+        self.__refresh_impedances()
+        return self._susceptances
+
+    def invalidate(self):
+        """Rebuilds the incidence matrix and drops the cached impedances and factorization after a topology change."""
+        self.bus_index: Dict[int, int] = {id(bus): i for i, bus in enumerate(self.buses)}
+        self._non_slack = np.delete(np.arange(len(self.buses)), self.slack_bus)
+        self.incidence = self.__incidence_matrix()
+        self._impedance_version = None
+        self._impedances = None
+        self._susceptances = None
+        self._lu = None
+        self._ptdf = None
+
+    def susceptance_matrix(self) -> sp.csc_matrix:
+        """The bus susceptance matrix `B`."""
+        return (self.incidence.T @ sp.diags(self.susceptances) @ self.incidence).tocsc()
+
+    def injections(self) -> np.ndarray:
+        """Net injection of every bus: generator output minus load demand."""
+        injections = np.zeros(self.num_buses)
+        for i, bus in enumerate(self.buses):
+            if isinstance(bus, GeneratorBus):
+                injections[i] = bus.current_output
+            elif isinstance(bus, LoadBus):
+                injections[i] = -bus.demand
+        return injections
+
+    def solve(self, injections: np.ndarray = None) -> np.ndarray:
+        """
+        Computes the line flows for the given bus injections.
+
+        Parameters
+        ----------
+        injections: np.ndarray, optional
+            Net bus injections of shape `[buses]`, or `[timesteps, buses]` to solve many timesteps at once.
+            Defaults to the current injections of the buses.
+
+        Returns
+        -------
+        np.ndarray
+            Line flows of shape `[lines]` or `[timesteps, lines]`, positive in the direction from `from_node`
+            to `to_node`.
+        """
+        if injections is None:
+            injections = self.injections()
+        return self.flows(self.angles(injections))
+
+    def angles(self, injections: np.ndarray) -> np.ndarray:
+        """Voltage angles of shape `[buses]` or `[timesteps, buses]`, 0 at the slack bus."""
+        injections = np.asarray(injections, dtype=np.float64)
+        lu = self.__factorization()
+        angles = np.zeros(injections.shape)
+        # splu solves for one right-hand side per column
+        angles[..., self._non_slack] = lu.solve(np.ascontiguousarray(injections[..., self._non_slack].T)).T
+        return angles
+
+    def flows(self, angles: np.ndarray) -> np.ndarray:
+        """Line flows for the given voltage angles."""
+        return (self.incidence @ np.asarray(angles).T).T * self.susceptances
+
+    def ptdf(self) -> np.ndarray:
+        """
+        The power transfer distribution factors, of shape `[lines, buses]`: the flow on every line for a unit
+        injection at every bus, withdrawn at the slack bus. Computed once and cached with the factorization.
+        """
+        lu = self.__factorization()
+        if self._ptdf is None:
+            # B' is symmetric, so PTDF' = diag(b) A' B'^-1 = (B'^-1 (diag(b) A').T).T
+            sensitivities = (sp.diags(self._susceptances) @ self.incidence[:, self._non_slack]).T.toarray()
+            self._ptdf = np.zeros((len(self.lines), self.num_buses))
+            self._ptdf[:, self._non_slack] = lu.solve(sensitivities).T
+        return self._ptdf
+
+    def run(self) -> np.ndarray:
+        """Solves the power flow for the current injections and writes the flows to the lines."""
+        flows = self.solve()
+        self.apply(flows)
+        return flows
+
+    def apply(self, flows: Sequence[float]):
+        """Writes flows of shape `[lines]` to the lines."""
+        for line, flow in zip(self.lines, flows):
+            # DC flows are signed, so they bypass the non-negativity check of GridEdge.update_flow
+            line.power_flow = float(flow)
+
+    def overloaded(self, flows: np.ndarray) -> np.ndarray:
+        """Mask of the flows, of shape `[lines]` or `[timesteps, lines]`, that exceed their line's capacity."""
+        return np.abs(flows) > self.line_capacities()
+
+    def line_capacities(self) -> np.ndarray:
+        return np.array([line.capacity for line in self.lines], dtype=np.float64)
+
+    def __incidence_matrix(self) -> sp.csr_matrix:
+        num_lines = len(self.lines)
+        rows = np.repeat(np.arange(num_lines), 2)
+        cols = np.array([[self.bus_index[id(line.from_node)], self.bus_index[id(line.to_node)]] for line in self.lines],
+                        dtype=np.int64).reshape(-1)
+        data = np.tile([1., -1.], num_lines)
+        return sp.csr_matrix((data, (rows, cols)), shape=(num_lines, self.num_buses))
+
+    def __refresh_impedances(self):
+        """Reads the line impedances again if any line's impedance was set, dropping the factorization if they changed."""
+        if self._impedance_version == TransitionLine.impedance_version:
+            return
+        self._impedance_version = TransitionLine.impedance_version
+        impedances = np.array([line.impedance for line in self.lines], dtype=np.float64)
+        if self._impedances is None or not np.array_equal(impedances, self._impedances):
+            self._impedances = impedances
+            self._susceptances = 1. / impedances
+            self._lu = None
+            self._ptdf = None
+
+    def __factorization(self):
+        """The LU factorization of the reduced susceptance matrix, recomputed only if an impedance changed."""
+        self.__refresh_impedances()
+        if self._lu is None:
+            B = self.susceptance_matrix()
+            self._lu = splu(B[self._non_slack][:, self._non_slack].tocsc())
+            self.factorizations += 1
+        return self._lu
@@ -0,0 +1,179 @@
+from typing import Dict, Iterable, List, Tuple, Type
+
+import numpy as np
+import scipy.sparse as sp
+
+from .grid_edge import GridEdge
+from .network_entity import NetworkEntity
+
+
+class GridTopology:
+    """
+    Nodes (buses, prosumers, junctions) and edges (lines, connections) of a grid.
+
+    Nodes are identified by their name and edges by their index. Edge endpoints are kept in NumPy arrays and the
+    adjacency is built lazily in CSR form (one row per node, listing its neighbors and the connecting edges),
+    so that neighbor queries, aggregations and solvers work on arrays. Memory is proportional to the number
+    of edges. The CSR arrays are rebuilt after the topology changes. The class of every node and edge is kept
+    as a code in an array too, so that selecting them by type is a mask over the codes.
+
+    Parameters
+    ----------
+    initial_edges: int
+        Number of edges the endpoint arrays are allocated for, doubled whenever they are full.
+    initial_nodes: int
+        Number of nodes the node type array is allocated for, doubled whenever it is full.
+    """
+
+    def __init__(self, initial_edges: int = 1024, initial_nodes: int = 1024):
+        self.nodes: List[NetworkEntity] = []
+        self.node_index: Dict[str, int] = {}
+        self.edges: List[GridEdge] = []
+        self._edge_from = np.zeros(initial_edges, dtype=np.int64)
+        self._edge_to = np.zeros(initial_edges, dtype=np.int64)
+        self._edge_types = np.zeros(initial_edges, dtype=np.int64)
+        self._node_types = np.zeros(initial_nodes, dtype=np.int64)
+        # code of every class of the registered nodes and edges
+        self._type_codes: Dict[type, int] = {}
+        self._csr = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    @property
+    def edge_from(self) -> np.ndarray:
+        """Index of the `from_node` of every edge."""
+        return self._edge_from[:self.num_edges]
+
+    @property
+    def edge_to(self) -> np.ndarray:
+        """Index of the `to_node` of every edge."""
+        return self._edge_to[:self.num_edges]
+
+    @property
+    def node_types(self) -> np.ndarray:
+        """Type code of every node."""
+        return self._node_types[:self.num_nodes]
+
+    @property
+    def edge_types(self) -> np.ndarray:
+        """Type code of every edge."""
+        return self._edge_types[:self.num_edges]
+
+    def add_node(self, node: NetworkEntity) -> int:
+        """Registers `node` and returns its index. Registering a node again returns its existing index."""
+        index = self.node_index.get(node.name)
+        if index is not None:
+            if self.nodes[index] is not node:
+                raise ValueError(f"A different node named {node.name} is already registered")
+            return index
+        index = self.node_index[node.name] = len(self.nodes)
+        if index == len(self._node_types):
+            self._node_types = self.__grow(self._node_types)
+        self._node_types[index] = self.__type_code(node)
+        self.nodes.append(node)
+        self._csr = None
+        return index
+
+    def add_nodes(self, nodes: Iterable[NetworkEntity]) -> List[int]:
+        return [self.add_node(node) for node in nodes]
+
+    def add_edge(self, edge: GridEdge) -> int:
+        """Registers `edge`, and its endpoints if needed, and returns its index."""
+        from_index, to_index = self.add_node(edge.from_node), self.add_node(edge.to_node)
+        index = len(self.edges)
+        if index == len(self._edge_from):
+            self._edge_from = self.__grow(self._edge_from)
+            self._edge_to = self.__grow(self._edge_to)
+            self._edge_types = self.__grow(self._edge_types)
+        self._edge_from[index] = from_index
+        self._edge_to[index] = to_index
+        self._edge_types[index] = self.__type_code(edge)
+        self.edges.append(edge)
+        self._csr = None
+        return index
+
+    def add_edges(self, edges: Iterable[GridEdge]) -> List[int]:
+        return [self.add_edge(edge) for edge in edges]
+
+    def index_of(self, node_name: str) -> int:
+        return self.node_index[node_name]
+
+    def node(self, index: int) -> NetworkEntity:
+        return self.nodes[index]
+
+    def adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The undirected adjacency in CSR form.
+
+        Returns
+        -------
+        indptr: np.ndarray
+            Of shape `[nodes + 1]`. The neighbors of node i are at positions `indptr[i]:indptr[i + 1]`.
+        neighbors: np.ndarray
+            Of shape `[2 * edges]`, the neighbor node indices.
+        edge_ids: np.ndarray
+            Of shape `[2 * edges]`, the index of the edge to every neighbor.
+        """
+        if self._csr is None:
+            sources = np.concatenate([self.edge_from, self.edge_to])
+            targets = np.concatenate([self.edge_to, self.edge_from])
+            edge_ids = np.tile(np.arange(self.num_edges), 2)
+            order = np.argsort(sources, kind='stable')
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=self.num_nodes), out=indptr[1:])
+            self._csr = indptr, targets[order], edge_ids[order]
+        return self._csr
+
+    def neighbors(self, node_name: str) -> np.ndarray:
+        """Indices of the neighbors of a node."""
+        indptr, neighbors, _ = self.adjacency()
+        index = self.node_index[node_name]
+        return neighbors[indptr[index]:indptr[index + 1]]
+
+    def incident_edges(self, node_name: str) -> np.ndarray:
+        """Indices of the edges of a node."""
+        indptr, _, edge_ids = self.adjacency()
+        index = self.node_index[node_name]
+        return edge_ids[indptr[index]:indptr[index + 1]]
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.adjacency()[0])
+
+    def adjacency_matrix(self) -> sp.csr_matrix:
+        """The symmetric `[nodes, nodes]` adjacency matrix, sharing the CSR arrays."""
+        indptr, neighbors, _ = self.adjacency()
+        return sp.csr_matrix((np.ones(len(neighbors)), neighbors, indptr), shape=(self.num_nodes, self.num_nodes))
+
+    def aggregate_neighbors(self, values: np.ndarray) -> np.ndarray:
+        """Sums `values`, of shape `[nodes, ...]`, over the neighbors of every node, e.g. the prosumers of a feeder."""
+        return self.adjacency_matrix() @ values
+
+    def nodes_of_type(self, node_type: Type) -> np.ndarray:
+        """Indices of the nodes that are instances of `node_type`."""
+        return np.flatnonzero(np.isin(self.node_types, self.__codes_of(node_type)))
+
+    def edges_of_type(self, edge_type: Type) -> np.ndarray:
+        """Indices of the edges that are instances of `edge_type`."""
+        return np.flatnonzero(np.isin(self.edge_types, self.__codes_of(edge_type)))
+
+    def __type_code(self, item) -> int:
+        code = self._type_codes.get(type(item))
+        if code is None:
+            code = self._type_codes[type(item)] = len(self._type_codes)
+        return code
+
+    def __codes_of(self, item_type: Type) -> np.ndarray:
+        """Codes of the registered classes that are `item_type` or derive from it."""
+        return np.array([code for cls, code in self._type_codes.items() if issubclass(cls, item_type)], dtype=np.int64)
+
+    @staticmethod
+    def __grow(column: np.ndarray) -> np.ndarray:
+        grown = np.zeros(max(2 * len(column), 1), dtype=column.dtype)
+        grown[:len(column)] = column
+        return grown
@@ -44,6 +44,29 @@ def bounds_to_gym_box(bounds: Bounds) -> Box:
     )
 
 
+def gym_box_matches_bounds(box: Box, bounds: Bounds) -> bool:
+    """
+    Checks whether a gym Box already describes the given bounds, so it can be reused instead of rebuilt.
+
+    Parameters:
+    box (Box): The cached gym Box.
+    bounds (Bounds): The current bounds of an entity.
+
+    Returns:
+    bool: True if the shape, dtype, low and high of `box` match `bounds`.
+    """
+    shape = bounds.get('shape')
+    if shape is not None and tuple(shape) != box.shape:
+        return False
+    if np.dtype(bounds['dtype']) != box.dtype:
+        return False
+    low = np.asarray(bounds['low'], dtype=box.dtype)
+    high = np.asarray(bounds['high'], dtype=box.dtype)
+    if low.size > 1 and low.shape != box.shape or high.size > 1 and high.shape != box.shape:
+        return False
+    return bool(np.all(box.low == low) and np.all(box.high == high))
+
+
 def default_pcsunit():
     # initialize consumer devices
         consumption_params_arr=[]
@@ -0,0 +1,54 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+import numpy as np
+
+
+class SharedArray:
+    """A NumPy array backed by a named `multiprocessing.shared_memory` block.
+
+    The creating process owns the block and unlinks it on `close`. Child processes
+    attach to it by name and see the same memory, so arrays can be exchanged between
+    processes without pickling.
+
+    Parameters
+    ----------
+    shape: Tuple[int, ...]
+        Shape of the array.
+    dtype: np.dtype
+        Data type of the array.
+    name: str, optional
+        Name of an existing block to attach to. A new zeroed block is created if not given.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.float32, name: str = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self._owner = name is None
+        self._shm = SharedMemory(name=name, create=self._owner, size=nbytes)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        if self._owner:
+            self.array.fill(0)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def spec(self) -> tuple:
+        """Arguments to re-create this array in another process with `SharedArray(*spec)`."""
+        return self.shape, self.dtype.str, self.name
+
+    def close(self):
+        """Releases this process's mapping, and the block itself if this process created it."""
+        if self.array is None:
+            return
+        # views into the buffer must be dropped before the mapping can be closed
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # views handed out to callers are still alive; the mapping is released once they are collected
+            pass
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,47 @@
+"""Step throughput of EnergyNetEnv with and without entity sharding.
+
+Usage: python bench_sharding.py [--agents 64] [--steps 200] [--workers 1 2 4]
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+
+from common import example_pcsunit
+
+
+def steps_per_second(num_agents: int, num_steps: int, num_workers: int = None) -> float:
+    agents = [f'pcsunit_{i}' for i in range(num_agents)]
+    env = EnergyNetEnv(network_entities=[example_pcsunit(name=agent) for agent in agents], simulation_start_time_step=0,
+                       simulation_end_time_step=num_steps + 1, seconds_per_time_step=1800, num_workers=num_workers)
+    try:
+        env.reset()
+        joint_action = {agent: np.zeros(1, dtype=np.float32) for agent in agents}
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            env.step(joint_action)
+        return num_steps / (time.perf_counter() - start)
+    finally:
+        env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agents', type=int, default=64)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    local = steps_per_second(args.agents, args.steps)
+    print(f'{args.agents} agents, local: {local:.0f} steps/s')
+    for num_workers in args.workers:
+        sharded = steps_per_second(args.agents, args.steps, num_workers)
+        print(f'{args.agents} agents, {num_workers} workers: {sharded:.0f} steps/s ({sharded / local:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
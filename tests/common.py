@@ -11,7 +11,7 @@ from energy_net.config import DEFAULT_LIFETIME_CONSTANT
 from energy_net.dynamics.storage_dynamics import BatteryDynamics
 from energy_net.dynamics.production_dynamics import PVDynamics
 
-def example_pcsunit():
+def example_pcsunit(lifetime_constant=15, compact_state=False, name="test_pcsunit"):
     # initialize consumer devices
         consumption_params_arr=[]
         consumption_params = ConsumptionParams(name='pcsunit_consumption', energy_dynamics=PCSUnitConsumptionDynamics(), lifetime_constant=DEFAULT_LIFETIME_CONSTANT)
@@ -20,7 +20,7 @@ def example_pcsunit():
 
         # initialize storage devices
         storage_params_arr=[]
-        storage_params = StorageParams(name = 'test_battery', energy_capacity = 100, power_capacity = 200,inital_charge = 50, charging_efficiency = 1,discharging_efficiency = 1, lifetime_constant = 15, energy_dynamics = BatteryDynamics())
+        storage_params = StorageParams(name = 'test_battery', energy_capacity = 100, power_capacity = 200,inital_charge = 50, charging_efficiency = 1,discharging_efficiency = 1, lifetime_constant = lifetime_constant, energy_dynamics = BatteryDynamics())
         storage_params_arr.append(storage_params)
         storage_params_dict = {'test_battery': storage_params}
 
@@ -31,7 +31,7 @@ def example_pcsunit():
         production_params_dict = {'test_pv': production_params}
 
         # initilaize pcsunit
-        return PCSUnit(name="test_pcsunit", consumption_params_dict=consumption_params_dict, storage_params_dict=storage_params_dict, production_params_dict=production_params_dict, agg_func= None)
+        return PCSUnit(name=name, consumption_params_dict=consumption_params_dict, storage_params_dict=storage_params_dict, production_params_dict=production_params_dict, agg_func= None, compact_state=compact_state)
 
 
 def default_network_entities() -> List[NetworkEntity]:
@@ -40,6 +40,8 @@ def default_network_entities() -> List[NetworkEntity]:
 
 ENV_CFG_FILE = Path(__file__).parent / 'test_env_configs.json'
 
+SHORT_EPISODE_CFG = dict(simulation_start_time_step=0, simulation_end_time_step=10, seconds_per_time_step=1800)
+
 
 def get_env_cfgs():
     with open(ENV_CFG_FILE, 'r') as f:
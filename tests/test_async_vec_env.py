@@ -0,0 +1,60 @@
+import unittest
+import warnings
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from energy_net.env.energy_net_vec_v0 import async_vec_env
+from energy_net.env.single_entity_v0 import gym_env
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+NUM_ENVS = 3
+
+
+class TestAsyncEnergyNetVecEnv(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+        self.venv = async_vec_env(network_entities=[example_pcsunit()], num_envs=NUM_ENVS, **SHORT_EPISODE_CFG)
+        self.addCleanup(self.venv.close)
+
+    def test_matches_dummy_vec_env(self):
+        dummy_venv = DummyVecEnv([lambda: gym_env(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG) for _ in range(NUM_ENVS)])
+        np.testing.assert_array_equal(self.venv.reset(), dummy_venv.reset())
+        self.assertEqual(self.venv.observation_space, dummy_venv.observation_space)
+
+        rng = np.random.default_rng(0)
+        for _ in range(SHORT_EPISODE_CFG['simulation_end_time_step'] + 2):
+            actions = rng.uniform(-20, 20, size=(NUM_ENVS, 1)).astype(np.float32)
+            obs, rewards, dones, infos = self.venv.step(actions)
+            expected_obs, expected_rewards, expected_dones, expected_infos = dummy_venv.step(actions)
+            np.testing.assert_array_equal(obs, expected_obs)
+            np.testing.assert_allclose(rewards, expected_rewards, rtol=1e-6)
+            np.testing.assert_array_equal(dones, expected_dones)
+            for info, expected_info in zip(infos, expected_infos):
+                self.assertEqual(info.keys(), expected_info.keys())
+                if 'terminal_observation' in info:
+                    np.testing.assert_array_equal(info['terminal_observation'], expected_info['terminal_observation'])
+
+    def test_remote_calls(self):
+        self.venv.reset()
+        self.assertEqual(self.venv.get_attr('time_step', indices=[1]), [0])
+        self.venv.step(np.zeros((NUM_ENVS, 1), dtype=np.float32))
+        self.assertEqual(self.venv.get_attr('time_step'), [1] * NUM_ENVS)
+        observations = self.venv.env_method('observe_all', indices=0)
+        np.testing.assert_array_equal(observations[0], [50, 0, 100])
+
+    def test_worker_errors_are_raised(self):
+        self.venv.reset()
+        with self.assertRaises(RuntimeError) as context:
+            self.venv.env_method('step', np.array([1, 2], dtype=np.float32), indices=1)
+        self.assertIn('Traceback', str(context.exception))
+        with self.assertRaises(RuntimeError):
+            self.venv.get_attr('no_such_attribute')
+        # the workers keep serving after an error
+        _, _, dones, _ = self.venv.step(np.zeros((NUM_ENVS, 1), dtype=np.float32))
+        self.assertFalse(dones.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from energy_net.bid_book import BidBook
+from energy_net.grid_entities.generator_bus import GeneratorBus
+from energy_net.market_entity import MarketProducer
+from energy_net.market_clearing import merit_order_clearing
+from energy_net.network_manager import NetworkManager
+
+
+class TestBidBook(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.bids = {f'bidder_{i}': (self.rng.uniform(0, 20), self.rng.uniform(0, 100)) for i in range(300)}
+        self.book = BidBook(self.bids, seed=0)
+
+    def assert_matches_full_clearing(self, demand):
+        bidders = list(self.bids.keys())
+        quantities, prices = np.array([self.bids[bidder] for bidder in bidders]).T
+        expected_workloads, expected_price, _ = merit_order_clearing(demand, quantities, prices)
+
+        workloads, price = self.book.dispatch(demand)
+        self.assertEqual(price, expected_price)
+        for i, bidder in enumerate(bidders):
+            self.assertAlmostEqual(workloads.get(bidder, 0.), expected_workloads[i])
+
+    def test_matches_full_clearing_after_updates(self):
+        for demand in [0., 100., 1500., 1e5]:
+            self.assert_matches_full_clearing(demand)
+
+        for bidder in self.rng.choice(list(self.bids.keys()), size=50, replace=False):
+            if self.rng.random() < 0.5:
+                # quantity-only update
+                self.bids[bidder] = (self.rng.uniform(0, 20), self.bids[bidder][1])
+            else:
+                self.bids[bidder] = (self.rng.uniform(0, 20), self.rng.uniform(0, 100))
+            self.book.update(bidder, *self.bids[bidder])
+        self.book.remove('bidder_0')
+        del self.bids['bidder_0']
+
+        self.assertEqual(len(self.book), len(self.bids))
+        self.assertAlmostEqual(self.book.total_quantity, sum(q for q, _ in self.bids.values()))
+        prices = [price for _, (_, price) in self.book.items()]
+        self.assertEqual(prices, sorted(prices))
+        for demand in [0., 100., 1500., 1e5]:
+            self.assert_matches_full_clearing(demand)
+
+    def test_empty_book(self):
+        self.assertEqual(BidBook().clear(100), (0., None, 0.))
+
+    def test_network_manager_bid_book(self):
+        manager = NetworkManager([])
+        for bidder, bid in {'station1': (200, 10), 'station2': (300, 2), 'station3': (400, 4)}.items():
+            manager.submit_bid(bidder, bid)
+        self.assertEqual(manager.clear_bid_book(450), (4, 'station3', 300))
+        self.assertEqual(manager.dispatch_bid_book(450), ({'station2': 300, 'station3': 150}, 4))
+        manager.submit_bid('station3', None)
+        self.assertEqual(manager.clear_bid_book(450), (10, 'station1', 300))
+        self.assertEqual(manager.dispatch_bid_book(450), ({'station2': 300, 'station1': 150}, 10))
+
+    def test_producer_push_bid(self):
+        class FlatRateProducer(MarketProducer):
+            def calculate_price_per_mw(self, total_output):
+                return 50 - total_output / 10
+
+        manager = NetworkManager([])
+        manager.submit_bid('peaker', (100, 80))
+        producer = FlatRateProducer('utility', [GeneratorBus(f'generator_{i}', generation_capacity=100,
+                                                             current_output=10 * (i + 1)) for i in range(3)])
+        producer.push_bid(manager, state=None, args=None)
+        self.assertEqual(manager.bid_book.get('utility'), (60, 44))
+        self.assertEqual(manager.clear_bid_book(100), (80, 'peaker', 60))
+
+        producer.update_output([0, 0, 20])
+        producer.push_bid(manager, state=None, args=None)
+        self.assertEqual(manager.bid_book.get('utility'), (20, 48))
+
+
+if __name__ == '__main__':
+    unittest.main()
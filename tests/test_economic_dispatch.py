@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from energy_net.economic_dispatch import economic_dispatch
+from energy_net.network_manager import optimal_dispatch
+
+
+class TestEconomicDispatch(unittest.TestCase):
+    def test_greedy_matches_lp(self):
+        rng = np.random.default_rng(0)
+        capacities = rng.uniform(1, 20, size=200)
+        costs = rng.permutation(200).astype(float)
+        demand = 0.4 * capacities.sum()
+
+        greedy = economic_dispatch(demand, capacities, costs, method='greedy')
+        lp = economic_dispatch(demand, capacities, costs, method='highs')
+        np.testing.assert_allclose(greedy['dispatch'], lp['dispatch'], atol=1e-7)
+        self.assertAlmostEqual(greedy['cost'], lp['cost'], places=6)
+        self.assertAlmostEqual(greedy['price'], lp['price'])
+        np.testing.assert_allclose(greedy['duals']['capacity'], lp['duals']['capacity'], atol=1e-7)
+
+    def test_demand_at_cumulative_capacity(self):
+        # the demand is exactly covered by the cheapest generators, so the price is degenerate
+        for demand, capacities, costs in [(300, [100, 200, 300], [1, 2, 4]), (20, [10, 20], [5, 3]),
+                                          (0.1 + 0.2, [0.1, 0.2, 0.5], [1, 2, 3]), (0, [10, 20], [5, 3])]:
+            greedy = economic_dispatch(demand, capacities, costs, method='greedy')
+            lp = economic_dispatch(demand, capacities, costs, method='highs')
+            np.testing.assert_allclose(greedy['dispatch'], lp['dispatch'], atol=1e-7)
+            self.assertAlmostEqual(greedy['price'], lp['price'])
+            np.testing.assert_allclose(greedy['duals']['capacity'], lp['duals']['capacity'], atol=1e-7)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            economic_dispatch(100, capacities=[200], costs=[1], method='simplex')
+
+    def test_constrained_dispatch(self):
+        # the two cheap generators share a corridor limited to 250
+        result = economic_dispatch(450, capacities=[200, 300, 400], costs=[1, 2, 4], A_ub=[[1, 1, 0]], b_ub=[250])
+        np.testing.assert_allclose(result['dispatch'], [200, 50, 200])
+        self.assertAlmostEqual(result['price'], 4)
+        np.testing.assert_allclose(result['duals']['constraints'], [-2])
+
+    def test_infeasible(self):
+        with self.assertRaises(ValueError):
+            economic_dispatch(1000, capacities=[200, 300], costs=[1, 2])
+        with self.assertRaises(ValueError):
+            economic_dispatch(1000, capacities=[200, 300], costs=[1, 2], method='highs')
+
+    def test_optimal_dispatch(self):
+        workloads, price = optimal_dispatch(450, {'station1': (200, 10), 'station2': (300, 2), 'station3': (400, 4)})
+        self.assertEqual(workloads, {'station1': 0, 'station2': 300, 'station3': 150})
+        self.assertEqual(price, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
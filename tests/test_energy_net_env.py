@@ -0,0 +1,106 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+from energy_net.env.base import EpisodeScheduler
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+
+class TestEnergyNetEnv(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+
+    def test_observation_views(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], copy_observations=False, **SHORT_EPISODE_CFG)
+        obs, _ = env.reset()
+        self.assertEqual(env.observation_buffer.shape, (1, 3))
+        self.assertTrue(np.shares_memory(obs['test_pcsunit'], env.observation_buffer))
+
+        obs, _, _, _, _ = env.step({'test_pcsunit': np.array([10], dtype=np.float32)})
+        np.testing.assert_array_equal(obs['test_pcsunit'], [60, 0, 100])
+        np.testing.assert_array_equal(env.observation_buffer[0], obs['test_pcsunit'])
+
+    def test_observation_copies(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit(compact_state=True)], **SHORT_EPISODE_CFG)
+        reset_obs, _ = env.reset()
+        env.step({'test_pcsunit': np.array([10], dtype=np.float32)})
+        self.assertFalse(np.shares_memory(reset_obs['test_pcsunit'], env.observation_buffer))
+        np.testing.assert_array_equal(reset_obs['test_pcsunit'], [50, 0, 100])
+        self.assertIn(env.observe_all()['test_pcsunit'], env.observation_space('test_pcsunit'))
+
+    def test_shared_episode_scheduler(self):
+        scheduler = EpisodeScheduler(0, 9, 2, mode='shuffled', random_seed=2)
+        envs = [EnergyNetEnv(network_entities=[example_pcsunit()], episode_scheduler=scheduler, **SHORT_EPISODE_CFG) for _ in range(3)]
+        self.assertEqual(scheduler.position, 0)
+        starts = []
+        while len(starts) < scheduler.num_splits:
+            for env in envs[:scheduler.num_splits - len(starts)]:
+                env.episode_tracker.next_episode(None, False, False, 0)
+                starts.append(env.episode_tracker.episode_start_time_step)
+                self.assertEqual(env.time_steps, 2)
+        self.assertEqual(sorted(starts), list(range(0, 10, 2)))
+        self.assertEqual(scheduler.position, scheduler.num_splits)
+
+    def test_action_space_cache(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        env.reset()
+        space = env.action_space('test_pcsunit')
+        self.assertIs(env.action_space('test_pcsunit'), space)
+
+        # bounds are unchanged by an idle step, so the cached space is reused
+        env.step({'test_pcsunit': np.array([0], dtype=np.float32)})
+        self.assertIs(env.action_space('test_pcsunit'), space)
+
+        # charging changes the bounds; the previous space is left untouched for anyone holding it
+        low, high = space.low.copy(), space.high.copy()
+        env.step({'test_pcsunit': np.array([10], dtype=np.float32)})
+        new_space = env.action_space('test_pcsunit')
+        self.assertIsNot(new_space, space)
+        np.testing.assert_array_equal(new_space.high, high - 10)
+        np.testing.assert_array_equal(space.low, low)
+        np.testing.assert_array_equal(space.high, high)
+
+        env.reset()
+        np.testing.assert_array_equal(env.action_space('test_pcsunit').high, high)
+
+    def test_step_many_matches_step(self):
+        actions = np.random.default_rng(0).uniform(-60, 60, size=(5, 1)).astype(np.float32)
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        env.reset()
+        expected = [env.step({'test_pcsunit': action})[:3] for action in actions]
+
+        env.reset()
+        trajectory = env.step_many({'test_pcsunit': actions})
+        self.assertEqual(trajectory['observations'].shape, (5, 1, 3))
+        for t, (obs, rewards, terminations) in enumerate(expected):
+            np.testing.assert_array_equal(trajectory['observations'][t, 0], obs['test_pcsunit'])
+            self.assertEqual(trajectory['rewards'][t, 0], rewards['test_pcsunit'])
+            self.assertEqual(trajectory['terminations'][t], terminations['test_pcsunit'])
+        self.assertEqual(env.time_step, 5)
+
+    def test_step_many_without_actions(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        env.reset()
+        trajectory = env.step_many({})
+        self.assertEqual(trajectory['observations'].shape, (0, 1, 3))
+        self.assertEqual(len(trajectory['rewards']), 0)
+        self.assertEqual(env.time_step, 0)
+
+    def test_rollout_stops_at_termination(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        env.reset()
+        trajectory = env.rollout(lambda obs: {agent: np.array([1], dtype=np.float32) for agent in obs}, horizon=100)
+        episode_length = SHORT_EPISODE_CFG['simulation_end_time_step'] - SHORT_EPISODE_CFG['simulation_start_time_step']
+        self.assertEqual(len(trajectory['rewards']), episode_length)
+        self.assertTrue(trajectory['terminations'][-1])
+        self.assertFalse(trajectory['terminations'][:-1].any())
+        np.testing.assert_array_equal(trajectory['actions']['test_pcsunit'], np.ones((episode_length, 1)))
+        np.testing.assert_array_equal(trajectory['observations'][:, 0, 0], 50 + np.arange(1, episode_length + 1))
+        self.assertEqual(env.agents, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from energy_net.env.base import EpisodeScheduler, EpisodeTracker
+
+
+def claim_episodes(episode_tracker, num_episodes, queue):
+    for _ in range(num_episodes):
+        episode_tracker.next_episode(None, False, False, 0)
+        queue.put(episode_tracker.episode_start_time_step)
+
+
+class TestEpisodeTracker(unittest.TestCase):
+    def next_split(self, episode_tracker, *args):
+        episode_tracker.next_episode(*args)
+        return episode_tracker.episode_start_time_step, episode_tracker.episode_end_time_step
+
+    def test_sequential_splits(self):
+        episode_tracker = EpisodeTracker(10, 109)
+        splits = [self.next_split(episode_tracker, 24, False, False, 0) for _ in range(5)]
+        # 4 full episodes of 24 steps fit between 10 and 109
+        self.assertEqual(splits, [(10, 33), (34, 57), (58, 81), (82, 105), (10, 33)])
+
+    def test_rolling_splits(self):
+        episode_tracker = EpisodeTracker(0, 35_000_000)
+        splits = [self.next_split(episode_tracker, 96, True, False, 0) for _ in range(3)]
+        self.assertEqual(splits, [(0, 95), (1, 96), (2, 97)])
+
+    def test_explicit_splits(self):
+        episode_tracker = EpisodeTracker(0, 100)
+        splits = [self.next_split(episode_tracker, [(0, 9), (50, 59)], False, False, 0) for _ in range(3)]
+        self.assertEqual(splits, [(0, 9), (50, 59), (0, 9)])
+
+    def test_peek_next_episode(self):
+        episode_tracker = EpisodeTracker(10, 109)
+        self.assertEqual(episode_tracker.peek_next_episode(24, False, False, 0), (10, 33))
+        self.assertEqual(episode_tracker.peek_next_episode(24, False, False, 0), (10, 33))
+        self.assertEqual(self.next_split(episode_tracker, 24, False, False, 0), (10, 33))
+        # a peek with other arguments is discarded
+        self.assertEqual(episode_tracker.peek_next_episode(48, False, False, 0), (58, 105))
+        self.assertEqual(self.next_split(episode_tracker, 24, False, False, 0), (34, 57))
+
+        # a peeked split is claimed from the scheduler only once
+        scheduler = EpisodeScheduler(0, 95, 24)
+        episode_tracker = EpisodeTracker(0, 95, episode_scheduler=scheduler)
+        self.assertEqual(episode_tracker.peek_next_episode(None, False, False, 0), (0, 23))
+        self.assertEqual(self.next_split(episode_tracker, None, False, False, 0), (0, 23))
+        self.assertEqual(scheduler.position, 1)
+
+        # and is not dropped by a reset between the peek and the next episode
+        self.assertEqual(episode_tracker.peek_next_episode(None, False, False, 0), (24, 47))
+        episode_tracker.reset_episode_index()
+        self.assertEqual(self.next_split(episode_tracker, None, False, False, 0), (24, 47))
+        self.assertEqual(self.next_split(episode_tracker, None, False, False, 0), (48, 71))
+        self.assertEqual(scheduler.position, 3)
+
+    def test_random_splits_are_reproducible(self):
+        episode_tracker = EpisodeTracker(0, 35_000_000)
+        first = [self.next_split(episode_tracker, 96, True, True, 7) for _ in range(10)]
+        episode_tracker.reset_episode_index()
+        second = [self.next_split(episode_tracker, 96, True, True, 7) for _ in range(10)]
+        self.assertEqual(first, second)
+        self.assertGreater(len(set(first)), 1)
+        for start, end in first:
+            self.assertEqual(end - start, 95)
+            self.assertLessEqual(end, 35_000_000)
+
+    def test_episode_too_long(self):
+        with self.assertRaises(ValueError):
+            EpisodeTracker(0, 10).next_episode(24, False, False, 0)
+
+
+class TestEpisodeScheduler(unittest.TestCase):
+    def test_pool_covers_splits_once(self):
+        for mode in EpisodeScheduler.MODES:
+            scheduler = EpisodeScheduler(0, 24*100 - 1, 24, mode=mode, random_seed=3)
+            trackers = [EpisodeTracker(0, 24*100 - 1, episode_scheduler=scheduler) for _ in range(4)]
+            starts = []
+            for _ in range(25):
+                for episode_tracker in trackers:
+                    episode_tracker.next_episode(None, False, False, 0)
+                    starts.append(episode_tracker.episode_start_time_step)
+                    self.assertEqual(episode_tracker.episode_time_steps, 24)
+            self.assertEqual(sorted(starts), list(range(0, 2400, 24)))
+            if mode == 'sequential':
+                self.assertEqual(starts, list(range(0, 2400, 24)))
+            else:
+                self.assertNotEqual(starts, list(range(0, 2400, 24)))
+
+    def test_shuffled_epochs(self):
+        scheduler = EpisodeScheduler(0, 99, 10, mode='shuffled', random_seed=1)
+        first_epoch = [scheduler.next_split() for _ in range(10)]
+        second_epoch = [scheduler.next_split() for _ in range(10)]
+        self.assertEqual(sorted(first_epoch), sorted(second_epoch))
+        self.assertNotEqual(first_epoch, second_epoch)
+        scheduler.reset()
+        self.assertEqual([scheduler.next_split() for _ in range(10)], first_epoch)
+
+    def test_stratified_alternates_seasons(self):
+        # a year of daily episodes with hourly time steps
+        scheduler = EpisodeScheduler(0, 365*24 - 1, 24, mode='stratified', random_seed=0)
+        starts = np.array([scheduler.next_split()[0] for _ in range(360)])
+        seasons = (starts//scheduler.season_time_steps)%EpisodeScheduler.SEASONS
+        for block in seasons.reshape(-1, 4):
+            self.assertEqual(sorted(block), [0, 1, 2, 3])
+
+    def test_shared_across_processes(self):
+        scheduler = EpisodeScheduler(0, 24*40 - 1, 24, mode='shuffled', random_seed=5, start_method='spawn')
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        processes = [context.Process(target=claim_episodes, args=(EpisodeTracker(0, 24*40 - 1, episode_scheduler=scheduler), 10, queue))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        starts = [queue.get(timeout=60) for _ in range(40)]
+        for process in processes:
+            process.join()
+        self.assertEqual(sorted(starts), list(range(0, 960, 24)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from energy_net.grid_entities.load_bus import LoadBus
+from energy_net.grid_entities.prosumer_connection import ProsumerConnection
+
+
+class TestLoadBus(unittest.TestCase):
+    def setUp(self):
+        self.load_bus = LoadBus('feeder', voltage_level=1, demand=0)
+        self.connections = [ProsumerConnection(self.load_bus, None, capacity=10, power_flow=i % 5) for i in range(100)]
+        for connection in self.connections:
+            self.load_bus.add_connection(connection)
+
+    def test_add_connection(self):
+        self.assertEqual(self.load_bus.demand, 200)
+        self.assertEqual(self.connections[7].connection_id, 7)
+        self.assertEqual(self.connections[7].power_flow, 2)
+        with self.assertRaises(ValueError):
+            self.load_bus.add_connection(self.connections[7])
+        with self.assertRaises(ValueError):
+            self.load_bus.add_connection(ProsumerConnection(LoadBus('other', voltage_level=1, demand=0), None,
+                                                            capacity=10, power_flow=1))
+        self.assertEqual(len(self.load_bus.connections), 100)
+        self.assertEqual(self.load_bus.demand, 200)
+
+    def test_update_flow(self):
+        self.connections[3].update_flow(8)
+        self.assertEqual(self.load_bus.demand, 205)
+        self.assertEqual(self.connections[3].calculate_updated_demand(), 205)
+        with self.assertRaises(ValueError):
+            self.connections[3].update_flow(11)
+        self.connections[3].update_capacity(20)
+        self.connections[3].update_flow(11)
+        self.assertEqual(self.load_bus.demand, 208)
+
+    def test_update_flows(self):
+        rng = np.random.default_rng(0)
+        ids = rng.choice(100, size=40, replace=False)
+        flows = rng.uniform(0, 10, size=40)
+        self.load_bus.update_flows(ids, flows)
+        expected = np.arange(100) % 5.
+        expected[ids] = flows
+        self.assertAlmostEqual(self.load_bus.demand, sum(connection.power_flow for connection in self.connections))
+        self.assertEqual(self.connections[ids[0]].power_flow, flows[0])
+        self.assertAlmostEqual(self.load_bus.demand, self.load_bus.calculate_total_demand())
+
+        with self.assertRaises(ValueError):
+            self.load_bus.update_flows([0, 1], [1, 11])
+        with self.assertRaises(ValueError):
+            self.load_bus.update_flows([0, 0], [1, 2])
+        # a rejected update leaves the flows unchanged
+        np.testing.assert_array_equal([connection.power_flow for connection in self.connections], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+from energy_net.market_clearing import merit_order_clearing, merit_order_clearing_batch
+from energy_net.network_manager import NetworkManager
+
+
+def reference_dispatch(consumption_demand, bids):
+    sorted_bidders = sorted(bids.keys(), key=lambda k: bids[k][1])
+    workloads = {}
+    last_bid = 0
+    for bidder in sorted_bidders:
+        available_capacity = min(bids[bidder][0], consumption_demand)
+        workloads[bidder] = available_capacity
+        consumption_demand -= available_capacity
+        last_bid = bids[bidder][1]
+        if consumption_demand <= 0:
+            break
+    return workloads, last_bid
+
+
+class TestMeritOrderClearing(unittest.TestCase):
+    def test_matches_reference_dispatch(self):
+        rng = np.random.default_rng(0)
+        manager = NetworkManager([])
+        for demand in [0.5, 10., 250., 1e4]:
+            quantities = rng.uniform(0, 20, size=100)
+            # integer prices produce ties
+            prices = rng.integers(0, 30, size=100).astype(float)
+            bids = {f'bidder_{i}': (q, p) for i, (q, p) in enumerate(zip(quantities, prices))}
+
+            expected_workloads, expected_price = reference_dispatch(demand, bids)
+            workloads, price = manager.dispatch(demand, bids)
+            self.assertEqual(price, expected_price)
+            self.assertEqual(list(workloads.keys()), list(expected_workloads.keys()))
+            np.testing.assert_allclose(list(workloads.values()), list(expected_workloads.values()), atol=1e-9)
+
+    def test_workloads_are_aligned_with_bids(self):
+        workloads, price, marginal_rank = merit_order_clearing(450, quantities=[200, 300, 400], prices=[10, 2, 4])
+        np.testing.assert_array_equal(workloads, [0, 300, 150])
+        self.assertEqual(price, 4)
+        self.assertEqual(marginal_rank, 1)
+
+    def test_insufficient_supply(self):
+        workloads, price, _ = merit_order_clearing(1000, quantities=[200, 300], prices=[10, 2])
+        np.testing.assert_array_equal(workloads, [200, 300])
+        self.assertEqual(price, 10)
+
+    def test_no_bids(self):
+        workloads, price, marginal_rank = merit_order_clearing(100, quantities=[], prices=[])
+        self.assertEqual(workloads.shape, (0,))
+        self.assertEqual((price, marginal_rank), (0., -1))
+
+
+class TestBatchClearing(unittest.TestCase):
+    def test_matches_single_clearing(self):
+        rng = np.random.default_rng(0)
+        demand = rng.uniform(0, 1200, size=(8, 24))
+        quantities = rng.uniform(0, 20, size=(8, 24, 50))
+        prices = rng.integers(0, 30, size=(8, 24, 50)).astype(float)
+        manager = NetworkManager([])
+
+        result = manager.market_clearing_batch(demand, quantities, prices)
+        self.assertEqual(result['workloads'].shape, (8, 24, 50))
+        self.assertEqual(result['prices'].shape, (8, 24))
+        for s in range(8):
+            for h in range(24):
+                workloads, price, _ = merit_order_clearing(demand[s, h], quantities[s, h], prices[s, h])
+                np.testing.assert_allclose(result['workloads'][s, h], workloads, atol=1e-9)
+                self.assertEqual(result['prices'][s, h], price)
+        self.assertEqual(len(manager.history), 8 * 24)
+        np.testing.assert_array_equal(manager.history.window()['price'], result['prices'].ravel())
+        np.testing.assert_array_equal(manager.history.workload_matrix(), result['workloads'].reshape(8 * 24, 50))
+
+    def test_shared_bids(self):
+        demand = np.array([[100, 450], [600, 1000]])
+        workloads, prices, _ = merit_order_clearing_batch(demand, quantities=[200, 300, 400], prices=[10, 2, 4])
+        np.testing.assert_array_equal(prices, [[2, 4], [4, 10]])
+        np.testing.assert_array_equal(workloads[0, 1], [0, 300, 150])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from energy_net.grid_entities.generator_bus import GeneratorBus
+from energy_net.grid_entities.load_bus import LoadBus
+from energy_net.market_entity import MarketProducer, MarketConsumer
+
+
+def make_generator_buses(num_buses=100):
+    return [GeneratorBus(f'generator_{i}', generation_capacity=10 + i, current_output=i / 2) for i in range(num_buses)]
+
+
+class TestVectorizedMarketEntities(unittest.TestCase):
+    def test_producer_matches_bus_loop(self):
+        producer = MarketProducer('utility', make_generator_buses())
+        vectorized = MarketProducer('utility', make_generator_buses(), vectorized=True)
+        self.assertEqual(vectorized.get_total_capacity(), producer.get_total_capacity())
+        self.assertEqual(vectorized.get_total_current_output(), producer.get_total_current_output())
+
+        new_outputs = np.arange(100) / 3
+        producer.update_output(new_outputs)
+        vectorized.update_output(new_outputs)
+        self.assertAlmostEqual(vectorized.get_total_current_output(), producer.get_total_current_output())
+        # the buses are views into the producer's array
+        self.assertEqual(vectorized.generator_buses[5].current_output, 5 / 3)
+        vectorized.generator_buses[5].update_output(7)
+        self.assertEqual(vectorized.bus_values[5, 1], 7)
+
+    def test_producer_range_check(self):
+        producer = MarketProducer('utility', make_generator_buses(3), vectorized=True)
+        with self.assertRaisesRegex(ValueError, r'\[0, 2\]'):
+            producer.update_output([-1, 5, 100])
+        # nothing is updated when a single output is invalid
+        np.testing.assert_array_equal(producer.bus_values[:, 1], [0, 0.5, 1])
+
+    def test_consumer(self):
+        load_buses = [LoadBus(f'load_{i}', voltage_level=1, demand=i) for i in range(10)]
+        consumer = MarketConsumer('household', load_buses, vectorized=True)
+        self.assertEqual(consumer.get_total_demand(), 45)
+        consumer.update_demand(np.ones(10))
+        self.assertEqual(load_buses[3].demand, 1)
+        load_buses[3].update_demand(4)
+        self.assertEqual(consumer.get_total_demand(), 13)
+        with self.assertRaises(ValueError):
+            consumer.update_demand(-np.ones(10))
+
+    def test_buses_keep_plain_attributes_until_bound(self):
+        generator = GeneratorBus('generator', generation_capacity=10, current_output=None)
+        load_bus = LoadBus('load', voltage_level=1, demand=3)
+        self.assertIsNone(generator.current_output)
+        self.assertIsInstance(load_bus.demand, int)
+        self.assertIsNone(generator._values)
+
+        generator.update_output(4)
+        MarketProducer('utility', [generator], vectorized=True)
+        consumer = MarketConsumer('household', [load_bus], vectorized=True)
+        self.assertEqual(generator._values.tolist(), [10, 4])
+        load_bus.update_demand(5)
+        self.assertEqual(consumer.bus_demands.tolist(), [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
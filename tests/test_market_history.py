@@ -0,0 +1,121 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from energy_net.market_history import MarketHistory
+
+
+def fill(history, num_rows):
+    for row in range(num_rows):
+        history.append(demand=row, price=10 * row, workloads={f'bidder_{row % 3}': row, 'base': 1})
+
+
+class TestMarketHistory(unittest.TestCase):
+    def test_unbounded(self):
+        history = MarketHistory(initial_size=4)
+        fill(history, 10)
+        self.assertEqual(len(history), 10)
+        window = history.window(3)
+        np.testing.assert_array_equal(window['row'], [7, 8, 9])
+        np.testing.assert_array_equal(window['demand'], [7, 8, 9])
+        np.testing.assert_array_equal(window['price'], [70, 80, 90])
+
+        rows, workloads = history.workloads('bidder_1')
+        np.testing.assert_array_equal(rows, [1, 4, 7])
+        np.testing.assert_array_equal(workloads, [1, 4, 7])
+        matrix = history.workload_matrix()
+        self.assertEqual(matrix.shape, (10, 4))
+        np.testing.assert_array_equal(matrix[:, history.bidders.index('base')], 1)
+
+    def test_ring_buffer(self):
+        history = MarketHistory(capacity=5, initial_size=4)
+        fill(history, 13)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history.first_row, 8)
+        np.testing.assert_array_equal(history.window()['demand'], [8, 9, 10, 11, 12])
+        np.testing.assert_array_equal(history.window(2)['price'], [110, 120])
+        rows, _ = history.workloads('bidder_0')
+        np.testing.assert_array_equal(rows, [9, 12])
+        self.assertEqual(history.workload_matrix().shape, (5, 4))
+
+    def test_extend(self):
+        demand = np.arange(7.)
+        workloads = np.zeros((7, 3))
+        workloads[:, 0] = demand
+        workloads[::2, 2] = 1
+        for capacity, retained in ((None, 7), (5, 5), (3, 3)):
+            history = MarketHistory(capacity=capacity, initial_size=4)
+            history.extend(demand, 10 * demand, workloads, bidders=['bidder_0', 'peaker', 'base'])
+            np.testing.assert_array_equal(history.window()['demand'], demand[-retained:])
+            np.testing.assert_array_equal(history.window()['price'], 10 * demand[-retained:])
+            rows, values = history.workloads('bidder_0')
+            np.testing.assert_array_equal(rows, np.arange(max(1, 7 - retained), 7))
+            np.testing.assert_array_equal(values, rows)
+            self.assertEqual(len(history.workloads('peaker')[0]), 0)
+            rows, _ = history.workloads('base')
+            np.testing.assert_array_equal(rows, [row for row in (0, 2, 4, 6) if row >= 7 - retained])
+
+        history = MarketHistory(capacity=5, initial_size=4)
+        fill(history, 3)
+        history.extend([], [], np.zeros((0, 3)), bidders=['bidder_0', 'peaker', 'base'])
+        self.assertEqual(len(history), 3)
+        history.extend(demand[:4], 10 * demand[:4])
+        np.testing.assert_array_equal(history.window()['row'], [2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(history.window()['demand'], [2, 0, 1, 2, 3])
+
+    def test_window_is_a_view(self):
+        history = MarketHistory(capacity=5)
+        fill(history, 7)
+        window = history.window(4)
+        self.assertFalse(window['demand'].flags.owndata)
+        self.assertFalse(window['demand'].flags.writeable)
+
+    def test_save_npz(self):
+        history = MarketHistory(capacity=5)
+        fill(history, 7)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'history.npz'
+            history.save_npz(path)
+            with np.load(path) as columns:
+                np.testing.assert_array_equal(columns['demand'], [2, 3, 4, 5, 6])
+                self.assertEqual(len(columns['workload']), 10)
+                self.assertEqual(list(columns['bidders']), ['base', 'bidder_1', 'bidder_2', 'bidder_0'])
+
+    def test_zero_workloads_are_not_stored(self):
+        history = MarketHistory()
+        history.append(demand=100, price=4, workloads={'station2': 100, 'station3': 0.})
+        history.append(demand=0, price=2, workloads={'station2': 0})
+        np.testing.assert_array_equal(history.workloads('station2')[0], [0])
+        self.assertEqual(len(history.workloads('station3')[0]), 0)
+        self.assertEqual(len(history.to_dict()['workload']), 1)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'requires pyarrow')
+    def test_save_parquet(self):
+        import pyarrow.parquet as pq
+        history = MarketHistory(capacity=5)
+        fill(history, 7)
+        with tempfile.TemporaryDirectory() as directory:
+            prefix = str(Path(directory) / 'history')
+            history.save_parquet(prefix)
+            clearing = pq.read_table(f'{prefix}_clearing.parquet').to_pydict()
+            workloads = pq.read_table(f'{prefix}_workloads.parquet').to_pydict()
+        self.assertEqual(clearing['demand'], [2, 3, 4, 5, 6])
+        self.assertEqual(clearing['row'], [2, 3, 4, 5, 6])
+        self.assertEqual(len(workloads['workload']), 10)
+        self.assertEqual(set(workloads['bidder']), {'bidder_0', 'bidder_1', 'bidder_2', 'base'})
+
+    @unittest.skipIf(importlib.util.find_spec('pyarrow'), 'pyarrow is installed')
+    def test_save_parquet_requires_pyarrow(self):
+        history = MarketHistory()
+        fill(history, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaisesRegex(ImportError, 'pyarrow'):
+                history.save_parquet(str(Path(directory) / 'history'))
+            self.assertEqual(list(Path(directory).iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
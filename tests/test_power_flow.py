@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+from energy_net.grid_entities.generator_bus import GeneratorBus
+from energy_net.grid_entities.load_bus import LoadBus
+from energy_net.grid_entities.transition_line import TransitionLine
+from energy_net.network_entity import NetworkEntity
+from energy_net.network_manager import NetworkManager
+from energy_net.power_flow import DCPowerFlow
+
+
+class TestDCPowerFlow(unittest.TestCase):
+    def setUp(self):
+        # triangle: generator -> junction -> load, and generator -> load directly
+        self.generator = GeneratorBus('generator', generation_capacity=100, current_output=90)
+        self.junction = NetworkEntity('junction')
+        self.load = LoadBus('load', voltage_level=1, demand=90)
+        self.lines = [TransitionLine(self.generator, self.junction, capacity=50, power_flow=0, impedance=1),
+                      TransitionLine(self.junction, self.load, capacity=50, power_flow=0, impedance=1),
+                      TransitionLine(self.generator, self.load, capacity=50, power_flow=0, impedance=1)]
+        self.power_flow = DCPowerFlow([self.generator, self.junction, self.load], self.lines)
+
+    def test_run(self):
+        flows = self.power_flow.run()
+        np.testing.assert_allclose(flows, [30, 30, 60])
+        self.assertEqual([line.power_flow for line in self.lines], [30, 30, 60])
+        np.testing.assert_array_equal(self.power_flow.overloaded(flows), [False, False, True])
+
+    def test_batched_injections(self):
+        injections = np.outer(np.linspace(0, 90, 24), [1, 0, -1])
+        flows = self.power_flow.solve(injections)
+        self.assertEqual(flows.shape, (24, 3))
+        for t in range(24):
+            np.testing.assert_allclose(flows[t], self.power_flow.solve(injections[t]))
+        # the factorization is reused across solves
+        self.assertEqual(self.power_flow.factorizations, 1)
+
+    def test_impedance_change(self):
+        self.power_flow.solve()
+        self.lines[2].update_impedance(2)
+        np.testing.assert_allclose(self.power_flow.solve(), [45, 45, 45])
+        self.assertEqual(self.power_flow.factorizations, 2)
+
+    def test_unrelated_impedance_change(self):
+        self.power_flow.solve()
+        TransitionLine(self.generator, self.load, capacity=50, power_flow=0, impedance=1).update_impedance(5)
+        self.lines[0].update_impedance(1)
+        self.power_flow.solve()
+        self.assertEqual(self.power_flow.factorizations, 1)
+
+    def test_topology_change(self):
+        self.power_flow.solve()
+        self.power_flow.lines = self.lines[:2]
+        self.power_flow.invalidate()
+        np.testing.assert_allclose(self.power_flow.solve(), [90, 90])
+        self.assertEqual(self.power_flow.factorizations, 2)
+
+    def test_ptdf(self):
+        ptdf = self.power_flow.ptdf()
+        self.assertEqual(ptdf.shape, (3, 3))
+        injections = np.array([0, 40, -40])
+        np.testing.assert_allclose(ptdf @ injections, self.power_flow.solve(injections))
+        self.assertIs(self.power_flow.ptdf(), ptdf)
+
+
+class TestDCOPFClearing(unittest.TestCase):
+    def setUp(self):
+        buses = [NetworkEntity(f'bus_{i}') for i in range(3)]
+        lines = [TransitionLine(buses[0], buses[1], capacity=100, power_flow=0, impedance=1),
+                 TransitionLine(buses[1], buses[2], capacity=100, power_flow=0, impedance=1),
+                 TransitionLine(buses[0], buses[2], capacity=100, power_flow=0, impedance=1)]
+        self.lines = lines
+        self.manager = NetworkManager([], power_flow=DCPowerFlow(buses, lines),
+                                      bidder_buses={'cheap': 0, 'expensive': 2})
+        self.bids = {'cheap': (500, 10), 'expensive': (500, 50)}
+
+    def test_uncongested(self):
+        workloads, lmps = self.manager.market_clearing('dc_opf', [0, 0, 150], self.bids)
+        self.assertAlmostEqual(workloads['cheap'], 150)
+        np.testing.assert_allclose(lmps, 10)
+
+    def test_congested(self):
+        self.lines[2].capacity = 60
+        workloads, lmps = self.manager.market_clearing('dc_opf', [0, 0, 150], self.bids)
+        # 2/3 of the cheap production flows over the direct line
+        self.assertAlmostEqual(workloads['cheap'], 90)
+        self.assertAlmostEqual(workloads['expensive'], 60)
+        flows = self.manager.power_flow.solve([90, 0, -90])
+        self.assertAlmostEqual(flows[2], 60)
+        np.testing.assert_allclose(lmps, [10, 30, 50], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from energy_net.dynamics.consumption_dynamics import ProfileConsumptionDynamics
+from energy_net.dynamics.production_dynamics import ProfilePVDynamics
+from energy_net.model.action import ProduceAction
+
+
+class TestProfileDynamics(unittest.TestCase):
+    def setUp(self):
+        # 1000 households sharing one [household, time] array
+        self.profiles = np.arange(1000 * 48, dtype=np.float32).reshape(1000, 48)
+
+    def test_consumption(self):
+        dynamics = ProfileConsumptionDynamics(self.profiles, household=3, start_time_step=10)
+        self.assertEqual(dynamics.predict(), self.profiles[3, 10])
+        self.assertEqual(dynamics.do(), self.profiles[3, 10])
+        self.assertEqual(dynamics.do(), self.profiles[3, 11])
+
+        window = dynamics.predict_consumption_capability(horizon=24)
+        np.testing.assert_array_equal(window, self.profiles[3, 12:36])
+        self.assertTrue(np.shares_memory(window, self.profiles))
+        dynamics.reset()
+        self.assertEqual(dynamics.get_current_consumption_capability(), self.profiles[3, 10])
+
+    def test_all_households(self):
+        dynamics = ProfileConsumptionDynamics(self.profiles)
+        np.testing.assert_array_equal(dynamics.do(), self.profiles[:, 0])
+        self.assertEqual(dynamics.predict_consumption_capability(horizon=4).shape, (1000, 4))
+
+    def test_predict_batch_all_households(self):
+        consumption = ProfileConsumptionDynamics(self.profiles, start_time_step=2)
+        predicted = consumption.predict_batch(np.zeros((3, 1)))
+        self.assertEqual(predicted.shape, (3, 1000))
+        np.testing.assert_array_equal(predicted, np.tile(self.profiles[:, 2], (3, 1)))
+        # a single household keeps one value per candidate
+        self.assertEqual(ProfileConsumptionDynamics(self.profiles, household=0).predict_batch(np.zeros(3)).shape, (3,))
+
+        pv = ProfilePVDynamics(self.profiles[:4], start_time_step=1)
+        # every candidate curtails all households
+        np.testing.assert_array_equal(pv.predict_batch(np.array([[0], [50], [1000]])),
+                                      [[0, 0, 0, 0], [1, 49, 50, 50], self.profiles[:4, 1]])
+
+    def test_pv(self):
+        dynamics = ProfilePVDynamics(self.profiles, household=0)
+        dynamics.reset(5)
+        self.assertEqual(dynamics.predict(), 5)
+        self.assertEqual(dynamics.do(ProduceAction(produce=2)), 2)
+        self.assertEqual(dynamics.do(ProduceAction(produce=None)), 6)
+        np.testing.assert_array_equal(dynamics.predict_batch(np.array([[1], [10]])), [1, 7])
+        np.testing.assert_array_equal(dynamics.predict_production_capability(horizon=2), [7, 8])
+
+
+if __name__ == '__main__':
+    unittest.main()
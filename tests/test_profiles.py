@@ -0,0 +1,143 @@
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from energy_net.data import ProfileStore, ProfileStreamer
+from energy_net.env.base import EpisodeTracker
+
+
+class TestProfileStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.csv_path = Path(self.directory.name) / 'profiles.csv'
+        self.values = np.arange(48 * 3, dtype=np.float32).reshape(48, 3)
+        np.savetxt(self.csv_path, self.values, delimiter=',', header='load,pv,price', comments='')
+
+    def test_from_csv(self):
+        store = ProfileStore.from_csv(self.csv_path)
+        self.assertEqual(store.columns, ['load', 'pv', 'price'])
+        self.assertEqual(store.num_time_steps, 48)
+        self.assertTrue(self.csv_path.with_suffix('.npy').exists())
+        np.testing.assert_array_equal(store['pv'], self.values[:, 1])
+
+        profile = store.slice('load', 10, 13)
+        np.testing.assert_array_equal(profile, self.values[10:14, 0])
+        # a view into the mapped file
+        self.assertIsInstance(profile.base, np.memmap)
+        self.assertFalse(profile.flags.writeable)
+        with self.assertRaises(IndexError):
+            store.slice('load', 40, 48)
+
+    def test_cache_is_reused(self):
+        ProfileStore.from_csv(self.csv_path)
+        cache_time = self.csv_path.with_suffix('.npy').stat().st_mtime_ns
+        ProfileStore.from_csv(self.csv_path)
+        self.assertEqual(self.csv_path.with_suffix('.npy').stat().st_mtime_ns, cache_time)
+
+        # a newer CSV replaces the cache
+        np.savetxt(self.csv_path, 2 * self.values, delimiter=',', header='load,pv,price', comments='')
+        os.utime(self.csv_path, ns=(cache_time + 10 ** 9, cache_time + 10 ** 9))
+        np.testing.assert_array_equal(ProfileStore.from_csv(self.csv_path)['price'], 2 * self.values[:, 2])
+
+    def test_episode(self):
+        store = ProfileStore.from_csv(self.csv_path)
+        episode_tracker = EpisodeTracker(0, 47)
+        episode_tracker.next_episode(episode_time_steps=24, rolling_episode_split=False, random_episode_split=False, random_seed=0)
+        episode = store.episode('price', episode_tracker)
+        self.assertEqual(len(episode), episode_tracker.episode_time_steps)
+
+    def test_missing_column_names(self):
+        store = ProfileStore.from_csv(self.csv_path)
+        columns_path = self.csv_path.with_name('profiles.columns.json')
+        columns_path.unlink()
+        with self.assertRaisesRegex(ValueError, 'profiles.columns.json'):
+            ProfileStore(store.path)
+        # the CSV is converted again
+        self.assertEqual(ProfileStore.from_csv(self.csv_path).columns, ['load', 'pv', 'price'])
+        self.assertTrue(columns_path.exists())
+
+    def test_pickle_only_holds_the_path(self):
+        store = ProfileStore.from_csv(self.csv_path)
+        self.assertLess(len(pickle.dumps(store)), 500)
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(store))['load'], store['load'])
+
+    def test_chunked_conversion(self):
+        store = ProfileStore.from_csv(self.csv_path, chunk_time_steps=5)
+        self.assertEqual(store.num_time_steps, 48)
+        np.testing.assert_array_equal(store.data, self.values.T)
+
+    def test_failed_conversion_leaves_no_files(self):
+        with open(self.csv_path, 'a') as f:
+            f.write('1,2,not_a_number\n')
+        with self.assertRaises(ValueError):
+            ProfileStore.from_csv(self.csv_path, chunk_time_steps=5)
+        self.assertEqual(list(Path(self.directory.name).iterdir()), [self.csv_path])
+
+
+class TestProfileStreamer(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        csv_path = Path(directory.name) / 'households.csv'
+        self.values = np.arange(96 * 4, dtype=np.float32).reshape(96, 4)
+        np.savetxt(csv_path, self.values, delimiter=',', header='h0,h1,h2,h3', comments='')
+        self.store = ProfileStore.from_csv(csv_path)
+
+    def test_load(self):
+        with ProfileStreamer(self.store, columns=['h3', 'h1']) as streamer:
+            profiles = streamer.load(10, 33)
+            np.testing.assert_array_equal(profiles, self.values[10:34, [3, 1]].T)
+            # a copy in memory, not a view of the mapping
+            self.assertNotIsInstance(profiles.base, np.memmap)
+            self.assertFalse(profiles.flags.writeable)
+            with self.assertRaises(IndexError):
+                streamer.load(90, 96)
+
+    def test_prefetch_window(self):
+        with ProfileStreamer(self.store, prefetch_time_steps=24) as streamer:
+            streamer.load(0, 23)
+            # within the prefetch window of the chunk in memory
+            np.testing.assert_array_equal(streamer.load(24, 47), self.values[24:48].T)
+            self.assertEqual(streamer.synchronous_reads, 1)
+            streamer.load(48, 71)
+            self.assertEqual(streamer.synchronous_reads, 2)
+
+    def test_background_prefetch(self):
+        episode_tracker = EpisodeTracker(0, 95)
+        split_arguments = dict(episode_time_steps=24, rolling_episode_split=False, random_episode_split=True, random_seed=3)
+        expected = []
+        with ProfileStreamer(self.store) as streamer:
+            episode_tracker.next_episode(**split_arguments)
+            for _ in range(6):
+                profiles = streamer.episode(episode_tracker, episode_tracker.peek_next_episode(**split_arguments))
+                np.testing.assert_array_equal(profiles, self.values[episode_tracker.episode_start_time_step:episode_tracker.episode_end_time_step + 1].T)
+                expected.append(episode_tracker.episode_start_time_step)
+                episode_tracker.next_episode(**split_arguments)
+            # only the first episode was not prefetched
+            self.assertEqual(streamer.synchronous_reads, 1)
+
+        # peeking does not change the sequence of episodes
+        episode_tracker.reset_episode_index()
+        starts = []
+        for _ in range(6):
+            episode_tracker.next_episode(**split_arguments)
+            starts.append(episode_tracker.episode_start_time_step)
+        self.assertEqual(starts, expected)
+
+    def test_pickle(self):
+        streamer = ProfileStreamer(self.store, columns=['h0'], prefetch_time_steps=12)
+        streamer.prefetch(0, 11)
+        copy = pickle.loads(pickle.dumps(streamer))
+        streamer.close()
+        self.assertEqual(copy.columns, ['h0'])
+        np.testing.assert_array_equal(copy.load(0, 11)[0], self.values[:12, 0])
+        copy.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
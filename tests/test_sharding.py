@@ -0,0 +1,67 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+AGENTS = [f'pcsunit_{i}' for i in range(5)]
+
+
+def make_env(**kwargs):
+    return EnergyNetEnv(network_entities=[example_pcsunit(name=agent) for agent in AGENTS], **SHORT_EPISODE_CFG, **kwargs)
+
+
+class TestShardedEnv(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+        self.env = make_env(num_workers=2)
+        self.addCleanup(self.env.close)
+
+    def test_matches_local_env(self):
+        local_env = make_env()
+        local_obs, _ = local_env.reset()
+        sharded_obs, _ = self.env.reset()
+        for agent in AGENTS:
+            np.testing.assert_array_equal(sharded_obs[agent], local_obs[agent])
+
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            joint_action = {agent: rng.uniform(-20, 20, size=(1,)).astype(np.float32) for agent in AGENTS[1:]}
+            local_obs, local_rewards, _, _, _ = local_env.step(joint_action)
+            sharded_obs, sharded_rewards, _, _, _ = self.env.step(joint_action)
+            self.assertEqual(sharded_rewards, local_rewards)
+            for agent in AGENTS:
+                np.testing.assert_array_equal(sharded_obs[agent], local_obs[agent])
+            np.testing.assert_array_equal(self.env.action_space(AGENTS[1]).high, local_env.action_space(AGENTS[1]).high)
+
+    def test_step_many_and_restore(self):
+        self.env.reset()
+        snapshot = self.env.snapshot()
+        actions = {agent: np.full((4, 1), 5, dtype=np.float32) for agent in AGENTS}
+        first = self.env.step_many(actions)
+        np.testing.assert_array_equal(first['observations'][-1, :, 0], 70)
+
+        self.env.restore(snapshot)
+        second = self.env.step_many(actions)
+        np.testing.assert_array_equal(second['observations'], first['observations'])
+        np.testing.assert_array_equal(second['rewards'], first['rewards'])
+
+    def test_entities_are_not_available(self):
+        # the live entities are in the workers
+        with self.assertRaises(AttributeError):
+            self.env.entities
+        with self.assertRaises(AttributeError):
+            self.env.network_entities
+        self.assertEqual(set(self.env.get_observation_space()), set(AGENTS))
+
+    def test_worker_errors_are_raised(self):
+        self.env.reset()
+        with self.assertRaises(RuntimeError):
+            self.env.step({AGENTS[0]: np.array([1, 2], dtype=np.float32)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from energy_net.dynamics.consumption_dynamics import ElectricHeaterDynamics
+from energy_net.dynamics.production_dynamics import PVDynamics
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+from energy_net.model.action import ProduceAction, StorageAction
+from energy_net.model.state import ConsumerState
+from energy_net.network_entity import CompositeNetworkEntity, ElementaryNetworkEntity
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+
+class TestPredict(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+
+    def test_battery_predict(self):
+        for compact_state in (False, True):
+            battery = example_pcsunit(compact_state=compact_state).sub_entities['test_battery']
+            state = dict(battery.get_current_state())
+            predicted = battery.predict(np.array([10.0]))
+            self.assertEqual(predicted['state_of_charge'], 60)
+            self.assertEqual(dict(battery.get_current_state()), state)
+
+            predicted = battery.predict(StorageAction(charge=-10), state=predicted)
+            self.assertEqual(predicted['state_of_charge'], 50)
+
+    def test_pcsunit_predict_matches_step(self):
+        for compact_state in (False, True):
+            unit = example_pcsunit(compact_state=compact_state)
+            unit.step(np.array([5.0]))
+            state = dict(unit.get_current_state())
+            predicted = dict(unit.predict(np.array([10.0])))
+            self.assertEqual(dict(unit.get_current_state()), state)
+
+            unit.step(np.array([10.0]))
+            self.assertEqual(dict(unit.get_current_state()), predicted)
+
+    def test_pcsunit_predict_does_not_step(self):
+        unit = example_pcsunit()
+        battery_state = unit.sub_entities['test_battery'].state
+
+        def step(action):
+            raise AssertionError('predict must not step the unit')
+
+        unit.step = step
+        self.assertEqual(unit.predict(StorageAction(charge=10))['storage'], 60)
+        self.assertIs(unit.sub_entities['test_battery'].state, battery_state)
+
+    def test_pcsunit_predict_batch(self):
+        candidates = np.linspace(-80, 80, 9).reshape(-1, 1)
+        for compact_state in (False, True):
+            unit = example_pcsunit(compact_state=compact_state)
+            unit.step(np.array([5.0]))
+            state = dict(unit.get_current_state())
+            predicted = unit.predict(candidates)
+            self.assertEqual(predicted.shape, (9, 3))
+            for candidate, row in zip(candidates, predicted):
+                np.testing.assert_array_equal(row, list(unit.predict(candidate).values()))
+            self.assertEqual(dict(unit.get_current_state()), state)
+
+    def test_env_predict_batch(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        env.reset()
+        candidates = np.array([[-10], [0], [10]], dtype=np.float32)
+        next_states, rewards = env.predict_batch('test_pcsunit', candidates)
+        np.testing.assert_array_equal(next_states[:, 0], [40, 50, 60])
+        np.testing.assert_array_equal(rewards, [10, 0, -10])
+
+        obs, step_rewards, _, _, _ = env.step({'test_pcsunit': candidates[2]})
+        np.testing.assert_array_equal(obs['test_pcsunit'], next_states[2])
+        self.assertEqual(step_rewards['test_pcsunit'], rewards[2])
+
+    def test_default_predict_batch(self):
+        # ElectricHeaterDynamics has no vectorized transition, so the candidates are predicted one by one
+        state = ConsumerState(max_electric_power=5, efficiency=1, consumption=0)
+        heater = ElementaryNetworkEntity('heater', ElectricHeaterDynamics(), init_state=state)
+        unit = CompositeNetworkEntity('unit', sub_entities={'heater': heater})
+        candidates = np.array([[2.], [7.]])
+        predicted = unit.predict(candidates)['heater']
+        np.testing.assert_array_equal(predicted, [[5, 1, 2], [5, 1, 5]])
+        np.testing.assert_array_equal(unit.predict_batch({'heater': candidates})['heater'], predicted)
+        self.assertEqual(heater.state['consumption'], 0)
+
+    def test_pv_predict(self):
+        self.assertEqual(PVDynamics().predict(ProduceAction(produce=3)), 3)
+        np.testing.assert_array_equal(PVDynamics().predict_batch(np.array([[1], [3]])), [1, 3])
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+
+    def test_env_restore(self):
+        env = EnergyNetEnv(network_entities=[example_pcsunit(compact_state=True)], **SHORT_EPISODE_CFG)
+        env.reset()
+        env.step({'test_pcsunit': np.array([10], dtype=np.float32)})
+        snapshot = env.snapshot()
+        actions = {'test_pcsunit': np.random.default_rng(0).uniform(-20, 20, size=(20, 1)).astype(np.float32)}
+
+        first = env.step_many(actions)
+        self.assertEqual(env.agents, [])
+        env.restore(snapshot)
+        self.assertEqual(env.time_step, 1)
+        self.assertEqual(env.agents, ['test_pcsunit'])
+        second = env.step_many(actions)
+
+        np.testing.assert_array_equal(second['observations'], first['observations'])
+        np.testing.assert_array_equal(second['rewards'], first['rewards'])
+        np.testing.assert_array_equal(second['terminations'], first['terminations'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+from energy_net.model.action import StorageAction
+from energy_net.model.state import StorageArrayState, StorageState
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+
+class TestArrayState(unittest.TestCase):
+    def test_mapping_facade(self):
+        state = StorageState(energy_capacity=100, power_capacity=200, state_of_charge=50, charging_efficiency=1,
+                             discharging_efficiency=1, current_time=0)
+        array_state = StorageArrayState.from_state(state)
+        self.assertEqual(array_state, state)
+        self.assertEqual(list(array_state.keys()), list(StorageArrayState.fields))
+        self.assertEqual(array_state['state_of_charge'], 50)
+        with self.assertRaises(TypeError):
+            array_state['state_of_charge'] = 10
+
+    def test_views_and_copies(self):
+        buffer = np.zeros((2, len(StorageArrayState.fields)))
+        array_state = StorageArrayState(buffer[1], state_of_charge=5)
+        self.assertEqual(buffer[1, StorageArrayState.field_index['state_of_charge']], 5)
+
+        snapshot = array_state.copy()
+        buffer[1, :] = 0
+        self.assertEqual(snapshot['state_of_charge'], 5)
+        self.assertEqual(array_state['state_of_charge'], 0)
+
+
+class TestCompactPCSUnit(unittest.TestCase):
+    def test_matches_dict_state(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+        dict_env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        compact_env = EnergyNetEnv(network_entities=[example_pcsunit(compact_state=True)], **SHORT_EPISODE_CFG)
+        dict_env.reset()
+        compact_env.reset()
+
+        rng = np.random.default_rng(0)
+        for _ in range(SHORT_EPISODE_CFG['simulation_end_time_step'] - 1):
+            action = {'test_pcsunit': rng.uniform(-60, 60, size=(1,)).astype(np.float32)}
+            dict_obs, dict_rewards, _, _, _ = dict_env.step(action)
+            compact_obs, compact_rewards, _, _, _ = compact_env.step(action)
+            np.testing.assert_allclose(compact_obs['test_pcsunit'], dict_obs['test_pcsunit'])
+            self.assertEqual(compact_rewards, dict_rewards)
+
+        dict_battery = dict_env.entities['test_pcsunit'].sub_entities['test_battery']
+        compact_battery = compact_env.entities['test_pcsunit'].sub_entities['test_battery']
+        self.assertEqual(compact_battery.get_current_state(), dict_battery.get_current_state())
+        self.assertEqual(compact_battery.state_of_charge, dict_battery.state_of_charge)
+
+    def test_compact_state_is_validated(self):
+        battery = example_pcsunit(compact_state=True).sub_entities['test_battery']
+        state = battery.get_current_state().copy()
+        with self.assertRaises(AssertionError):
+            battery.update_state(StorageState(state, state_of_charge=2 * state['energy_capacity']))
+        with self.assertRaises(AssertionError):
+            battery.update_state(StorageState(state, charging_efficiency=0))
+
+    def test_compact_attributes_read_the_buffer(self):
+        battery = example_pcsunit(compact_state=True).sub_entities['test_battery']
+        state = battery.get_current_state()
+        battery.step(StorageAction(charge=10))
+        self.assertEqual(battery.state_of_charge, state['state_of_charge'])
+        self.assertEqual(battery.current_time, state['current_time'])
+        battery.state_of_charge = 20
+        self.assertEqual(state['state_of_charge'], 20)
+        with self.assertRaises(AssertionError):
+            battery.state_of_charge = -1
+
+    def test_state_is_updated_in_place(self):
+        unit = example_pcsunit(compact_state=True)
+        state = unit.get_current_state()
+        unit.step(np.array([10.0]))
+        self.assertIs(unit.get_current_state(), state)
+        self.assertEqual(state['storage'], 60)
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from energy_net.dynamics.storage_dynamics import BatteryDynamics, DegradationTable, degradation_factor
+from energy_net.model.action import StorageAction
+from energy_net.model.state import StorageState, StorageArrayState
+
+
+def battery_state(state_of_charge, current_time=0):
+    return StorageState(energy_capacity=100, power_capacity=200, state_of_charge=state_of_charge,
+                        charging_efficiency=1, discharging_efficiency=1, current_time=current_time)
+
+
+class TestBatteryDynamics(unittest.TestCase):
+    def test_degradation_factor(self):
+        self.assertEqual(degradation_factor(3, 0), 1)
+        self.assertAlmostEqual(degradation_factor(3, 15), np.exp(-3 / 15))
+        np.testing.assert_allclose(degradation_factor(np.array([[3, 3]]), np.array([0, 15])), [[1, np.exp(-3 / 15)]])
+
+    def test_do_degrades_once_per_step(self):
+        state = battery_state(50, current_time=3)
+        new_state = BatteryDynamics().do(StorageAction(charge=80), state, params={'lifetime_constant': 15})
+        factor = np.exp(-3 / 15)
+        self.assertEqual(new_state['state_of_charge'], 100)
+        self.assertAlmostEqual(new_state['energy_capacity'], 100 * factor)
+        self.assertAlmostEqual(new_state['discharging_efficiency'], factor)
+        self.assertEqual(new_state['current_time'], 4)
+
+    def test_do_batch_matches_do(self):
+        dynamics = BatteryDynamics()
+        rng = np.random.default_rng(0)
+        lifetime_constant = np.array([0, 15, 40])
+        states = [battery_state(soc, current_time=2) for soc in (0, 50, 90)]
+        batch = np.stack([StorageArrayState.from_state(state).array for state in states])
+        table = DegradationTable(lifetime_constant, horizon=10)
+
+        for _ in range(12):  # runs past the horizon of the table
+            charge = rng.uniform(-60, 60, size=3)
+            states = [dynamics.do(StorageAction(charge=c), state, params={'lifetime_constant': lc})
+                      for c, state, lc in zip(charge, states, lifetime_constant)]
+            dynamics.do_batch(charge, batch, lifetime_constant, degradation=table)
+            expected = np.stack([StorageArrayState.from_state(state).array for state in states])
+            np.testing.assert_allclose(batch, expected)
+
+    def test_degradation_table(self):
+        table = DegradationTable(np.array([0, 15]), horizon=5, start_time=2)
+        self.assertEqual(table.factors.shape, (5, 2))
+        current_time = np.array([[2, 6], [4, 9]])
+        np.testing.assert_allclose(table(current_time), degradation_factor(current_time, np.array([0, 15])))
+        np.testing.assert_allclose(DegradationTable(15, horizon=3)(np.array([0, 1, 2])), np.exp(-np.arange(3) / 15))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from energy_net.grid_edge import GridEdge
+from energy_net.grid_entities.generator_bus import GeneratorBus
+from energy_net.grid_entities.load_bus import LoadBus
+from energy_net.grid_entities.prosumer_connection import ProsumerConnection
+from energy_net.grid_entities.transition_line import TransitionLine
+from energy_net.network import Network, Node
+from energy_net.network_entity import NetworkEntity
+
+
+class TestGridTopology(unittest.TestCase):
+    def setUp(self):
+        self.generator = GeneratorBus('generator', generation_capacity=100, current_output=90)
+        self.junction = Node('junction')
+        self.feeder = LoadBus('feeder', voltage_level=1, demand=0)
+        self.prosumers = [Node(f'prosumer_{i}') for i in range(3)]
+        lines = [TransitionLine(self.generator, self.junction, capacity=50, power_flow=0, impedance=1),
+                 TransitionLine(self.junction, self.feeder, capacity=50, power_flow=0, impedance=1),
+                 TransitionLine(self.generator, self.feeder, capacity=50, power_flow=0, impedance=1)]
+        connections = [ProsumerConnection(self.feeder, prosumer, capacity=10, power_flow=1) for prosumer in self.prosumers]
+        self.network = Network([self.generator], edges=lines + connections)
+        self.topology = self.network.topology
+
+    def test_indices(self):
+        self.assertEqual(self.topology.num_nodes, 6)
+        self.assertEqual(self.topology.num_edges, 6)
+        self.assertEqual(self.topology.index_of('generator'), 0)
+        self.assertIs(self.topology.node(self.topology.index_of('prosumer_1')), self.prosumers[1])
+
+    def test_neighbors(self):
+        neighbors = {self.topology.node(i).name for i in self.topology.neighbors('feeder')}
+        self.assertEqual(neighbors, {'junction', 'generator', 'prosumer_0', 'prosumer_1', 'prosumer_2'})
+        np.testing.assert_array_equal(sorted(self.topology.incident_edges('junction')), [0, 1])
+        np.testing.assert_array_equal(self.topology.degrees(), [2, 2, 5, 1, 1, 1])
+
+    def test_aggregate_neighbors(self):
+        values = np.zeros(self.topology.num_nodes)
+        values[self.topology.nodes_of_type(Node)] = 1
+        aggregate = self.topology.aggregate_neighbors(values)
+        # the feeder sums its prosumers and the junction
+        self.assertEqual(aggregate[self.topology.index_of('feeder')], 4)
+
+    def test_types(self):
+        np.testing.assert_array_equal(self.topology.nodes_of_type(Node), [1, 3, 4, 5])
+        np.testing.assert_array_equal(self.topology.nodes_of_type(NetworkEntity), np.arange(6))
+        np.testing.assert_array_equal(self.topology.nodes_of_type(LoadBus), [2])
+        np.testing.assert_array_equal(self.topology.edges_of_type(TransitionLine), [0, 1, 2])
+        np.testing.assert_array_equal(self.topology.edges_of_type(GridEdge), np.arange(6))
+        self.assertEqual(len(self.topology.edges_of_type(Node)), 0)
+
+    def test_power_flow(self):
+        power_flow = self.network.power_flow()
+        self.assertEqual(power_flow.num_buses, 3)
+        np.testing.assert_allclose(power_flow.solve([90, 0, -90]), [30, 30, 60])
+        self.assertEqual(self.network.power_flow(slack_bus='feeder').slack_bus, 2)
+        with self.assertRaises(ValueError):
+            self.network.power_flow(slack_bus='prosumer_0')
+        # buses, but no transition lines
+        with self.assertRaisesRegex(ValueError, 'no transition lines'):
+            Network([self.generator, self.feeder], edges=[ProsumerConnection(self.feeder, Node('prosumer'), capacity=10,
+                                                                            power_flow=1)]).power_flow()
+
+    def test_add_node(self):
+        storage = Node('storage')
+        self.assertEqual(self.network.add_node(storage), 6)
+        self.assertIs(self.network.sub_entities['storage'], storage)
+        self.assertEqual(self.network.network_entities, [self.generator, storage])
+        # registering a node again changes nothing
+        self.assertEqual(self.network.add_node(storage), 6)
+        self.assertEqual(len(self.network.network_entities), 2)
+
+    def test_duplicate_names(self):
+        with self.assertRaises(ValueError):
+            self.network.add_node(Node('junction'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from energy_net.env.EnergyNetEnv import EnergyNetEnv
+from energy_net.env.energy_net_vec_v0 import vec_env
+
+from common import example_pcsunit, SHORT_EPISODE_CFG
+
+NUM_ENVS = 4
+
+
+class TestVectorEnergyNetEnv(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings("ignore", category=UserWarning)
+
+    def test_matches_single_env(self):
+        # the stock template has a lifetime constant, which the single env does not apply
+        env = EnergyNetEnv(network_entities=[example_pcsunit()], **SHORT_EPISODE_CFG)
+        venv = vec_env(network_entities=[example_pcsunit()], num_envs=NUM_ENVS, **SHORT_EPISODE_CFG)
+        env.reset()
+        venv.reset()
+
+        rng = np.random.default_rng(0)
+        for _ in range(SHORT_EPISODE_CFG['simulation_end_time_step'] - 1):
+            action = rng.uniform(-60, 60, size=(1,)).astype(np.float32)
+            obs, rewards, terminations, _, _ = env.step({'test_pcsunit': action})
+            vec_obs, vec_rewards, dones, infos = venv.step(np.tile(action, (NUM_ENVS, 1)))
+
+            expected_obs = obs['test_pcsunit']
+            if terminations['test_pcsunit']:
+                self.assertTrue(dones.all())
+                vec_obs = np.stack([info['terminal_observation'] for info in infos])
+            else:
+                self.assertFalse(dones.any())
+            np.testing.assert_allclose(vec_obs, np.tile(expected_obs, (NUM_ENVS, 1)), rtol=1e-6)
+            np.testing.assert_allclose(vec_rewards, rewards['test_pcsunit'], rtol=1e-6)
+            np.testing.assert_allclose(venv.energy_capacity, env.entities['test_pcsunit'].sub_entities['test_battery'].energy_capacity)
+
+    def test_auto_reset(self):
+        venv = vec_env(network_entities=[example_pcsunit()], num_envs=NUM_ENVS, **SHORT_EPISODE_CFG)
+        init_obs = venv.reset()
+        actions = np.full((NUM_ENVS, 1), 5, dtype=np.float32)
+        for _ in range(SHORT_EPISODE_CFG['simulation_end_time_step']):
+            obs, _, dones, infos = venv.step(actions)
+        self.assertTrue(dones.all())
+        np.testing.assert_array_equal(obs, init_obs)
+        self.assertTrue(all('terminal_observation' in info for info in infos))
+
+    def test_set_attr_indices(self):
+        venv = vec_env(network_entities=[example_pcsunit()], num_envs=NUM_ENVS, **SHORT_EPISODE_CFG)
+        venv.reset()
+        venv.set_attr('consumption', 3., indices=[1, 2])
+        np.testing.assert_array_equal(venv.consumption, [0, 3, 3, 0])
+        self.assertEqual(venv.get_attr('consumption', indices=2), [3])
+        with self.assertRaises(ValueError):
+            venv.set_attr('time_step_num', 5, indices=[0])
+        venv.set_attr('time_step_num', 5)
+        self.assertEqual(venv.time_step_num, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()